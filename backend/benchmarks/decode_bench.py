@@ -0,0 +1,57 @@
+import json
+import sys
+
+from backend.benchmarks.harness import main, repeated
+from backend.src.websockets.protocol.decoder import decode_request
+from backend.src.websockets.protocol.requests import CreateGameRequest, JoinGameRequest, MatchmakeRequest, \
+    GetStateRequest, PlaceRandomRequest, FireRequest, ChatRequest, GetWinProbabilityRequest, LeaderboardRequest, \
+    WatchRequest, PlaceFleetRequest
+
+# one representative raw frame per request type, with the model the previous decoding built from the dict
+FRAMES = {
+    "create": (b'{"type": "create", "player_id": "Guillaume"}', CreateGameRequest),
+    "join": (b'{"type": "join", "player_id": "Mariko", "code": "K3F9ZQ"}', JoinGameRequest),
+    "matchmake": (b'{"type": "matchmake", "player_id": "Guillaume"}', MatchmakeRequest),
+    "get_state": (b'{"type": "get_state"}', GetStateRequest),
+    "place_random": (b'{"type": "place_random", "override": false}', PlaceRandomRequest),
+    "fire": (b'{"type": "fire", "row": 4, "col": 7}', FireRequest),
+    "chat": (b'{"type": "chat", "message": "Nice shot! You will not find my carrier though"}', ChatRequest),
+    "get_win_probability": (b'{"type": "get_win_probability"}', GetWinProbabilityRequest),
+    "leaderboard": (b'{"type": "leaderboard", "top": 10}', LeaderboardRequest),
+    "watch": (b'{"type": "watch", "code": "K3F9ZQ"}', WatchRequest),
+    "place_fleet": (b'{"type": "place_fleet", "ships": ['
+                    b'{"ship": "carrier", "row": 0, "col": 0, "horizontal": true}, '
+                    b'{"ship": "battleship", "row": 2, "col": 0, "horizontal": true}, '
+                    b'{"ship": "cruiser", "row": 4, "col": 0, "horizontal": true}, '
+                    b'{"ship": "submarine", "row": 6, "col": 0, "horizontal": true}, '
+                    b'{"ship": "destroyer", "row": 8, "col": 0, "horizontal": true}]}', PlaceFleetRequest),
+    # a /ws/mux request, tagged with its game
+    "fire (mux)": (b'{"type": "fire", "game": "K3F9ZQ", "row": 4, "col": 7}', FireRequest),
+}
+
+"""
+Decode throughput of the /ws/json requests, per request type: the single pass discriminated decoder, next to the
+previous two-pass decoding (json.loads, then the model built from the dict) for reference.
+
+    python -m backend.benchmarks.decode_bench
+    python -m backend.benchmarks.decode_bench --save
+"""
+
+
+def two_pass(raw: bytes, model):
+    data = json.loads(raw)
+    return model(**data)
+
+
+def build_benchmarks() -> dict:
+    benchmarks = {}
+
+    for name, (raw, model) in FRAMES.items():
+        benchmarks[f"decode_request ({name})"] = repeated(lambda raw=raw: decode_request(raw))
+        benchmarks[f"two-pass ({name})"] = repeated(lambda raw=raw, model=model: two_pass(raw, model))
+
+    return benchmarks
+
+
+if __name__ == "__main__":
+    sys.exit(main("decode", build_benchmarks()))
@@ -0,0 +1,137 @@
+import asyncio
+import contextlib
+import os
+import sys
+
+from backend.benchmarks.harness import main, repeated, consuming, consuming_async
+from backend.src.commands.command_parser import parse_command
+from backend.src.engine.board import Board
+from backend.src.engine.game import Game, GamePhase
+from backend.src.engine.game_session import GameSession
+from backend.src.engine.ships import standard_ships
+from backend.src.shared.render import render_grid
+
+# the standard fleet, one ship per row starting at column 0 (rows 0 to 4)
+FLEET_LAYOUT = [(ship.name, (row, 0), True) for row, ship in enumerate(standard_ships())]
+
+# sinks the carrier then only misses, so a game never ends during the benchmark
+SHOTS = [(0, col) for col in range(5)] + [(row, col) for row in range(5, 10) for col in range(10)][:45]
+
+"""
+Microbenchmarks of the engine hot paths.
+
+    python -m backend.benchmarks.engine_bench            # compare with backend/benchmarks/baselines/engine.json
+    python -m backend.benchmarks.engine_bench --save     # record a new baseline
+"""
+
+
+def placed_board() -> Board:
+    board = Board()
+    for name, start, horizontal in FLEET_LAYOUT:
+        board.place_ship(board.get_ship_by_name(name), start, horizontal)
+    return board
+
+
+def placed_game() -> Game:
+    game = Game()
+    game.add_player("p1")
+    game.add_player("p2")
+    game.phase = GamePhase.SETUP
+
+    for player_id in ("p1", "p2"):
+        board = game.boards[player_id]
+        for name, start, horizontal in FLEET_LAYOUT:
+            game.place_ship(player_id, board.get_ship_by_name(name), start, horizontal)
+
+    return game
+
+
+def mid_game_board() -> Board:
+    board = placed_board()
+    for coord in SHOTS[:30]:
+        board.receive_fire(coord)
+    return board
+
+
+async def mid_game_session() -> GameSession:
+    session = GameSession()
+    await session.join("p1")
+    await session.join("p2")
+    session.game = session.handler.game = placed_game()
+    await session.game.start("p1")
+
+    for coord in SHOTS[:30]:
+        await session.game.fire("p1", coord)
+        await session.game.fire("p2", coord)
+
+    return session
+
+
+def place_ship_inputs():
+    while True:
+        board = Board()
+        for name, start, horizontal in FLEET_LAYOUT:
+            yield board, board.get_ship_by_name(name), start, horizontal
+
+
+def receive_fire_inputs():
+    while True:
+        board = placed_board()
+        for row in range(board.size):
+            for col in range(board.size):
+                yield board, (row, col)
+
+
+def fire_inputs():
+    while True:
+        game = placed_game()
+        asyncio.run(game.start("p1"))
+        for coord in SHOTS:
+            yield game, "p1", coord
+            yield game, "p2", coord
+
+
+def setup_game() -> Game:
+    game = Game()
+    game.add_player("p1")
+    game.add_player("p2")
+    game.phase = GamePhase.SETUP
+    return game
+
+
+def quiet(benchmark):
+    """place_random prints every rejected placement, keep the report readable."""
+    def run(n: int) -> float:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return benchmark(n)
+
+    return run
+
+
+def build_benchmarks() -> dict:
+    board = mid_game_board()
+    grid = board.render(reveal_ships=True)
+    session = asyncio.run(mid_game_session())
+
+    place_ship = place_ship_inputs()
+    receive_fire = receive_fire_inputs()
+    fire = fire_inputs()
+
+    return {
+        "Board.place_ship": consuming(
+            lambda: next(place_ship), lambda args: args[0].place_ship(*args[1:])),
+        "Board.receive_fire": consuming(
+            lambda: next(receive_fire), lambda args: args[0].receive_fire(args[1])),
+        "Board.render": repeated(lambda: board.render(reveal_ships=True)),
+        "Board.render_ships": repeated(board.render_ships),
+        "Game.place_random": quiet(consuming_async(setup_game, lambda game: game.place_random("p1"))),
+        "Game.fire": consuming_async(lambda: next(fire), lambda args: args[0].fire(args[1], args[2])),
+        "GameSession.build_state": repeated(lambda: session.build_state("p1")),
+        "parse_command (fire)": repeated(lambda: parse_command("fire 4 7")),
+        "parse_command (place)": repeated(lambda: parse_command("place carrier 0 0 h")),
+        "render_grid": repeated(lambda: render_grid(grid)),
+    }
+
+
+if __name__ == "__main__":
+    sys.exit(main("engine", build_benchmarks()))
@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import json
+import platform
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_THRESHOLD = 0.20
+MIN_TIME = 0.2
+REPEAT = 5
+CHUNK = 1000
+
+# A benchmark prepares `n` independent inputs, then returns the time in seconds taken by `n` operations on them.
+# Preparing outside of the timed loop lets us benchmark operations that consume their input (placing, firing)
+Benchmark = Callable[[int], float]
+
+"""
+Small benchmark harness shared by the benchmark suites.
+
+Each benchmark is calibrated until a run takes at least MIN_TIME, then repeated REPEAT times; the best run is kept
+as nanoseconds per operation. Results are saved as JSON baselines and compared with a relative threshold.
+"""
+
+
+def measure(benchmark: Benchmark, min_time: float = MIN_TIME, repeat: int = REPEAT) -> float:
+    n = 10
+    while True:
+        elapsed = benchmark(n)
+        if elapsed >= min_time or n >= 10_000_000:
+            break
+        n = n * 10 if elapsed < min_time / 10 else int(n * min_time / elapsed * 1.2) + 1
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, benchmark(n))
+
+    return best / n * 1e9
+
+
+def repeated(operate: Callable[[], object]) -> Benchmark:
+    """For operations that can run again and again on the same input."""
+    def benchmark(n: int) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            operate()
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def consuming(prepare: Callable[[], object], operate: Callable[[object], object]) -> Benchmark:
+    """For operations that modify their input, which is prepared fresh (and untimed) for every operation."""
+    def benchmark(n: int) -> float:
+        elapsed = 0.0
+        for size in _chunks(n):
+            inputs = [prepare() for _ in range(size)]
+
+            start = time.perf_counter()
+            for item in inputs:
+                operate(item)
+            elapsed += time.perf_counter() - start
+
+        return elapsed
+
+    return benchmark
+
+
+def consuming_async(prepare: Callable[[], object], operate: Callable[[object], object]) -> Benchmark:
+    """Same as `consuming`, for coroutine functions. The loop is driven once per chunk, outside the timing."""
+    async def run_chunk(inputs: list) -> float:
+        start = time.perf_counter()
+        for item in inputs:
+            await operate(item)
+        return time.perf_counter() - start
+
+    def benchmark(n: int) -> float:
+        loop = asyncio.new_event_loop()
+        try:
+            return sum(loop.run_until_complete(run_chunk([prepare() for _ in range(size)])) for size in _chunks(n))
+        finally:
+            loop.close()
+
+    return benchmark
+
+
+def _chunks(n: int):
+    while n > 0:
+        yield min(n, CHUNK)
+        n -= CHUNK
+
+
+def run_suite(benchmarks: dict[str, Benchmark], selected: str | None = None, min_time: float = MIN_TIME) -> dict:
+    results = {}
+
+    for name, benchmark in benchmarks.items():
+        if selected and selected not in name:
+            continue
+
+        results[name] = measure(benchmark, min_time)
+        print(f"{name:<40}{format_ns(results[name]):>14}")
+
+    return results
+
+
+def format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def save_baseline(path: Path, results: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": {name: round(ns, 1) for name, ns in results.items()},
+    }
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints the comparison table and returns the names of the regressed benchmarks."""
+    regressions = []
+
+    print(f"\n{'benchmark':<40}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, ns in results.items():
+        if name not in baseline:
+            print(f"{name:<40}{'-':>14}{format_ns(ns):>14}{'new':>10}")
+            continue
+
+        change = ns / baseline[name] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+
+        print(f"{name:<40}{format_ns(baseline[name]):>14}{format_ns(ns):>14}{change:>+10.1%}{flag}")
+
+    return regressions
+
+
+def main(suite: str, benchmarks: dict[str, Benchmark], argv=None) -> int:
+    default_baseline = BASELINE_DIR / f"{suite}.json"
+
+    parser = argparse.ArgumentParser(description=f"{suite} benchmarks")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=default_baseline)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression (default 0.20 = 20%%)")
+    parser.add_argument("--filter", help="only run the benchmarks containing this string")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    args = parser.parse_args(argv)
+
+    results = run_suite(benchmarks, args.filter, args.min_time)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}, run with --save to create one")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), args.threshold)
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+
+    print(f"\nNo regression above {args.threshold:.0%}")
+    return 0
+
@@ -0,0 +1,82 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = ("fastapi", "starlette", "pydantic")
+
+# entry point of each kind of process, and the modules it imports at startup
+TARGETS = {
+    "cli": "backend.src.cli.main",
+    "simulator": "backend.src.bots.tournament",
+    "engine": "backend.src.engine.game_session",
+    "server": "backend.src.websockets.websocket_handler",
+}
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(elapsed, ",".join(name for name in {heavy} if name in sys.modules))
+"""
+
+"""
+Cold start benchmark: imports each entry point in a fresh interpreter, and reports the process wall time,
+the time spent importing the entry point, and which web-stack packages got loaded on the way.
+
+    python -m backend.benchmarks.import_bench
+    python -m backend.benchmarks.import_bench --runs 20 --json imports.json
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    process_times = []
+    import_times = []
+    loaded = ""
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        process_times.append(time.perf_counter() - started)
+
+        import_time, _, loaded = output.strip().partition(" ")
+        import_times.append(float(import_time))
+
+    return {
+        "module": module,
+        "process_ms": statistics.median(process_times) * 1000,
+        "import_ms": statistics.median(import_times) * 1000,
+        "web_stack": loaded.split(",") if loaded else [],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold start time of the entry points")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per entry point, the median is kept")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {name: measure(module, args.runs) for name, module in TARGETS.items()}
+
+    print(f"{'entry point':<12}{'process':>12}{'import':>12}  web stack loaded")
+    for name, result in results.items():
+        print(f"{name:<12}{result['process_ms']:>10.1f}ms{result['import_ms']:>10.1f}ms  "
+              f"{', '.join(result['web_stack']) or '-'}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
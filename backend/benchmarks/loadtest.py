@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosedOK
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+APP = "backend.src.websockets.websocket_handler:app"
+
+TEXT_PROMPTS = {
+    "Place your ships",
+    "Waiting for opponent to place their ships",
+    "Your turn",
+    "Waiting for opponent",
+    "Press Enter to exit",
+}
+
+"""
+End-to-end load generator.
+
+Starts the FastAPI app in a local uvicorn process, then plays N concurrent games with simulated client pairs over
+`/ws/json` or `/ws`: create, join, random placement, random shots until someone wins.
+Reports throughput, per-request latency percentiles and the server RSS. Everything runs on localhost.
+
+    python -m backend.benchmarks.loadtest --pairs 50 --games 4 --protocol json --max-p99-ms 50
+"""
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.moves = 0
+        self.games = 0
+        self.errors = 0
+
+    def record(self, kind: str, started: float):
+        self.latencies[kind].append(time.perf_counter() - started)
+
+
+class JsonPlayer:
+    def __init__(self, url: str, name: str, stats: Stats, rng: random.Random):
+        self.url = url
+        self.name = name
+        self.stats = stats
+        self.targets = [(r, c) for r in range(10) for c in range(10)]
+        rng.shuffle(self.targets)
+        self.pending: tuple[str, float] | None = None
+
+    async def play(self, code: asyncio.Future, creator: bool):
+        async with connect(self.url, max_size=None) as ws:
+            if creator:
+                await self._send(ws, "create", {"type": "create", "player_id": self.name})
+            else:
+                await self._send(ws, "join", {"type": "join", "player_id": self.name, "code": await code})
+
+            async for raw in ws:
+                message = json.loads(raw)
+
+                match message["type"]:
+                    case "game_created":
+                        self._done()
+                        code.set_result(message["code"])
+
+                    case "joined":
+                        self._done()
+
+                    case "game_ready":
+                        await self._send(ws, "place_random", {"type": "place_random", "override": False})
+
+                    case "notification":
+                        self._done()
+
+                    case "error":
+                        self.stats.errors += 1
+                        if self.pending and self.pending[0] == "fire":
+                            self._done()
+                            await self._fire(ws)
+
+                    case "state":
+                        if self.pending and self.pending[0] == "fire":
+                            self._done()
+
+                        if message["phase"] == "finished":
+                            return message["winner"]
+
+                        if message["phase"] == "in_progress" and message["currentPlayer"] == self.name \
+                                and self.pending is None:
+                            await self._fire(ws)
+
+    async def _fire(self, ws):
+        row, col = self.targets.pop()
+        self.stats.moves += 1
+        await self._send(ws, "fire", {"type": "fire", "row": row, "col": col})
+
+    async def _send(self, ws, kind: str, payload: dict):
+        self.pending = (kind, time.perf_counter())
+        await ws.send(json.dumps(payload))
+
+    def _done(self):
+        if self.pending is not None:
+            self.stats.record(*self.pending)
+            self.pending = None
+
+
+class TextPlayer(JsonPlayer):
+    def __init__(self, url: str, name: str, stats: Stats, rng: random.Random, poll_interval: float):
+        super().__init__(url, name, stats, rng)
+        self.poll_interval = poll_interval
+
+    async def play(self, code: asyncio.Future, creator: bool):
+        try:
+            await self._play(code, creator)
+        except ConnectionClosedOK:
+            # the server closes both sockets as soon as one player leaves the finished game
+            pass
+
+    async def _play(self, code: asyncio.Future, creator: bool):
+        async with connect(self.url, max_size=None) as ws:
+            await ws.recv()  # welcome message
+
+            if creator:
+                await self._send(ws, "create", "create")
+            else:
+                await self._send(ws, "join", f"join {await code}")
+
+            async for message in ws:
+                if message == "What name do you want to use?":
+                    await ws.send(self.name)
+
+                elif message.startswith("Game created"):
+                    self._done()
+                    code.set_result(message.rsplit(" ", 1)[1])
+
+                elif message.startswith("Joined game"):
+                    self._done()
+
+                elif message.startswith("Error:"):
+                    self.stats.errors += 1
+
+                elif message in TEXT_PROMPTS:
+                    self._done()
+                    await self._on_prompt(ws, message)
+
+                    if message == "Press Enter to exit":
+                        return None
+
+    async def _on_prompt(self, ws, prompt: str):
+        match prompt:
+            case "Place your ships":
+                await self._send(ws, "place_random", "place random")
+            case "Your turn":
+                row, col = self.targets.pop()
+                self.stats.moves += 1
+                await self._send(ws, "fire", f"fire {row} {col}")
+            case "Press Enter to exit":
+                await ws.send("")
+            case _:
+                # the text protocol is pull based, the waiting player has to ask for a refresh
+                await asyncio.sleep(self.poll_interval)
+                await self._send(ws, "view", "view")
+
+    async def _send(self, ws, kind: str, payload: str):
+        self.pending = (kind, time.perf_counter())
+        await ws.send(payload)
+
+
+async def play_pair(url: str, index: int, games: int, stats: Stats, args):
+    rng = random.Random(args.seed + index)
+
+    for game in range(games):
+        names = (f"p{index}-{game}-a", f"p{index}-{game}-b")
+        code = asyncio.get_running_loop().create_future()
+
+        if args.protocol == "json":
+            players = [JsonPlayer(url, name, stats, rng) for name in names]
+        else:
+            players = [TextPlayer(url, name, stats, rng, args.poll_interval) for name in names]
+
+        await asyncio.gather(players[0].play(code, creator=True), players[1].play(code, creator=False))
+        stats.games += 1
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, max_games: int, show_output: bool) -> subprocess.Popen:
+    env = {**os.environ, "BATTLESHIP_MAX_GAMES": str(max_games)}
+    output = None if show_output else subprocess.DEVNULL
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", APP, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env, stdout=output, stderr=output,
+    )
+
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/status", timeout=1).read()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            time.sleep(0.1)
+
+    server.kill()
+    raise RuntimeError("Server did not start in time")
+
+
+def server_memory(pid: int) -> dict:
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    memory[key] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+
+    return {"rss_bytes": memory.get("VmRSS"), "peak_rss_bytes": memory.get("VmHWM")}
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_report(stats: Stats, elapsed: float, memory: dict, args) -> dict:
+    every = [latency for latencies in stats.latencies.values() for latency in latencies]
+    latency = {}
+
+    for kind, values in sorted(stats.latencies.items()) + [("all", every)]:
+        if values:
+            latency[kind] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+            }
+
+    return {
+        "protocol": args.protocol,
+        "pairs": args.pairs,
+        "games": stats.games,
+        "moves": stats.moves,
+        "errors": stats.errors,
+        "elapsed_s": elapsed,
+        "games_per_s": stats.games / elapsed,
+        "moves_per_s": stats.moves / elapsed,
+        "latency": latency,
+        **memory,
+    }
+
+
+def print_report(report: dict):
+    print(f"protocol {report['protocol']}, {report['pairs']} pairs, {report['games']} games in "
+          f"{report['elapsed_s']:.2f}s ({report['errors']} errors)")
+    print(f"throughput: {report['moves_per_s']:.1f} moves/s, {report['games_per_s']:.2f} games/s")
+
+    if report["rss_bytes"] is not None:
+        print(f"server RSS: {report['rss_bytes'] / 2 ** 20:.1f} MiB (peak {report['peak_rss_bytes'] / 2 ** 20:.1f} MiB)")
+
+    print(f"{'request':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind, values in report["latency"].items():
+        print(f"{kind:<14}{values['count']:>8}{values['p50_ms']:>10.2f}{values['p95_ms']:>10.2f}{values['p99_ms']:>10.2f}")
+
+
+async def run(args) -> dict:
+    port = free_port()
+    server = start_server(port, args.pairs * args.games + 1, args.show_server_output)
+    path = "/ws/json" if args.protocol == "json" else "/ws"
+    url = f"ws://127.0.0.1:{port}{path}"
+    stats = Stats()
+
+    try:
+        started = time.perf_counter()
+        await asyncio.wait_for(
+            asyncio.gather(*(play_pair(url, i, args.games, stats, args) for i in range(args.pairs))),
+            timeout=args.timeout,
+        )
+        elapsed = time.perf_counter() - started
+        memory = server_memory(server.pid)
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    return build_report(stats, elapsed, memory, args)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Websocket load generator for battleship-ws")
+    parser.add_argument("--pairs", type=int, default=20, help="number of concurrent client pairs")
+    parser.add_argument("--games", type=int, default=1, help="games played by each pair, one after the other")
+    parser.add_argument("--protocol", choices=["json", "text"], default="json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--poll-interval", type=float, default=0.01, help="refresh interval of waiting text clients")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--show-server-output", action="store_true")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if the overall p99 latency is above this")
+    parser.add_argument("--min-moves-per-s", type=float, help="fail if the throughput is below this")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if args.max_p99_ms is not None and report["latency"]["all"]["p99_ms"] > args.max_p99_ms:
+        print(f"FAIL: p99 {report['latency']['all']['p99_ms']:.2f}ms > {args.max_p99_ms}ms")
+        failed = True
+    if args.min_moves_per_s is not None and report["moves_per_s"] < args.min_moves_per_s:
+        print(f"FAIL: {report['moves_per_s']:.1f} moves/s < {args.min_moves_per_s}")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import tracemalloc
+
+from backend.src.cli.batch_adapter import run_generated
+from backend.src.commands.commands import PlaceRandom, FireCommand
+from backend.src.engine.game_session import GameSession
+from backend.src.engine.rng import derive_seed
+
+DEFAULT_SESSIONS = 500
+MID_GAME_SHOTS = 40
+
+"""
+Capacity planning: measures the bytes retained by a GameSession in each stage of its life.
+
+Each stage is built for many sessions at once, and the memory they retain is measured with tracemalloc, so every
+object reachable from the sessions is counted (boards, ships, coordinates, log, cached ship statuses...).
+The states are built for both players like the server does, but the websocket connections are not part of it. The finished size is the one used for GameRegistry's SESSION_MEMORY_BYTES.
+
+    python -m backend.benchmarks.session_memory
+    python -m backend.benchmarks.session_memory --budget-mb 256
+"""
+
+
+async def idle_session(seed: int) -> GameSession:
+    """Created, waiting for the second player."""
+    session = GameSession(seed=seed)
+    await session.join("p1")
+    return session
+
+
+async def mid_game_session(seed: int) -> GameSession:
+    session = GameSession(seed=seed)
+    await session.join("p1")
+    await session.join("p2")
+    await session.handle_command("p1", PlaceRandom(place_all=False))
+    await session.handle_command("p2", PlaceRandom(place_all=False))
+
+    targets = [(r, c) for r in range(10) for c in range(10)]
+    session.game.rng.shuffle(targets)
+
+    for coord in targets[:MID_GAME_SHOTS // 2]:
+        for _ in range(2):
+            await session.handle_command(session.game.current_turn, FireCommand(coord))
+
+    return viewed(session)
+
+
+async def finished_session(seed: int) -> GameSession:
+    session = GameSession(seed=seed)
+    await run_generated(session, "memory", ("p1", "p2"))
+    return viewed(session)
+
+
+def viewed(session: GameSession) -> GameSession:
+    for player_id in session.players:
+        session.build_state(player_id)
+    return session
+
+
+STAGES = {
+    "idle": idle_session,
+    "mid-game": mid_game_session,
+    "finished": finished_session,
+}
+
+
+async def measure(build, count: int) -> int:
+    """Bytes retained per session."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    sessions = [await build(derive_seed(0, index)) for index in range(count)]
+
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    del sessions
+    return retained // count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bytes per GameSession, and the number of games fitting a budget")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="sessions built for each stage")
+    parser.add_argument("--budget-mb", type=float, action="append",
+                        help="memory budget to size (can be repeated, 64 and 512 MB by default)")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {stage: asyncio.run(measure(build, args.sessions)) for stage, build in STAGES.items()}
+    budgets = args.budget_mb or [64, 512]
+    worst = max(results.values())
+
+    print(f"{'stage':<12}{'bytes/session':>16}")
+    for stage, size in results.items():
+        print(f"{stage:<12}{size:>16,}")
+
+    print(f"\n{'budget':<12}{'max games':>16}")
+    for budget in budgets:
+        print(f"{f'{budget:g} MB':<12}{int(budget * 2 ** 20 // worst):>16,}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"bytes_per_session": results, "sessions": args.sessions}, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import random
+from abc import ABC, abstractmethod
+
+from backend.src.engine.board import Board
+from backend.src.engine.errors import Overlapping
+from backend.src.engine.placements import placement_table
+from backend.src.engine.ships import Coordinate
+from backend.src.engine.shot import ShotResult, ShotOutcome
+
+"""
+Bot strategies used by the tournament runner.
+
+A strategy is a placement policy and a firing policy working directly on the engine's Board.
+A new instance plays every game, with its own random generator, so it can keep its state in attributes.
+Third-party strategies subclass Strategy and are referenced as `module:Class`.
+"""
+
+
+class Strategy(ABC):
+    name = "strategy"
+
+    def __init__(self, size: int, rng: random.Random):
+        self.size = size
+        self.rng = rng
+
+    def place(self, board: Board):
+        """Places every ship of the board."""
+        place_randomly(board, self.rng)
+
+    @abstractmethod
+    def fire(self) -> Coordinate:
+        """The next shot."""
+
+    def observe(self, coord: Coordinate, result: ShotResult):
+        """Called with the result of every shot returned by fire."""
+
+
+def place_randomly(board: Board, rng: random.Random):
+    table = placement_table(board.size, (ship.size for ship in board.ships))
+
+    for ship in board.ships:
+        placements = table[ship.size]
+
+        while not ship.is_placed():
+            try:
+                board.place_ship(ship, *table.decode(placements[rng.randrange(len(placements))]))
+            except Overlapping:
+                continue
+
+
+class RandomStrategy(Strategy):
+    name = "random"
+
+    def __init__(self, size: int, rng: random.Random):
+        super().__init__(size, rng)
+        self.targets = [(r, c) for r in range(size) for c in range(size)]
+        rng.shuffle(self.targets)
+
+    def fire(self) -> Coordinate:
+        return self.targets.pop()
+
+
+class HuntTargetStrategy(RandomStrategy):
+    """Shoots randomly until a hit, then shoots around the hits until the ship is sunk."""
+    name = "hunt_target"
+
+    def __init__(self, size: int, rng: random.Random):
+        super().__init__(size, rng)
+        self.shot: set[Coordinate] = set()
+        self.stack: list[Coordinate] = []
+
+    def fire(self) -> Coordinate:
+        while self.stack:
+            coord = self.stack.pop()
+            if coord not in self.shot:
+                return coord
+
+        while True:
+            coord = self.hunt()
+            if coord not in self.shot:
+                return coord
+
+    def hunt(self) -> Coordinate:
+        return self.targets.pop()
+
+    def observe(self, coord: Coordinate, result: ShotResult):
+        self.shot.add(coord)
+
+        if result.outcome == ShotOutcome.HIT:
+            row, col = coord
+            for neighbour in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= neighbour[0] < self.size and 0 <= neighbour[1] < self.size and neighbour not in self.shot:
+                    self.stack.append(neighbour)
+
+
+class ParityStrategy(HuntTargetStrategy):
+    """Hunt and target, hunting only one colour of the checkerboard first: every ship covers at least one."""
+    name = "parity"
+
+    def __init__(self, size: int, rng: random.Random):
+        super().__init__(size, rng)
+        # the other colour is only shot at once the first one is exhausted
+        self.targets.sort(key=lambda coord: (coord[0] + coord[1]) % 2 == 0)
+
+
+BUILTIN_STRATEGIES: dict[str, type[Strategy]] = {
+    strategy.name: strategy for strategy in (RandomStrategy, HuntTargetStrategy, ParityStrategy)
+}
@@ -0,0 +1,249 @@
+import argparse
+import importlib
+import inspect
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from backend.src.bots.strategies import BUILTIN_STRATEGIES, Strategy
+from backend.src.engine.board import Board
+from backend.src.engine.errors import AlreadyShot, OutsideShot
+from backend.src.engine.rng import derive_seed
+from backend.src.engine.shot import ShotOutcome
+
+DEFAULT_GAMES = 2000
+CHUNK_SIZE = 500
+Z_95 = 1.96
+
+"""
+Tournament runner for bot strategies.
+
+Games are simulated directly on two engine Boards, without Game, GameSession or any event, and pairings are split
+in chunks of games that run on a process pool. Every game gets its seed from derive_seed, so a tournament replays
+exactly from its base seed, whatever the number of workers. The strategies alternate the first shot.
+
+    python -m backend.src.bots.tournament random hunt_target parity --games 5000
+    python -m backend.src.bots.tournament my_bots:Sniper parity --format swiss --rounds 4
+"""
+
+
+def load_strategy(spec: str) -> type[Strategy]:
+    """A built-in name, or `module:Class`."""
+    if spec in BUILTIN_STRATEGIES:
+        return BUILTIN_STRATEGIES[spec]
+
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown strategy {spec}, expected one of {', '.join(BUILTIN_STRATEGIES)} or module:Class")
+
+    strategy = getattr(importlib.import_module(module_name), class_name)
+    # checked here rather than in the workers of the pool, with a readable error
+    if not (isinstance(strategy, type) and issubclass(strategy, Strategy)) or inspect.isabstract(strategy):
+        raise ValueError(f"{spec} is not a Strategy implementing fire")
+
+    return strategy
+
+
+def play_game(first: type[Strategy], second: type[Strategy], seed: int, size: int = 10) -> tuple[int, int]:
+    """Returns the index of the winner (0 for `first`) and the number of shots. An illegal shot loses the game."""
+    strategies = [first(size, random.Random(derive_seed(seed, 0))), second(size, random.Random(derive_seed(seed, 1)))]
+    boards = [Board(size), Board(size)]
+
+    for strategy, board in zip(strategies, boards):
+        strategy.place(board)
+
+    ships_left = [len(boards[0].ships), len(boards[1].ships)]
+    shooter = 0
+    shots = 0
+
+    while True:
+        target = 1 - shooter
+        coord = strategies[shooter].fire()
+        shots += 1
+
+        try:
+            result = boards[target].receive_fire(coord)
+        except (AlreadyShot, OutsideShot):
+            return target, shots
+
+        strategies[shooter].observe(coord, result)
+
+        if result.outcome == ShotOutcome.SUNK:
+            ships_left[target] -= 1
+            if ships_left[target] == 0:
+                return shooter, shots
+
+        shooter = target
+
+
+def play_chunk(task: tuple[str, str, int, int, int]) -> tuple[int, int, int]:
+    """Process pool entry point: plays games `start` to `start + count` of a pairing, returns (wins a, wins b, shots)."""
+    spec_a, spec_b, seed, start, count = task
+    strategies = (load_strategy(spec_a), load_strategy(spec_b))
+    wins = [0, 0]
+    total_shots = 0
+
+    for index in range(start, start + count):
+        # alternate who shoots first, the first player has a small advantage
+        swap = index % 2
+        winner, shots = play_game(strategies[swap], strategies[1 - swap], derive_seed(seed, index))
+        wins[winner ^ swap] += 1
+        total_shots += shots
+
+    return wins[0], wins[1], total_shots
+
+
+@dataclass
+class Standing:
+    spec: str
+    wins: int = 0
+    games: int = 0
+    shots: int = 0
+    points: float = 0.0
+    opponents: set[str] = field(default_factory=set)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    def interval(self) -> tuple[float, float]:
+        return wilson_interval(self.wins, self.games)
+
+
+def wilson_interval(wins: int, games: int, z: float = Z_95) -> tuple[float, float]:
+    if games == 0:
+        return 0.0, 1.0
+
+    rate = wins / games
+    denominator = 1 + z * z / games
+    centre = (rate + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def round_robin(specs: list[str]) -> list[tuple[str, str]]:
+    return list(itertools.combinations(specs, 2))
+
+
+def swiss_round(standings: dict[str, Standing]) -> list[tuple[str, str]]:
+    """Pairs strategies with close scores, avoiding rematches when possible. With an odd count, the last one sits out."""
+    remaining = sorted(standings.values(), key=lambda s: (-s.points, -s.win_rate, s.spec))
+    pairs = []
+
+    while len(remaining) > 1:
+        player = remaining.pop(0)
+        opponent = next((s for s in remaining if s.spec not in player.opponents), remaining[0])
+        remaining.remove(opponent)
+        pairs.append((player.spec, opponent.spec))
+
+    return pairs
+
+
+class Tournament:
+    def __init__(self, specs: list[str], games: int = DEFAULT_GAMES, seed: int = 0, chunk_size: int = CHUNK_SIZE):
+        if len(set(specs)) < 2:
+            raise ValueError("A tournament needs at least two different strategies")
+
+        for spec in specs:
+            load_strategy(spec)
+
+        self.games = games
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.standings = {spec: Standing(spec) for spec in specs}
+        self.matches = 0
+
+    def tasks(self, pairs: list[tuple[str, str]]) -> list[tuple[str, str, int, int, int]]:
+        tasks = []
+
+        for spec_a, spec_b in pairs:
+            seed = derive_seed(self.seed, self.matches)
+            self.matches += 1
+
+            for start in range(0, self.games, self.chunk_size):
+                tasks.append((spec_a, spec_b, seed, start, min(self.chunk_size, self.games - start)))
+
+        return tasks
+
+    def play(self, pairs: list[tuple[str, str]], executor=None):
+        tasks = self.tasks(pairs)
+        results = executor.map(play_chunk, tasks) if executor else map(play_chunk, tasks)
+        pairing_wins: dict[tuple[str, str], list[int]] = {}
+
+        for (spec_a, spec_b, *_), (wins_a, wins_b, shots) in zip(tasks, results):
+            for spec, wins in ((spec_a, wins_a), (spec_b, wins_b)):
+                standing = self.standings[spec]
+                standing.wins += wins
+                standing.games += wins_a + wins_b
+                standing.shots += shots
+
+            totals = pairing_wins.setdefault((spec_a, spec_b), [0, 0])
+            totals[0] += wins_a
+            totals[1] += wins_b
+
+        for (spec_a, spec_b), (wins_a, wins_b) in pairing_wins.items():
+            a, b = self.standings[spec_a], self.standings[spec_b]
+            a.opponents.add(spec_b)
+            b.opponents.add(spec_a)
+            a.points += 1 if wins_a > wins_b else 0.5 if wins_a == wins_b else 0
+            b.points += 1 if wins_b > wins_a else 0.5 if wins_a == wins_b else 0
+
+    def round_robin(self, executor=None):
+        self.play(round_robin(list(self.standings)), executor)
+
+    def swiss(self, rounds: int, executor=None):
+        for _ in range(rounds):
+            self.play(swiss_round(self.standings), executor)
+
+    def ranking(self) -> list[Standing]:
+        return sorted(self.standings.values(), key=lambda s: (-s.points, -s.win_rate, s.spec))
+
+
+def print_ranking(ranking: list[Standing], elapsed: float):
+    games = sum(standing.games for standing in ranking) // 2
+
+    print(f"{'#':<4}{'strategy':<32}{'points':>8}{'games':>10}{'win rate':>10}{'95% CI':>18}{'shots/game':>12}")
+    for position, standing in enumerate(ranking, start=1):
+        low, high = standing.interval()
+        shots = standing.shots / standing.games if standing.games else 0
+        print(f"{position:<4}{standing.spec:<32}{standing.points:>8g}{standing.games:>10}{standing.win_rate:>10.1%}"
+              f"{f'{low:.1%} - {high:.1%}':>18}{shots:>12.1f}")
+
+    print(f"\n{games} games in {elapsed:.2f}s ({games / elapsed * 60:,.0f} games/min)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rank bot strategies against each other")
+    parser.add_argument("strategies", nargs="+", help=f"built-in ({', '.join(BUILTIN_STRATEGIES)}) or module:Class")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="games per pairing")
+    parser.add_argument("--format", choices=["round-robin", "swiss"], default="round-robin")
+    parser.add_argument("--rounds", type=int, default=3, help="number of swiss rounds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes, 1 plays in this process")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="games per task sent to a worker")
+    args = parser.parse_args(argv)
+
+    tournament = Tournament(args.strategies, args.games, args.seed, args.chunk_size)
+    started = time.perf_counter()
+
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+    try:
+        if args.format == "swiss":
+            tournament.swiss(args.rounds, executor)
+        else:
+            tournament.round_robin(executor)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    print_ranking(tournament.ranking(), time.perf_counter() - started)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
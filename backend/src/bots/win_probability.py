@@ -0,0 +1,284 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+
+from backend.src.engine.board import Board, SHOT_MISS, SHOT_HIT, NOT_SHOT
+from backend.src.engine.errors import WrongPhase, NotEnoughSamples
+from backend.src.engine.game import Game, GamePhase
+from backend.src.engine.placements import placement_table
+from backend.src.engine.rng import derive_seed
+
+DEFAULT_SAMPLES = 2000
+TIME_BUDGET = 0.5  # seconds, for the whole estimate
+MAX_WORKERS = 2
+MAX_LAYOUT_ATTEMPTS = 50
+# placements tried to explain the hits of a single layout, before giving up on it
+MAX_SEARCH_STEPS = 500
+# below this, an estimate is reported as an error rather than a number
+MIN_SAMPLES = 20
+CACHE_SIZE = 256
+# checking the clock is not free, the budget is checked every few samples
+CLOCK_CHECK_INTERVAL = 16
+
+"""
+Monte Carlo estimate of the win probability of a game in progress.
+
+Each sample draws a layout of the fleet of both players, consistent with what their opponent has seen of it
+(misses, hits, and the ships sunk, which are revealed), then plays the rest of the game with the hunt and target
+strategy: the player who needs fewer shots to sink the remaining ships wins, ties going to the player to move.
+
+Samples run on a process pool with a time budget, so the event loop keeps serving the games, and the result is
+cached for the versions of both boards: asking again before the next shot is free.
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Observation:
+    """What a player knows of the enemy board."""
+    size: int
+    shots: bytes
+    remaining: tuple[int, ...]  # sizes of the ships still afloat
+    sunk: frozenset[int]  # cells of the sunk ships
+
+    @classmethod
+    def of(cls, board: Board) -> "Observation":
+        return cls(
+            size=board.size,
+            shots=bytes(board.shots),
+            remaining=tuple(ship.size for ship in board.ships if not ship.is_sunk()),
+            sunk=frozenset(r * board.size + c for ship in board.ships if ship.is_sunk() for r, c in ship.positions),
+        )
+
+
+class LayoutSampler:
+    """Draws fleet layouts consistent with an observation, and the shots needed to sink them."""
+
+    def __init__(self, observation: Observation):
+        size = observation.size
+        self.observation = observation
+        self.steps_left = MAX_SEARCH_STEPS
+        self.open_hits = frozenset(cell for cell, shot in enumerate(observation.shots)
+                                   if shot == SHOT_HIT and cell not in observation.sunk)
+        self.unshot = [cell for cell, shot in enumerate(observation.shots) if shot == NOT_SHOT]
+        self.neighbours = [
+            [r * size + c for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+             if 0 <= r < size and 0 <= c < size]
+            for row in range(size) for col in range(size)
+        ]
+
+        blocked = {cell for cell, shot in enumerate(observation.shots) if shot == SHOT_MISS} | observation.sunk
+        hits = {cell for cell, shot in enumerate(observation.shots) if shot == SHOT_HIT}
+
+        # the positions where each ship size fits, and the ones covering each cell
+        table = placement_table(size, observation.remaining)
+        self.fits: dict[int, list[frozenset[int]]] = {}
+        self.covering: dict[int, dict[int, list[frozenset[int]]]] = {}
+        for ship_size in set(observation.remaining):
+            fits = []
+            for placement in table[ship_size]:
+                cells = frozenset(table.cells(placement, ship_size))
+                # a ship entirely hit would have been reported sunk
+                if cells.isdisjoint(blocked) and not cells <= hits:
+                    fits.append(cells)
+
+            self.fits[ship_size] = fits
+            covering = self.covering[ship_size] = {}
+            for cells in fits:
+                for cell in cells & self.open_hits:
+                    covering.setdefault(cell, []).append(cells)
+
+    def sample(self, rng: random.Random) -> set[int] | None:
+        """The cells of the ships still afloat, or None when no layout was found within MAX_SEARCH_STEPS."""
+        self.steps_left = MAX_SEARCH_STEPS
+        return self._cover(frozenset(), list(self.observation.remaining), self.open_hits, rng)
+
+    def _cover(self, occupied: frozenset[int], unplaced: list[int], uncovered: frozenset[int],
+               rng: random.Random) -> set[int] | None:
+        """The ships explaining the hits first, backtracking on dead ends, then the others anywhere they fit."""
+        if not uncovered:
+            return self._place_rest(set(occupied), unplaced, rng)
+
+        self.steps_left -= 1
+        if self.steps_left < 0:
+            return None
+
+        # the hit with the fewest ships that can explain it, a dead end is found early
+        best = None
+        for target in uncovered:
+            candidates = [(ship_size, cells) for ship_size in set(unplaced)
+                          for cells in self.covering[ship_size].get(target, ()) if occupied.isdisjoint(cells)]
+            if best is None or len(candidates) < len(best):
+                best = candidates
+                if not best:
+                    return None
+
+        rng.shuffle(best)
+        for ship_size, cells in best:
+            rest = unplaced[:]
+            rest.remove(ship_size)
+
+            ships = self._cover(occupied | cells, rest, uncovered - cells, rng)
+            if ships is not None or self.steps_left < 0:
+                return ships
+
+        return None
+
+    def _place_rest(self, occupied: set[int], unplaced: list[int], rng: random.Random) -> set[int] | None:
+        for ship_size in unplaced:
+            fits = self.fits[ship_size]
+            for _ in range(MAX_LAYOUT_ATTEMPTS):
+                cells = rng.choice(fits) if fits else None
+                if cells is None or occupied.isdisjoint(cells):
+                    break
+            else:
+                candidates = [cells for cells in fits if occupied.isdisjoint(cells)]
+                cells = rng.choice(candidates) if candidates else None
+
+            if cells is None:
+                return None
+            occupied |= cells
+
+        return occupied
+
+    def shots_needed(self, rng: random.Random) -> int | None:
+        """None when no layout matching the observation was found, the sample is then dropped."""
+        for _ in range(MAX_LAYOUT_ATTEMPTS):
+            ships = self.sample(rng)
+            if ships is not None:
+                return self.hunt(ships - self.open_hits, rng)
+
+        return None
+
+    def hunt(self, targets: set[int], rng: random.Random) -> int:
+        """Shots to hit every target cell, shooting at random until a hit and then around the hits."""
+        shot = bytearray(self.observation.shots)
+        order = self.unshot[:]
+        rng.shuffle(order)
+        stack = [neighbour for cell in self.open_hits for neighbour in self.neighbours[cell] if not shot[neighbour]]
+        left = len(targets)
+        shots = 0
+
+        while left:
+            cell = stack.pop() if stack else order.pop()
+            if shot[cell]:
+                continue
+
+            shot[cell] = SHOT_HIT
+            shots += 1
+
+            if cell in targets:
+                left -= 1
+                stack.extend(neighbour for neighbour in self.neighbours[cell] if not shot[neighbour])
+
+        return shots
+
+
+def estimate_chunk(task: tuple[Observation, Observation, int, float, int]) -> tuple[int, int]:
+    """
+    Process pool entry point. `first` is what the player to move knows of the enemy board, `second` what their
+    opponent knows of theirs. Returns (wins of the player to move, samples played), the samples without a layout
+    matching both observations are not played.
+    """
+    first, second, samples, budget, seed = task
+    rng = random.Random(seed)
+    deadline = time.monotonic() + budget
+    samplers = LayoutSampler(first), LayoutSampler(second)
+    wins = played = 0
+
+    for drawn in range(samples):
+        if drawn % CLOCK_CHECK_INTERVAL == 0 and drawn and time.monotonic() > deadline:
+            break
+
+        first_shots = samplers[0].shots_needed(rng)
+        second_shots = samplers[1].shots_needed(rng) if first_shots is not None else None
+        if second_shots is None:
+            continue
+
+        wins += first_shots <= second_shots
+        played += 1
+
+    return wins, played
+
+
+class WinProbability:
+    """Estimates of the games of a server, cached by board versions and computed on a process pool."""
+
+    def __init__(self, samples: int = DEFAULT_SAMPLES, budget: float = TIME_BUDGET, workers: int | None = None,
+                 executor: Executor | None = None):
+        self.samples = samples
+        self.budget = budget
+        self.workers = workers or min(MAX_WORKERS, os.cpu_count() or 1)
+        # a process pool is created on the first estimate, unless an executor is given
+        self.executor = executor
+        self.cache: OrderedDict[tuple, dict] = OrderedDict()
+        self.pending: dict[tuple, asyncio.Future] = {}
+
+    async def estimate(self, code: str, game: Game) -> dict:
+        """`probabilities` of each player, the number of `samples`, and whether the estimate was `cached`."""
+        if game.phase == GamePhase.FINISHED:
+            return {
+                "probabilities": {player_id: float(player_id == game.winner) for player_id in game.boards},
+                "samples": 0,
+                "cached": True,
+            }
+
+        if game.current_turn is None:
+            raise WrongPhase("The game has not started yet")
+
+        key = (code, game.seed, *(board.version for board in game.boards.values()))
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return {**self.cache[key], "cached": True}
+
+        # several clients asking at the same time share the same computation
+        if key not in self.pending:
+            self.pending[key] = asyncio.ensure_future(self._compute(game, key))
+
+        try:
+            result = await asyncio.shield(self.pending[key])
+        finally:
+            self.pending.pop(key, None)
+
+        self.cache[key] = result
+        while len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+        return {**result, "cached": False}
+
+    async def _compute(self, game: Game, key: tuple) -> dict:
+        first = game.current_turn
+        second = game.get_opponent(first)
+        # the observations are copied now, the game can go on while the workers run
+        observations = Observation.of(game.boards[second]), Observation.of(game.boards[first])
+        seed = derive_seed(game.seed, sum(key[2:]))
+
+        if self.executor is None:
+            # spawned workers only import the engine, and don't inherit the server's threads and sockets
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, estimate_chunk,
+                                 (*observations, -(-self.samples // self.workers), self.budget, derive_seed(seed, index)))
+            for index in range(self.workers)
+        ))
+
+        wins = sum(chunk_wins for chunk_wins, _ in chunks)
+        played = sum(chunk_played for _, chunk_played in chunks)
+        if played < MIN_SAMPLES:
+            raise NotEnoughSamples(f"Not enough samples for an estimate ({played} of {self.samples})")
+
+        probability = wins / played
+
+        return {"probabilities": {first: round(probability, 4), second: round(1 - probability, 4)}, "samples": played}
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,133 @@
+import time
+from dataclasses import dataclass, field
+
+from backend.src.commands.command_parser import parse_command
+from backend.src.commands.commands import PlaceRandom, FireCommand
+from backend.src.engine.errors import CommandParseError
+from backend.src.engine.game import GamePhase, PlayerId
+from backend.src.engine.game_session import GameSession
+
+"""
+Headless adapter: runs whole games through GameSession.handle_command without any terminal I/O.
+
+Games are either replayed from a script, or generated from a seed (random placement and random shots).
+Everything random comes from the game's own generator, so a seed and a script always replay the same game.
+A script has one `<player> <command>` per line, players join in order of appearance:
+
+    # comments and empty lines are ignored
+    alice place random
+    bob place random
+    alice fire 3 4
+"""
+
+
+@dataclass
+class GameSummary:
+    name: str
+    seed: int
+    phase: GamePhase
+    winner: PlayerId | None = None
+    moves: int = 0
+    errors: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def parse_script(lines: list[str]) -> list[tuple[int, PlayerId, str]]:
+    steps = []
+
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        parts = line.split(maxsplit=1)
+        if len(parts) != 2:
+            raise CommandParseError(f"Line {number}: expected '<player> <command>'")
+
+        steps.append((number, parts[0], parts[1]))
+
+    return steps
+
+
+async def run_script(session: GameSession, name: str, lines: list[str]) -> GameSummary:
+    started = time.perf_counter()
+    steps = parse_script(lines)
+    summary = GameSummary(name=name, seed=session.game.seed, phase=session.game.phase)
+
+    for _, player_id, _ in steps:
+        if player_id not in session.players:
+            await session.join(player_id)
+
+    for number, player_id, raw in steps:
+        try:
+            command = parse_command(raw)
+        except (CommandParseError, ValueError) as e:
+            summary.errors.append(f"line {number}: {e}")
+            continue
+
+        response = await session.handle_command(player_id, command)
+        summary.moves += 1
+
+        if response["status"] == "error":
+            summary.errors.append(f"line {number}: {response['message']}")
+
+    return _finish(summary, session, started)
+
+
+async def run_generated(session: GameSession, name: str,
+                        players: tuple[PlayerId, PlayerId] = ("p1", "p2")) -> GameSummary:
+    started = time.perf_counter()
+    rng = session.game.rng
+    summary = GameSummary(name=name, seed=session.game.seed, phase=session.game.phase)
+    size = session.game.size
+
+    targets = {}
+    for player_id in players:
+        await session.join(player_id)
+        targets[player_id] = [(r, c) for r in range(size) for c in range(size)]
+        rng.shuffle(targets[player_id])
+
+    for player_id in players:
+        response = await session.handle_command(player_id, PlaceRandom(place_all=False))
+        if response["status"] == "error":
+            summary.errors.append(f"{player_id}: {response['message']}")
+
+    while session.game.phase == GamePhase.IN_PROGRESS:
+        player_id = session.game.current_turn
+        response = await session.handle_command(player_id, FireCommand(targets[player_id].pop()))
+        summary.moves += 1
+
+        if response["status"] == "error":
+            summary.errors.append(f"{player_id}: {response['message']}")
+            break
+
+    return _finish(summary, session, started)
+
+
+def _finish(summary: GameSummary, session: GameSession, started: float) -> GameSummary:
+    summary.phase = session.game.phase
+    summary.winner = session.game.winner
+    summary.elapsed = time.perf_counter() - started
+    return summary
+
+
+def print_summary(summaries: list[GameSummary], elapsed: float, verbose: bool = False):
+    finished = [s for s in summaries if s.phase == GamePhase.FINISHED]
+    moves = sum(s.moves for s in summaries)
+    errors = sum(len(s.errors) for s in summaries)
+
+    wins: dict[PlayerId, int] = {}
+    for summary in finished:
+        wins[summary.winner] = wins.get(summary.winner, 0) + 1
+
+    if verbose:
+        for summary in summaries:
+            print(f"{summary.name} (seed {summary.seed}): {summary.phase.value}, winner {summary.winner}, "
+                  f"{summary.moves} moves, {summary.elapsed * 1000:.2f} ms")
+            for error in summary.errors:
+                print(f"    {error}")
+
+    print(f"Games: {len(summaries)} ({len(finished)} finished)")
+    print(f"Moves: {moves} ({moves / max(len(summaries), 1):.1f} per game), errors: {errors}")
+    print("Wins: " + ", ".join(f"{player} {count}" for player, count in sorted(wins.items())))
+    print(f"Time: {elapsed:.3f}s ({len(summaries) / elapsed:.1f} games/s, {moves / elapsed:.0f} moves/s)")
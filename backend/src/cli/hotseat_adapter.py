@@ -3,7 +3,7 @@ import os
 from backend.src.shared.render import render_grid
 from backend.src.commands.command_parser import parse_command
 from backend.src.engine.errors import CommandParseError
-from backend.src.engine.game import GamePhase
+from backend.src.engine.game import GamePhase, PlayerId
 from backend.src.engine.game_session import GameSession
 
 
@@ -12,8 +12,7 @@ def clear():
 
 
 # TODO peut-être render le UI un peu plus beau, avec le nom des colonnes
-async def hotseat(session: GameSession):
-    players = ["Guillaume", "Mariko"]
+async def hotseat(session: GameSession, players: list[PlayerId]):
 
     for pid in players:
         await session.join(pid)
@@ -50,6 +49,7 @@ async def hotseat(session: GameSession):
                 print("""
             Commands:
               place <ship> <row> <col> <h|v>
+              place fleet <ship> <row> <col> <h|v> <ship> <row> <col> <h|v> ...
               fire <row> <col>
               start
               view
@@ -1,13 +1,51 @@
+import argparse
 import asyncio
+import time
 
+from backend.src.cli.batch_adapter import run_script, run_generated, print_summary
 from backend.src.cli.hotseat_adapter import hotseat
 from backend.src.engine.game_session import GameSession
+from backend.src.engine.rng import derive_seed
 
 
-async def main():
+async def main(args):
+    if args.script or args.games:
+        await batch(args)
+        return
+
     session = GameSession(dev=True)
-    await hotseat(session)
+    await hotseat(session, args.players)
+
+
+async def batch(args):
+    started = time.perf_counter()
+    summaries = []
+
+    for path in args.script or []:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+
+        summaries.append(await run_script(GameSession(dev=args.dev, seed=args.seed), path, lines))
+
+    for index in range(args.games):
+        session = GameSession(dev=args.dev, seed=derive_seed(args.seed or 0, index))
+        summaries.append(await run_generated(session, f"game {index}", tuple(args.players)))
+
+    print_summary(summaries, time.perf_counter() - started, args.verbose)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Battleship in the terminal")
+    parser.add_argument("--players", nargs=2, default=["Guillaume", "Mariko"], metavar=("P1", "P2"))
+    parser.add_argument("--script", nargs="+", metavar="FILE",
+                        help="replay game scripts (one '<player> <command>' per line) without any prompt")
+    parser.add_argument("--games", type=int, default=0, help="play this many generated games without any prompt")
+    parser.add_argument("--seed", type=int,
+                        help="seed of the scripted games, or base seed of the generated games (0 by default)")
+    parser.add_argument("--dev", action="store_true", help="use the small test fleet in batch mode")
+    parser.add_argument("--verbose", action="store_true", help="print every game and its errors in batch mode")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
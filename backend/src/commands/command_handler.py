@@ -1,4 +1,6 @@
-from backend.src.commands.commands import Command, PlaceShipCommand, FireCommand, StartGameCommand, PlaceRandom
+from backend.src.commands.commands import Command, PlaceShipCommand, FireCommand, StartGameCommand, PlaceRandom, \
+    PlaceFleetCommand
+from backend.src.diagnostics.tracing import traced
 from backend.src.engine.errors import CommandNotFoundError, InvalidShipName
 from backend.src.engine.game import PlayerId, Game
 
@@ -12,6 +14,7 @@ class CommandHandler:
     def __init__(self, game: Game):
         self.game = game
 
+    @traced("CommandHandler.execute")
     async def execute(self, player_id: PlayerId, command: Command) -> dict:
         match command:
             case PlaceShipCommand(ship_name, start, horizontal):
@@ -23,6 +26,10 @@ class CommandHandler:
                 self.game.place_ship(player_id, ship, start, horizontal)
                 return {"status": "ok", "type": "ship_placed"}
 
+            case PlaceFleetCommand(placements):
+                self.game.place_fleet(player_id, placements)
+                return {"status": "ok", "type": "fleet_placed"}
+
             case PlaceRandom(place_all):
                 await self.game.place_random(player_id, place_all)
                 return {"status": "ok", "type": "ship_placed"}
@@ -1,7 +1,10 @@
-from backend.src.commands.commands import Command, PlaceShipCommand, FireCommand, StartGameCommand, PlaceRandom
+from backend.src.commands.commands import Command, PlaceShipCommand, FireCommand, StartGameCommand, PlaceRandom, \
+    PlaceFleetCommand
+from backend.src.diagnostics.tracing import traced
 from backend.src.engine.errors import CommandParseError
 
 
+@traced("parse_command")
 def parse_command(raw: str) -> Command:
     parts = raw.strip().split()
 
@@ -10,6 +13,9 @@ def parse_command(raw: str) -> Command:
 
     match parts[0].lower():
         case "place":
+            if len(parts) > 1 and parts[1].lower() == "fleet":
+                return _parse_fleet(parts[2:])
+
             if len(parts) == 5:
                 _, name, r, c, orientation = parts
 
@@ -29,7 +35,8 @@ def parse_command(raw: str) -> Command:
                 return PlaceRandom(place_all=place_all)
 
             raise CommandParseError(
-                "Usage of place command: \n\tplace <ship name> <row number> <col number> <orientation (h|v)>\n\tplace random (all)")
+                "Usage of place command: \n\tplace <ship name> <row number> <col number> <orientation (h|v)>\n\tplace random (all)"
+                "\n\tplace fleet (<ship name> <row number> <col number> <orientation (h|v)>)...")
 
         case "fire":
             if len(parts) != 3:
@@ -46,3 +53,17 @@ def parse_command(raw: str) -> Command:
 
         case _:
             raise CommandParseError(f"Unknown command: {parts[0]}")
+
+
+def _parse_fleet(parts: list[str]) -> PlaceFleetCommand:
+    if not parts or len(parts) % 4:
+        raise CommandParseError("Usage of place fleet command: place fleet (<ship name> <row number> <col number> "
+                                "<orientation (h|v)>)...")
+
+    try:
+        return PlaceFleetCommand(tuple(
+            (name, (int(r), int(c)), orientation.lower() == "h")
+            for name, r, c, orientation in zip(*[iter(parts)] * 4)
+        ))
+    except ValueError:
+        raise CommandParseError("Rows and columns must be numbers") from None
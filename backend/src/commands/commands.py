@@ -12,6 +12,13 @@ class PlaceShipCommand:
     horizontal: bool
 
 
+# example: place fleet carrier 0 0 h battleship 1 0 h cruiser 2 0 h submarine 3 0 h destroyer 4 0 h
+@dataclass(frozen=True)
+class PlaceFleetCommand:
+    # (ship name, start, horizontal) of every ship
+    placements: tuple[tuple[str, Coordinate, bool], ...]
+
+
 # example: place random (all)
 @dataclass(frozen=True)
 class PlaceRandom:
@@ -29,4 +36,4 @@ class StartGameCommand:
     pass
 
 
-Command = Union[PlaceShipCommand, PlaceRandom, FireCommand, StartGameCommand]
+Command = Union[PlaceShipCommand, PlaceFleetCommand, PlaceRandom, FireCommand, StartGameCommand]
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+LOG_DIR_ENV = "BATTLESHIP_LOG_DIR"
+LOG_FILE_NAME = "battleship.jsonl"
+MAX_QUEUED_RECORDS = 10_000
+FLUSH_INTERVAL = 0.5  # seconds
+MAX_FILE_BYTES = 16 * 2 ** 20
+BACKUP_COUNT = 5
+
+"""
+Structured server log and game journal, written in the background.
+
+`log_writer.log(event, **fields)` only appends a record to a bounded in-memory queue: when the writer falls
+behind, new records are dropped and counted rather than growing the queue. A task takes the whole queue every
+FLUSH_INTERVAL, and a worker thread serializes it and writes it as JSON lines with a single write and flush.
+The records go to BATTLESHIP_LOG_DIR/battleship.jsonl, rotated by size like logging's RotatingFileHandler
+(battleship.jsonl.1 ... .5), or to stdout when the variable is not set.
+
+Until the writer is started, logging a record costs a single `log_writer.enabled` check, so the CLI and the
+simulators never keep records.
+"""
+
+
+class LogWriter:
+    def __init__(self, max_queued: int = MAX_QUEUED_RECORDS, interval: float = FLUSH_INTERVAL,
+                 max_bytes: int = MAX_FILE_BYTES, backups: int = BACKUP_COUNT):
+        self.max_queued = max_queued
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enabled = False
+        self.path: str | None = None
+        self.queue: list[dict] = []
+        self.task: asyncio.Task | None = None
+        self.wakeup: asyncio.Event | None = None
+        self.stats = {"written": 0, "dropped": 0, "batches": 0}
+
+    def start(self, directory: str | None = None):
+        """Starts the writer task, writing to `directory` (stdout if None)."""
+        self.path = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.path = os.path.join(directory, LOG_FILE_NAME)
+
+        self.enabled = True
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    def log(self, event: str, **fields):
+        if not self.enabled:
+            return
+
+        if len(self.queue) >= self.max_queued:
+            self.stats["dropped"] += 1
+            return
+
+        self.queue.append({"ts": time.time(), "event": event, **fields})
+
+    async def close(self):
+        """Writes what is queued and stops the task."""
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        self.wakeup.set()
+        await self.task
+
+    async def _run(self):
+        while self.enabled:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+            await self.flush()
+
+        await self.flush()
+
+    async def flush(self):
+        if not self.queue:
+            return
+
+        batch, self.queue = self.queue, []
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except OSError as e:
+            # the log must never take the server down, the batch is lost
+            self.stats["dropped"] += len(batch)
+            sys.stderr.write(f"Could not write {len(batch)} log records: {e}\n")
+            return
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    def _write(self, batch: list[dict]):
+        data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+
+        if self.path is None:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+            return
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+            self._rotate()
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+log_writer = LogWriter()
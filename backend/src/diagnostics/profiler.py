@@ -0,0 +1,179 @@
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from backend.src.engine.errors import ProfilingError
+
+# (filename, first line of the function, function name), the same key pstats uses
+Frame = tuple[str, int, str]
+
+MAX_PROFILE_SECONDS = 120
+DEFAULT_INTERVAL = 0.005
+MIN_INTERVAL = 0.001
+
+"""
+Sampling CPU profiler and tracemalloc helpers used by the admin endpoints.
+
+Nothing runs until a window is started: the CPU sampler is a daemon thread that reads the
+event loop thread's stack every interval, so the loop itself is never paused or instrumented.
+Every window is bounded by MAX_PROFILE_SECONDS.
+"""
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.samples: Counter[tuple[Frame, ...]] = Counter()
+        self.interval = DEFAULT_INTERVAL
+        self.started_at: float | None = None
+        self.stopped_at: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, thread_id: int, seconds: float, interval: float = DEFAULT_INTERVAL):
+        if self.is_running():
+            raise ProfilingError("CPU profiler is already running")
+
+        seconds = clamp_window(seconds)
+        self.interval = max(interval, MIN_INTERVAL)
+        self.samples = Counter()
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._stop.clear()
+
+        deadline = time.monotonic() + seconds
+        self._thread = threading.Thread(target=self._run, args=(thread_id, deadline), name="battleship-profiler",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, thread_id: int, deadline: float):
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+
+            stack.reverse()
+            self.samples[tuple(stack)] += 1
+
+        self.stopped_at = time.time()
+
+    def _require_results(self):
+        if self.is_running():
+            raise ProfilingError("CPU profiler is still running, stop it first")
+        if not self.samples:
+            raise ProfilingError("No CPU samples collected")
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, one `root;...;leaf count` line per unique stack."""
+        self._require_results()
+
+        lines = []
+        for stack, count in self.samples.most_common():
+            frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack)
+            lines.append(f"{frames} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def pstats(self) -> bytes:
+        """Marshalled stats loadable with `pstats.Stats(path)`, times are estimated from the sample counts."""
+        self._require_results()
+
+        stats: dict[Frame, list] = {}
+
+        for stack, count in self.samples.items():
+            elapsed = count * self.interval
+            leaf = stack[-1]
+
+            for frame in set(stack):
+                entry = stats.setdefault(frame, [0, 0, 0.0, 0.0, {}])
+                entry[0] += count
+                entry[1] += count
+                entry[3] += elapsed
+
+            stats[leaf][2] += elapsed
+
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers = stats[callee][4]
+                nc, cc, tt, ct = callers.get(caller, (0, 0, 0.0, 0.0))
+                callers[caller] = (nc + count, cc + count, tt + (elapsed if callee == leaf else 0.0), ct + elapsed)
+
+        return marshal.dumps({frame: tuple(entry) for frame, entry in stats.items()})
+
+
+class MemoryProfiler:
+    def __init__(self):
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self.previous: tracemalloc.Snapshot | None = None
+
+    @staticmethod
+    def is_running() -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25):
+        if tracemalloc.is_tracing():
+            raise ProfilingError("tracemalloc is already running")
+
+        self.snapshot = None
+        self.previous = None
+        tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def take_snapshot(self, limit: int = 20) -> dict:
+        if not tracemalloc.is_tracing():
+            raise ProfilingError("tracemalloc is not running")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+        self.previous, self.snapshot = self.snapshot, snapshot
+
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top": [str(stat) for stat in snapshot.statistics("lineno")[:limit]],
+            "diff": [],
+        }
+
+        if self.previous is not None:
+            result["diff"] = [str(stat) for stat in snapshot.compare_to(self.previous, "lineno")[:limit]]
+
+        return result
+
+    def dump(self, path: str):
+        if self.snapshot is None:
+            raise ProfilingError("No memory snapshot taken")
+
+        self.snapshot.dump(path)
+
+
+def clamp_window(seconds: float) -> float:
+    """The length of a profiling window, between 0 and MAX_PROFILE_SECONDS."""
+    return min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+
+
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
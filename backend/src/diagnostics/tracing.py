@@ -0,0 +1,148 @@
+import inspect
+import json
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+
+TRACE_FILE_ENV = "BATTLESHIP_TRACE_FILE"
+MAX_TRACE_EVENTS = 200_000
+
+"""
+Optional span tracing along the command path, exported in the Chrome trace-event format
+(open the file in chrome://tracing or https://ui.perfetto.dev).
+
+Every game gets its own lane (tid), spans are tagged with the game code and player bound to the current
+connection. When the tracer is disabled, a traced call costs a single `tracer.enabled` check.
+"""
+
+_tags: ContextVar[dict | None] = ContextVar("trace_tags", default=None)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path: str | None = None
+        self.events: deque[dict] = deque(maxlen=MAX_TRACE_EVENTS)
+        self._lanes: dict[str, int] = {}
+        self._origin = time.perf_counter_ns()
+
+    def start(self, path: str):
+        self.path = path
+        self.events.clear()
+        self._lanes.clear()
+        self._origin = time.perf_counter_ns()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    @staticmethod
+    def bind(code: str | None, player: str | None):
+        """Tags every span recorded from the current task (i.e. the current connection)."""
+        _tags.set({"game": code, "player": player})
+
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, args)
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict):
+        tags = _tags.get() or {}
+        game = tags.get("game")
+
+        self.events.append({
+            "name": name,
+            "cat": "battleship",
+            "ph": "X",
+            "ts": (start_ns - self._origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": self._lane(game),
+            "args": {**tags, **args},
+        })
+
+    def _lane(self, game: str | None) -> int:
+        if game is None:
+            return 0
+
+        lane = self._lanes.get(game)
+        if lane is None:
+            lane = self._lanes[game] = len(self._lanes) + 1
+        return lane
+
+    def write(self, path: str | None = None) -> str:
+        path = path or self.path
+        pid = os.getpid()
+
+        metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "no game"}}]
+        metadata += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": lane, "args": {"name": f"game {game}"}}
+            for game, lane in self._lanes.items()
+        ]
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}, f)
+
+        return path
+
+
+tracer = Tracer()
+
+
+def traced(name: str):
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await fn(*args, **kwargs)
+
+                with Span(tracer, name, {}):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+
+            with Span(tracer, name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
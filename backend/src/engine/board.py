@@ -1,6 +1,8 @@
+from collections.abc import Iterable
 from enum import Enum
 
-from backend.src.engine.errors import ShipAlreadyPlaced, InvalidPlacement, Overlapping, OutsideShot, AlreadyShot
+from backend.src.engine.errors import ShipAlreadyPlaced, InvalidPlacement, Overlapping, OutsideShot, AlreadyShot, \
+    InvalidFleet
 from backend.src.engine.ships import Ship, Coordinate, standard_ships
 from backend.src.engine.shot import ShotResult, ShotOutcome
 
@@ -12,22 +14,42 @@ class CellState(str, Enum):
     MISS = 3
 
 
+NOT_SHOT = 0
+SHOT_MISS = 1
+SHOT_HIT = 2
+
+
 """
 This class represents the board.
 
 They keep track of shots and ships placement.
 They can also render themselves
+
+Shots are kept in a bytearray (one byte per cell, row-major, NOT_SHOT / SHOT_MISS / SHOT_HIT) rather than a set
+of coordinates, a board is kept in memory for the whole life of a game.
+
+The status of the ships (plain JSON-ready dicts, see _ship_status) is cached until the next placement or hit, and
+the number of sunk ships is counted as they sink.
+
+A board round-trips through a JSON-ready snapshot (ships and shots) to survive a server restart, the derived state
+(occupied cells, sunk count, statuses cache) is rebuilt from it.
 """
 
 
 class Board:
+    __slots__ = ("size", "ships", "occupied", "shots", "sunk_count", "version", "_statuses")
+
     def __init__(self, size=10, ships=None):
         if ships is None:
             ships = standard_ships()
         self.size = size
         self.ships = ships
         self.occupied: set[Coordinate] = set()
-        self.shots_taken: set[Coordinate] = set()
+        self.shots = bytearray(size * size)
+        self.sunk_count = sum(1 for ship in ships if ship.is_sunk())
+        # bumped by every placement and shot, for the caches of derived data
+        self.version = 0
+        self._statuses: list[dict] | None = None
 
     def place_ship(self, ship: Ship, start: Coordinate, horizontal: bool):
         if ship.is_placed():
@@ -44,6 +66,63 @@ class Board:
 
         ship.place(positions)
         self.occupied.update(positions)
+        self.version += 1
+        self._statuses = None
+
+    def place_fleet(self, layout: Iterable[tuple[str, Coordinate, bool]]):
+        """
+        Places every ship not placed yet, from (ship name, start, horizontal), or none of them: InvalidFleet has
+        what is wrong with each ship.
+        """
+        errors: dict[str, str] = {}
+        placements: list[tuple[Ship, set[Coordinate]]] = []
+        # cell -> name of the ship of the layout covering it
+        claimed: dict[Coordinate, str] = {}
+        named: set[str] = set()
+
+        for name, start, horizontal in layout:
+            ship = self.get_ship_by_name(name)
+
+            if ship is None:
+                errors[name] = "no such ship"
+                continue
+
+            if ship.name in named:
+                errors[ship.name] = "placed more than once"
+                continue
+            named.add(ship.name)
+
+            if ship.is_placed():
+                errors[ship.name] = "already placed"
+                continue
+
+            positions = _compute_positions(start, ship.size, horizontal)
+
+            if any(not (0 <= r < self.size and 0 <= c < self.size) for r, c in positions):
+                errors[ship.name] = "does not fit at this position"
+                continue
+
+            overlapped = sorted({claimed[cell] for cell in positions if cell in claimed})
+            if overlapped or not positions.isdisjoint(self.occupied):
+                errors[ship.name] = f"overlaps {', '.join(overlapped) or 'a placed ship'}"
+                continue
+
+            placements.append((ship, positions))
+            claimed.update(dict.fromkeys(positions, ship.name))
+
+        for ship in self.ships:
+            if not ship.is_placed() and ship.name not in named:
+                errors[ship.name] = "missing from the fleet"
+
+        if errors:
+            raise InvalidFleet(errors)
+
+        for ship, positions in placements:
+            ship.place(positions)
+            self.occupied.update(positions)
+
+        self.version += 1
+        self._statuses = None
 
     def receive_fire(self, coord: Coordinate) -> ShotResult:
         row, col = coord
@@ -51,19 +130,24 @@ class Board:
         if not (0 <= row < self.size and 0 <= col < self.size):
             raise OutsideShot("Shot is outside the board")
 
-        if coord in self.shots_taken:
+        index = row * self.size + col
+        if self.shots[index] != NOT_SHOT:
             raise AlreadyShot("already shot")
 
-        self.shots_taken.add(coord)
-
+        self.version += 1
         if coord not in self.occupied:
+            self.shots[index] = SHOT_MISS
             return ShotResult(outcome=ShotOutcome.MISS)
 
+        self.shots[index] = SHOT_HIT
+        self._statuses = None
+
         for ship in self.ships:
             if ship.occupies(coord):
                 ship.register_hit(coord)
 
                 if ship.is_sunk():
+                    self.sunk_count += 1
                     return ShotResult(outcome=ShotOutcome.SUNK, ship=ship)
 
                 return ShotResult(outcome=ShotOutcome.HIT, ship=ship)
@@ -72,16 +156,17 @@ class Board:
         return ShotResult(outcome=ShotOutcome.MISS)
 
     def all_ships_sunk(self) -> bool:
-        return all(ship.is_sunk() for ship in self.ships)
+        return self.sunk_count == len(self.ships)
 
     def render(self, reveal_ships: bool = False) -> list[list[CellState]]:
-        grid = [[CellState.EMPTY for _ in range(self.size)] for _ in range(self.size)]
+        grid = [[CellState.EMPTY] * self.size for _ in range(self.size)]
 
         # missed shots
-        for coord in self.shots_taken:
-            if coord not in self.occupied:
-                r, c = coord
-                grid[r][c] = CellState.MISS
+        index = self.shots.find(SHOT_MISS)
+        while index != -1:
+            r, c = divmod(index, self.size)
+            grid[r][c] = CellState.MISS
+            index = self.shots.find(SHOT_MISS, index + 1)
 
         # hits
         for ship in self.ships:
@@ -97,24 +182,37 @@ class Board:
 
         return grid
 
-    def render_ships(self) -> list:
-        ships_status = []
-
-# TODO on pourra utiliser ShipStatus
-        for ship in self.ships:
-            ships_status.append(
-                {
-                    "name": ship.name,
-                    "size": ship.size,
-                    "placed": ship.is_placed(),
-                    "sunk": ship.is_sunk(),
-                    "positions": ship.positions,
-                    "hits": ship.hits,
-                    "health": ship.size - len(ship.hits)
-                }
-            )
-
-        return ships_status
+    def render_ships(self) -> list[dict]:
+        """The status of every ship, shared until the next placement or hit: do not modify it."""
+        if self._statuses is None:
+            self._statuses = [_ship_status(ship) for ship in self.ships]
+
+        return self._statuses
+
+    def to_snapshot(self) -> dict:
+        return {
+            "size": self.size,
+            "ships": [
+                {"name": ship.name, "size": ship.size, "positions": sorted(ship.positions), "hits": sorted(ship.hits)}
+                for ship in self.ships
+            ],
+            "shots": self.shots.hex(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "Board":
+        ships = [
+            Ship(name=ship["name"], size=ship["size"], positions={tuple(coord) for coord in ship["positions"]},
+                 hits={tuple(coord) for coord in ship["hits"]})
+            for ship in data["ships"]
+        ]
+        board = cls(data["size"], ships=ships)
+
+        for ship in ships:
+            board.occupied.update(ship.positions)
+        board.shots[:] = bytes.fromhex(data["shots"])
+
+        return board
 
     def get_ship_by_name(self, name) -> Ship | None:
         return next((ship for ship in self.ships if ship.name.lower() == name.lower()), None)
@@ -123,6 +221,19 @@ class Board:
         return len(self.occupied) == sum(ship.size for ship in self.ships)  # the sum of all ships' length
 
 
+def _ship_status(ship: Ship) -> dict:
+    # sorted lists of the ship's own coordinate tuples, they are serialized as JSON arrays
+    return {
+        "name": ship.name,
+        "size": ship.size,
+        "placed": ship.is_placed(),
+        "sunk": ship.is_sunk(),
+        "positions": sorted(ship.positions),
+        "hits": sorted(ship.hits),
+        "health": ship.size - len(ship.hits),
+    }
+
+
 def _compute_positions(start: Coordinate, size: int, horizontal: bool) -> set[Coordinate]:
     row, col = start
     positions = {start}
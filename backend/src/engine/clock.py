@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import itertools
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from backend.src.engine.game import PlayerId
+
+# the stale entries (turns that ended before their deadline) are purged whenever the heap doubles
+COMPACT_MIN_SIZE = 64
+
+"""
+Turn clocks of the games, and the scheduler that runs them.
+
+A game can limit every turn (turn_seconds) and the total time of each player (game_seconds, spent while it is their
+turn, like a chess clock). The earliest of the two limits is the deadline of the turn, and a player who reaches it
+forfeits.
+
+Every clock of the server shares one ClockScheduler: a heap of deadlines and a single timer of the event loop, set
+to the earliest one. A clock waiting for a move is a heap entry, without any task or sleep, and starting a turn
+just pushes its new deadline (the previous entry is left in the heap and skipped when it comes up).
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class TimeControl:
+    turn_seconds: float | None = None
+    game_seconds: float | None = None
+
+    def __bool__(self) -> bool:
+        return self.turn_seconds is not None or self.game_seconds is not None
+
+
+class GameClock:
+    __slots__ = ("control", "scheduler", "on_timeout", "remaining", "player", "turn_started", "deadline",
+                 "generation")
+
+    def __init__(self, control: TimeControl, scheduler: "ClockScheduler", on_timeout: Callable[[PlayerId], None]):
+        self.control = control
+        self.scheduler = scheduler
+        self.on_timeout = on_timeout
+        # time left to each player for the rest of the game, filled as they play
+        self.remaining: dict[PlayerId, float] = {}
+        self.player: PlayerId | None = None
+        self.turn_started = 0.0
+        self.deadline: float | None = None
+        self.generation = 0
+
+    def start_turn(self, player_id: PlayerId):
+        now = self.scheduler.time()
+        self._charge(now)
+
+        self.player = player_id
+        self.turn_started = now
+        self.generation += 1
+
+        limits = [limit for limit in (self.control.turn_seconds, self.time_left(player_id, now)) if limit is not None]
+        self.deadline = now + min(limits) if limits else None
+        self.scheduler.schedule(self)
+
+    def stop(self):
+        self._charge(self.scheduler.time())
+        self.player = None
+        self.deadline = None
+        self.generation += 1
+
+    def time_left(self, player_id: PlayerId, now: float | None = None) -> float | None:
+        """What is left of the game time of the player, None without a game limit."""
+        if self.control.game_seconds is None:
+            return None
+
+        remaining = self.remaining.get(player_id, self.control.game_seconds)
+        if player_id == self.player:
+            now = self.scheduler.time() if now is None else now
+            remaining -= now - self.turn_started
+
+        return max(0.0, remaining)
+
+    def turn_time_left(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self.scheduler.time())
+
+    def to_snapshot(self) -> dict:
+        """The time control and the game time left, the current turn starts over when restored."""
+        players = {*self.remaining, self.player} - {None} if self.control.game_seconds is not None else set()
+
+        return {
+            "turn_seconds": self.control.turn_seconds,
+            "game_seconds": self.control.game_seconds,
+            "remaining": {player_id: self.time_left(player_id) for player_id in players},
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict, scheduler: "ClockScheduler",
+                      on_timeout: Callable[[PlayerId], None]) -> "GameClock":
+        clock = cls(TimeControl(data["turn_seconds"], data["game_seconds"]), scheduler, on_timeout)
+        clock.remaining = {player_id: float(remaining) for player_id, remaining in data["remaining"].items()}
+        return clock
+
+    def _charge(self, now: float):
+        if self.player is not None and self.control.game_seconds is not None:
+            self.remaining[self.player] = self.time_left(self.player, now)
+
+
+class ClockScheduler:
+    def __init__(self):
+        # (deadline, sequence, generation of the clock when scheduled, clock)
+        self.heap: list[tuple[float, int, int, GameClock]] = []
+        self.sequence = itertools.count()
+        self.timer: asyncio.TimerHandle | None = None
+        self.compact_at = COMPACT_MIN_SIZE
+        self.timeouts = 0
+
+    def __len__(self) -> int:
+        """Clocks waiting for a move."""
+        return sum(1 for entry in self.heap if _is_live(entry))
+
+    def time(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def schedule(self, clock: GameClock):
+        if clock.deadline is None:
+            return
+
+        earliest = self.heap[0][0] if self.heap else None
+        heapq.heappush(self.heap, (clock.deadline, next(self.sequence), clock.generation, clock))
+
+        if len(self.heap) > self.compact_at:
+            self.heap = [entry for entry in self.heap if _is_live(entry)]
+            heapq.heapify(self.heap)
+            self.compact_at = max(COMPACT_MIN_SIZE, 2 * len(self.heap))
+
+        if earliest is None or clock.deadline < earliest or self.timer is None:
+            self._arm()
+
+    def _arm(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        if self.heap:
+            self.timer = asyncio.get_running_loop().call_at(self.heap[0][0], self._fire)
+
+    def _fire(self):
+        self.timer = None
+        now = self.time()
+
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if not _is_live(entry):
+                continue
+
+            clock = entry[3]
+            player_id = clock.player
+            clock.stop()
+            self.timeouts += 1
+            clock.on_timeout(player_id)
+
+        self._arm()
+
+
+def _is_live(entry: tuple[float, int, int, GameClock]) -> bool:
+    return entry[2] == entry[3].generation
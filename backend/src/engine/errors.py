@@ -62,8 +62,48 @@ class TooManyGames(Exception):
     pass
 
 
+class ProfilingError(Exception):
+    pass
+
+
+class InvalidRequest(Exception):
+    pass
+
+
+class MessageTooLarge(Exception):
+    pass
+
+
+class RateLimited(Exception):
+    pass
+
+
+class ServerDraining(Exception):
+    pass
+
+
+class NotEnoughSamples(Exception):
+    pass
+
+
+class InvalidFleet(Exception):
+    def __init__(self, errors: dict[str, str]):
+        super().__init__("Invalid fleet: " + "; ".join(f"{name}: {error}" for name, error in errors.items()))
+        # ship name -> what is wrong with its placement
+        self.errors = errors
+
+
 ERROR_CODES = {
     TooManyGames: "TOO_MANY_GAMES",
     InvalidCode: "INVALID_CODE",
-    PlayerCountError: "PLAYER_COUNT_ERROR"
-}
\ No newline at end of file
+    PlayerCountError: "PLAYER_COUNT_ERROR",
+    InvalidRequest: "INVALID_REQUEST",
+    MessageTooLarge: "MESSAGE_TOO_LARGE",
+    RateLimited: "RATE_LIMITED",
+    ServerDraining: "SERVER_DRAINING",
+    InvalidFleet: "INVALID_FLEET",
+    NotEnoughSamples: "NOT_ENOUGH_SAMPLES",
+}
+
+# the same request can succeed later (on this server or once it restarted)
+RETRYABLE_ERRORS = frozenset({TooManyGames, RateLimited, ServerDraining})
\ No newline at end of file
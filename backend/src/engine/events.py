@@ -0,0 +1,96 @@
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from enum import Enum, auto
+
+DEFAULT_BUFFER_SIZE = 64
+
+
+class GameEvent(Enum):
+    PHASE_CHANGED = auto()
+    SHIPS_PLACED = auto()
+    TURN_CHANGED = auto()
+    SHOT_RESULT = auto()
+    GAME_WON = auto()
+
+
+"""
+In-process publish/subscribe of the game events.
+
+Transports subscribe to the event types they render, and get a bounded buffer that they drain at their own pace:
+when a subscriber falls behind, its oldest events are dropped and counted. Listeners are called synchronously
+on emit, for in-process consumers that never lag behind.
+Emitting an event type without any subscriber or listener returns straight away, without creating the event.
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class Event:
+    type: GameEvent
+    message: str
+    player: str | None = None
+
+
+class Subscription:
+    def __init__(self, bus: "EventBus", types: frozenset[GameEvent], maxsize: int):
+        self.bus = bus
+        self.types = types
+        self.buffer: deque[Event] = deque(maxlen=maxsize)
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def push(self, event: Event):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+
+    def drain(self) -> list[Event]:
+        events = list(self.buffer)
+        self.buffer.clear()
+        return events
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    def __init__(self):
+        self.subscriptions: dict[GameEvent, list[Subscription]] = {}
+        self.listeners: dict[GameEvent, list[Callable[[Event], None]]] = {}
+
+    def subscribe(self, types: Iterable[GameEvent] = GameEvent, maxsize: int = DEFAULT_BUFFER_SIZE) -> Subscription:
+        subscription = Subscription(self, frozenset(types), maxsize)
+        for event_type in subscription.types:
+            self.subscriptions.setdefault(event_type, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for event_type in subscription.types:
+            subscriptions = self.subscriptions.get(event_type, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(event_type, None)
+
+    def listen(self, types: Iterable[GameEvent], callback: Callable[[Event], None]):
+        for event_type in types:
+            self.listeners.setdefault(event_type, []).append(callback)
+
+    def wants(self, event_type: GameEvent) -> bool:
+        return event_type in self.subscriptions or event_type in self.listeners
+
+    def emit(self, event_type: GameEvent, message: str, player: str | None = None):
+        subscriptions = self.subscriptions.get(event_type)
+        listeners = self.listeners.get(event_type)
+        if not subscriptions and not listeners:
+            return
+
+        event = Event(event_type, message, player)
+
+        for subscription in subscriptions or ():
+            subscription.push(event)
+
+        for listener in listeners or ():
+            listener(event)
@@ -1,9 +1,16 @@
-import asyncio
+import base64
 import random
-from enum import Enum, auto
+from array import array
+from collections.abc import Iterable
+from enum import Enum
 
+from backend.src.diagnostics.tracing import traced
 from backend.src.engine.board import Board
-from backend.src.engine.errors import PlayerAlreadyExists, PlayerCountError, WrongPhase, TurnError, MissingPlayer
+from backend.src.engine.errors import PlayerAlreadyExists, PlayerCountError, WrongPhase, TurnError, MissingPlayer, \
+    Overlapping
+from backend.src.engine.events import EventBus, GameEvent
+from backend.src.engine.placements import placement_table
+from backend.src.engine.rng import new_seed
 from backend.src.engine.ships import Coordinate, Ship, test_ships
 from backend.src.engine.shot import ShotResult, ShotOutcome
 
@@ -15,34 +22,33 @@ class GamePhase(str, Enum):
     FINISHED = "finished"
 
 
-class GameEvent(Enum):
-    PHASE_CHANGED = auto()
-    SHIPS_PLACED = auto()
-    TURN_CHANGED = auto()
-    SHOT_RESULT = auto()
-    GAME_WON = auto()
-
-
 # Alias so that we know what the string represents
 PlayerId = str
 
 """
 This class coordinates the players, their board, the turns, and the win condition.
-It creates events when stuff like phase-change, turn-change, game-won happens.
+It emits events on its bus when stuff like phase-change, turn-change, game-won happens.
 
 It is UI-agnostic
 """
 
+# bumped when the snapshot format changes, older snapshots are not restored
+SNAPSHOT_VERSION = 1
+
 
 class Game:
-    def __init__(self, size: int = 10, dev=False):
+    __slots__ = ("is_dev", "size", "seed", "rng", "boards", "phase", "current_turn", "winner", "bus")
+
+    def __init__(self, size: int = 10, dev=False, seed: int | None = None):
         self.is_dev = dev
         self.size = size
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
         self.boards: dict[PlayerId, Board] = {}
         self.phase = GamePhase.WAITING_PLAYERS
         self.current_turn: PlayerId | None = None
         self.winner: PlayerId | None = None
-        self.events: asyncio.Queue[dict] = asyncio.Queue()
+        self.bus = EventBus()
 
     def add_player(self, player_id: PlayerId):
         if self.phase != GamePhase.WAITING_PLAYERS:
@@ -63,7 +69,18 @@ class Game:
         if self.phase != GamePhase.SETUP:
             raise WrongPhase("Cannot place ships after game start")
 
-        self.boards[player_id].place_ship(ship, start, horizontal)
+        board = self.boards[player_id]
+        board.place_ship(ship, start, horizontal)
+
+        if board.all_ships_placed():
+            self.bus.emit(GameEvent.SHIPS_PLACED, f"{player_id} has placed all their ships", player_id)
+
+    def place_fleet(self, player_id: PlayerId, layout: Iterable[tuple[str, Coordinate, bool]]):
+        if self.phase != GamePhase.SETUP:
+            raise WrongPhase("Cannot place ships after game start")
+
+        self.boards[player_id].place_fleet(layout)
+        self.bus.emit(GameEvent.SHIPS_PLACED, f"{player_id} has placed all their ships", player_id)
 
     async def place_random(self, player_id: str, place_all: bool = False):
         board = self.boards[player_id]
@@ -80,34 +97,23 @@ class Game:
         if not ships_to_place:
             return {"status": "error", "message": "All ships already placed"}
 
+        # every placement of the table fits in the board, only overlaps are retried
+        table = placement_table(board.size, (ship.size for ship in board.ships))
+
         for ship in ships_to_place:
-            board_size = self.boards[player_id].size
+            placements = table[ship.size]
 
             for _ in range(100):
-                orientation = random.choice([True, False])
-
-                if orientation:
-                    x = random.randint(0, board_size - ship.size)
-                    y = random.randint(0, board_size - 1)
-                else:
-                    x = random.randint(0, board_size - 1)
-                    y = random.randint(0, board_size - ship.size)
+                start, horizontal = table.decode(placements[self.rng.randrange(len(placements))])
 
                 try:
-                    board.place_ship(ship, (x, y), orientation)
-                    if ship.is_placed():
-                        continue
-                except Exception as e:
-                    print(e)
-                finally:
-                    if ship.is_placed():
-                        break
+                    board.place_ship(ship, start, horizontal)
+                    break
+                except Overlapping:
+                    pass
 
         if board.all_ships_placed():
-            await self.events.put({
-                "type": "ships_placed",
-                "player": player_id
-            })
+            self.bus.emit(GameEvent.SHIPS_PLACED, f"{player_id} has placed all their ships", player_id)
 
         return {"status": "ok"}
 
@@ -122,12 +128,10 @@ class Game:
             raise MissingPlayer("Invalid starting player")
 
         self.phase = GamePhase.IN_PROGRESS
-        await self.events.put({
-            "type": GameEvent.PHASE_CHANGED,
-            "message": "All ships placed. The battle begins!"
-        })
+        self.bus.emit(GameEvent.PHASE_CHANGED, "All ships placed. The battle begins!")
         self.current_turn = first_player
 
+    @traced("Game.fire")
     async def fire(self, player_id: PlayerId, coord: Coordinate) -> ShotResult:
         if self.phase != GamePhase.IN_PROGRESS:
             raise WrongPhase("Game is not in progress")
@@ -148,6 +152,50 @@ class Game:
 
         return result
 
+    def forfeit(self, player_id: PlayerId):
+        """Ends the game in favour of the opponent of `player_id`, who ran out of time."""
+        if self.winner is not None:
+            raise WrongPhase("Game is already finished")
+
+        if player_id not in self.boards:
+            raise MissingPlayer(f"Player {player_id} is not in the game")
+
+        self.phase = GamePhase.FINISHED
+        self.winner = self.get_opponent(player_id)
+        self.bus.emit(GameEvent.GAME_WON, f"{player_id} ran out of time, player {self.winner} has won the game!",
+                      self.winner)
+
+    def to_snapshot(self) -> dict:
+        """The state of the game as JSON-ready data, listeners and subscribers of the bus are not part of it."""
+        version, internal_state, gauss = self.rng.getstate()
+
+        return {
+            "version": SNAPSHOT_VERSION,
+            "dev": self.is_dev,
+            "size": self.size,
+            "seed": self.seed,
+            # the 625 words of the Mersenne Twister, packed: most of the snapshot size otherwise
+            "rng": [version, base64.b64encode(array("I", internal_state).tobytes()).decode(), gauss],
+            "boards": {player_id: board.to_snapshot() for player_id, board in self.boards.items()},
+            "phase": self.phase.value,
+            "current_turn": self.current_turn,
+            "winner": self.winner,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "Game":
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {data.get('version')}")
+
+        game = cls(data["size"], dev=data["dev"], seed=data["seed"])
+        version, internal_state, gauss = data["rng"]
+        game.rng.setstate((version, tuple(array("I", base64.b64decode(internal_state))), gauss))
+        game.boards = {player_id: Board.from_snapshot(board) for player_id, board in data["boards"].items()}
+        game.phase = GamePhase(data["phase"])
+        game.current_turn = data["current_turn"]
+        game.winner = data["winner"]
+        return game
+
     def get_view(self, player_id: PlayerId) -> dict:
         opponent = self.get_opponent(player_id)
 
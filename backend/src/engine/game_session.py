@@ -1,16 +1,25 @@
 import asyncio
-import random
 import time
 from enum import Enum
+from typing import TYPE_CHECKING
 
-from fastapi import WebSocket
 from backend.src.commands.command_handler import CommandHandler
-from backend.src.commands.commands import Command, PlaceShipCommand, StartGameCommand, FireCommand, PlaceRandom
-from backend.src.engine.errors import PlayerCountError, TurnError
+from backend.src.commands.commands import Command, PlaceShipCommand, StartGameCommand, FireCommand, PlaceRandom, \
+    PlaceFleetCommand
+from backend.src.diagnostics.log_writer import log_writer
+from backend.src.diagnostics.tracing import tracer, traced
+from backend.src.engine.clock import GameClock
+from backend.src.engine.errors import PlayerCountError, TurnError, InvalidFleet
 from backend.src.engine.game import PlayerId, Game, GamePhase, GameEvent
+from backend.src.engine.log import LogEvent, LogKind
 from backend.src.engine.shot import ShotOutcome, SHOT_OUTCOME_MAP
-from backend.src.websockets.protocol.log_event import LogEvent, LogKind
-from backend.src.websockets.protocol.responses import GetStateResponse
+
+if TYPE_CHECKING:
+    # only the websocket adapter needs the web stack, the CLI and the simulators never import it
+    from fastapi import WebSocket
+
+STATE_TYPE = "state"
+SPECTATOR_STATE_TYPE = "spectator_state"
 
 """
 This class orchestrates player state and game flow.
@@ -41,62 +50,116 @@ class PlayerState(Enum):
 SETUP_TIMEOUT = 5 * 60  # 5 minutes
 INACTIVE_TIMEOUT = 15 * 60  # 15 minutes
 
+# the log keeps every shot, the outcome entries are immutable and shared by all the games
+OUTCOME_LOGS = {
+    outcome: LogEvent(kind=LogKind.COMBAT, message=f"{SHOT_OUTCOME_MAP[outcome]} {outcome.upper()}")
+    for outcome in ShotOutcome
+}
+
 
 class GameSession:
-    def __init__(self, dev=False):
-        self.game = Game(dev=dev)
+    __slots__ = ("code", "game", "handler", "players", "ready", "connections", "connected", "last_activity",
+                 "ready_event", "game_phase_at_disconnect", "log", "clock", "spectators", "changed")
+
+    def __init__(self, dev=False, seed: int | None = None, code: str | None = None):
+        # the code the registry knows the game by, for the journal
+        self.code = code
+        self.game = Game(dev=dev, seed=seed)
         self.handler = CommandHandler(self.game)
         self.players: list[PlayerId] = []
         self.ready: set[PlayerId] = set()
-        self.connections: dict[PlayerId, WebSocket] = {}
+        self.connections: dict[PlayerId, "WebSocket"] = {}
         self.connected: set[PlayerId] = set()
         self.last_activity = time.time()
         self.ready_event = asyncio.Event()
         self.game_phase_at_disconnect = GamePhase.WAITING_PLAYERS
         self.log: list[LogEvent] = []
+        # set by the registry for games with a time control
+        self.clock: GameClock | None = None
+        # connections watching the game, they get the log and the spectator state
+        self.spectators: list = []
+        # set when the game changes, created by the first waiter (see wait_for_change)
+        self.changed: asyncio.Event | None = None
 
     async def log_event(self, event: LogEvent):
         self.log.append(event)
-        await self.broadcast_json(dict(event))
+        log_writer.log("game_log", game=self.code, kind=event.kind.value, message=event.message)
+        await self.broadcast_json(event.to_json())
 
-    def build_state(self, player_id: PlayerId, shot_outcome: ShotOutcome = None) -> GetStateResponse:
+    @traced("GameSession.build_state")
+    def build_state(self, player_id: PlayerId, shot_outcome: ShotOutcome = None) -> dict:
+        """The `state` message of a player, ready to be sent as JSON (described by protocol.responses.GetStateResponse)."""
         opponent = self.game.get_opponent(player_id)
         view = self.get_view(player_id)
         statuses = self.game.get_ship_status(player_id)
+        ships_sunk = self.game.boards[opponent].sunk_count
 
-        for status in statuses:
-            status["positions"] = list(status["positions"])
-            status["hits"] = list(status["hits"])
-
-        enemy_statuses = self.game.get_ship_status(opponent)
-        ships_sunk = 0
-        for status in enemy_statuses:
-            if status["sunk"]:
-                ships_sunk += 1
-
-        return GetStateResponse(
-            phase=view["phase"],
-            currentPlayer=player_id if view["your_turn"] else opponent,
-            opponentName=opponent,
-            winner=view["winner"],
-            yourBoard=view["your_board"],
-            enemyBoard=view["enemy_board"],
-            ships=statuses,
-            lastShotResult=shot_outcome,
-            enemyShipsSunk=ships_sunk
-        )
+        return {
+            "type": STATE_TYPE,
+            "phase": view["phase"],
+            "currentPlayer": player_id if view["your_turn"] else opponent,
+            "opponentName": opponent,
+            "winner": view["winner"],
+            "yourBoard": [[cell.value for cell in row] for row in view["your_board"]],
+            "enemyBoard": [[cell.value for cell in row] for row in view["enemy_board"]],
+            "ships": statuses,
+            "lastShotResult": shot_outcome.value if shot_outcome is not None else None,
+            "enemyShipsSunk": ships_sunk,
+            "clock": self.clock_state(),
+        }
+
+    def build_spectator_state(self) -> dict:
+        """The `spectator_state` message, both boards as their opponents see them (SpectatorStateResponse)."""
+        return {
+            "type": SPECTATOR_STATE_TYPE,
+            "phase": self.game.phase.value,
+            "currentPlayer": self.game.current_turn,
+            "winner": self.game.winner,
+            "players": self.players,
+            "boards": {player_id: [[cell.value for cell in row] for row in board.render(reveal_ships=False)]
+                       for player_id, board in self.game.boards.items()},
+            "shipsSunk": {player_id: board.sunk_count for player_id, board in self.game.boards.items()},
+            "clock": self.clock_state(),
+        }
+
+    def clock_state(self) -> dict | None:
+        if self.clock is None:
+            return None
+
+        turn_left = self.clock.turn_time_left()
+        time_left = None
+        if self.clock.control.game_seconds is not None:
+            time_left = {player_id: round(self.clock.time_left(player_id), 1) for player_id in self.players}
+
+        return {
+            "turnSecondsLeft": round(turn_left, 1) if turn_left is not None else None,
+            "timeLeft": time_left,
+        }
 
     async def broadcast_state(self, shot_outcome: ShotOutcome = None):
+        dead = []
+
         for player_id, ws in self.connections.items():
             state = self.build_state(player_id, shot_outcome)
-            await ws.send_json(state.model_dump(mode="json"))
+            try:
+                with tracer.span("send_json", to=player_id, message="state"):
+                    await ws.send_json(state)
+            except Exception:
+                dead.append(player_id)
+
+        for player_id in dead:
+            del self.connections[player_id]
+
+        if self.spectators:
+            await self._send_spectators(self.build_spectator_state())
 
     async def join(self, player_id: PlayerId) -> dict:
         if player_id in self.players:
             if player_id not in self.connected:
                 # reconnection
                 self.connected.add(player_id)
-                self.game.phase = self.game_phase_at_disconnect
+                if self.game.phase == GamePhase.WAITING_PLAYERS:
+                    self.game.phase = self.game_phase_at_disconnect
                 self.stamp()
                 return {"status": "ok", "reconnected": True}
             return {"status": "error", "message": f"Player {player_id} already joined"}
@@ -116,21 +179,20 @@ class GameSession:
 
         if self.is_ready():
             self.game.phase = GamePhase.SETUP
+            self.notify_change()
             # TODO pas au bon endroit
 
             await self.log_event(
                 LogEvent(kind=LogKind.SYSTEM, message="🔔 All players joined. Time to place your ships"))
 
-            await self.game.events.put({
-                "type": GameEvent.PHASE_CHANGED,
-                "message": "All players joined. Time to place your ships"
-            })
+            self.game.bus.emit(GameEvent.PHASE_CHANGED, "All players joined. Time to place your ships")
 
         return {
             "status": "ok",
             "message": f"Joined as {player_id}",
         }
 
+    @traced("GameSession.handle_command")
     async def handle_command(self, player_id: PlayerId, command: Command) -> dict:
         phase = self.game.phase
         self.stamp()
@@ -144,22 +206,111 @@ class GameSession:
 
             return {"status": "error", "message": "Game is finished"}
 
+        except InvalidFleet as e:
+            return {"status": "error", "message": str(e), "errors": e.errors}
+
         except Exception as e:
             return {
                 "status": "error",
                 "message": str(e)
             }
 
+        finally:
+            self.run_clock()
+            self.notify_change()
+
+    def run_clock(self):
+        """Starts the clock of the player to move, or stops it once the game is over."""
+        if self.clock is None:
+            return
+
+        if self.game.phase == GamePhase.FINISHED:
+            if self.clock.player is not None:
+                self.clock.stop()
+        elif self.game.phase == GamePhase.IN_PROGRESS and self.game.current_turn != self.clock.player:
+            self.clock.start_turn(self.game.current_turn)
+
+    async def forfeit(self, player_id: PlayerId):
+        """The player ran out of time. Their clock keeps running while they are disconnected, so this can end a
+        game nobody is connected to."""
+        if self.game.winner is not None:
+            return
+
+        self.game.forfeit(player_id)
+        self.game_phase_at_disconnect = GamePhase.FINISHED
+        self.run_clock()
+        self.notify_change()
+
+        await self.log_event(LogEvent(kind=LogKind.VICTORY,
+                                      message=f"⏰ {player_id} ran out of time, {self.game.winner} has won the game!"))
+        await self.broadcast_state()
+
+    async def wait_for_change(self):
+        """Returns after the next command, join or forfeit of the game."""
+        if self.changed is None:
+            self.changed = asyncio.Event()
+        await self.changed.wait()
+
+    def notify_change(self):
+        if self.changed is not None:
+            self.changed.set()
+            self.changed = None
+
     def handle_disconnect(self, player_id: PlayerId):
         self.connected.discard(player_id)
-        del self.connections[player_id]
-        self.game_phase_at_disconnect = self.game.phase
-        self.game.phase = GamePhase.WAITING_PLAYERS
+        self.connections.pop(player_id, None)
+
+        # a finished game stays finished, and a game already paused keeps the phase to resume
+        if self.game.phase in (GamePhase.SETUP, GamePhase.IN_PROGRESS):
+            self.game_phase_at_disconnect = self.game.phase
+            self.game.phase = GamePhase.WAITING_PLAYERS
+
+    def drop_connection(self, player_id: PlayerId, connection):
+        """The connection of the player is gone (websocket closed, mux channel released), unless they reconnected
+        on another one since."""
+        if self.connections.get(player_id) is connection:
+            self.handle_disconnect(player_id)
 
     async def disconnect_all(self, reason):
         for ws in list(self.connections.values()):
             await ws.close(reason=reason)
 
+    def to_snapshot(self) -> dict:
+        return {
+            "game": self.game.to_snapshot(),
+            "players": self.players,
+            "ready": sorted(self.ready),
+            "last_activity": self.last_activity,
+            "game_phase_at_disconnect": self.game_phase_at_disconnect.value,
+            "log": [[event.kind.value, event.message] for event in self.log],
+            # restored by the registry, which owns the scheduler
+            "clock": self.clock.to_snapshot() if self.clock is not None else None,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "GameSession":
+        """A session restored with every player disconnected: their next join resumes the game where it was."""
+        session = cls()
+        session.game = Game.from_snapshot(data["game"])
+        session.handler = CommandHandler(session.game)
+        session.players = data["players"]
+        session.ready = set(data["ready"])
+        session.last_activity = data["last_activity"]
+
+        # share the outcome entries again, as the live sessions do
+        shared = {event: event for event in OUTCOME_LOGS.values()}
+        session.log = [shared.get(event, event) for event in
+                       (LogEvent(kind=LogKind(kind), message=message) for kind, message in data["log"])]
+
+        # same state as handle_disconnect, unless the players were already gone when the snapshot was taken
+        phase = session.game.phase
+        if phase == GamePhase.WAITING_PLAYERS:
+            phase = GamePhase(data["game_phase_at_disconnect"])
+        session.game_phase_at_disconnect = phase
+        session.game.phase = GamePhase.WAITING_PLAYERS
+
+        return session
+
     def get_prompt(self, player_id: PlayerId) -> str:
         match self.game.phase:
             case GamePhase.SETUP:
@@ -205,17 +356,28 @@ class GameSession:
 
         for player_id, ws in self.connections.items():
             try:
-                await ws.send_json(payload)
+                with tracer.span("send_json", to=player_id, message=payload.get("type")):
+                    await ws.send_json(payload)
             except Exception:
                 dead.append(player_id)
 
         for player_id in dead:
             del self.connections[player_id]
 
-    async def broadcast_events(self):
-        while not self.game.events.empty():
-            event = await self.game.events.get()
-            await self.broadcast(event["message"])
+        if self.spectators:
+            await self._send_spectators(payload)
+
+    async def _send_spectators(self, payload: dict):
+        dead = []
+
+        for ws in self.spectators:
+            try:
+                await ws.send_json(payload)
+            except Exception:
+                dead.append(ws)
+
+        for ws in dead:
+            self.spectators.remove(ws)
 
     def get_view(self, player_id: PlayerId) -> dict:
         return self.game.get_view(player_id)
@@ -227,25 +389,20 @@ class GameSession:
         return len(self.players) == 2
 
     async def _handle_setup(self, player_id: PlayerId, command: Command):
-        if not (isinstance(command, PlaceShipCommand) or isinstance(command, PlaceRandom)):
+        if not isinstance(command, (PlaceShipCommand, PlaceFleetCommand, PlaceRandom)):
             return {"status": "error", "message": "You must place ships first"}
 
         result = await self.handler.execute(player_id, command)
 
         if self.game.boards[player_id].all_ships_placed():
             await self.log_event(LogEvent(kind=LogKind.SYSTEM, message=f"⚓ {player_id} is done deploying their fleet."))
-
-            await self.game.events.put({
-                "type": GameEvent.SHIPS_PLACED,
-                "message": f"{player_id} has placed all their ships"
-            })
             self.ready.add(player_id)
 
         if len(self.ready) == 2:
             await self.log_event(LogEvent(kind=LogKind.SYSTEM, message="⚔️ Fleets deployed, may the battle begins!"))
 
             # start the game with a random player going first
-            return await self.handler.execute(random.choice(self.players), StartGameCommand())
+            return await self.handler.execute(self.game.rng.choice(self.players), StartGameCommand())
 
         return result
 
@@ -262,27 +419,19 @@ class GameSession:
 
         # TODO devrait pas envoyer de phrase complète
         await self.log_event(LogEvent(kind=LogKind.COMBAT, message=f"🧨 {player_id} fired at {chr(65 + col)}{row + 1}"))
-        await self.log_event(
-            LogEvent(kind=LogKind.COMBAT, message=f"{SHOT_OUTCOME_MAP[result['result']]} {result['result'].upper()}"))
+        await self.log_event(OUTCOME_LOGS[result["result"]])
 
-        await self.game.events.put({
-            "type": GameEvent.SHOT_RESULT,
-            "message": f"{player_id} fired at {row}, {col}. Result is {result['result']}"
-        })
+        self.game.bus.emit(GameEvent.SHOT_RESULT, f"{player_id} fired at {row}, {col}. Result is {result['result']}",
+                           player_id)
 
         if self.game.phase != GamePhase.FINISHED:
-            await self.game.events.put({
-                "type": GameEvent.TURN_CHANGED,
-                "message": f"{self.game.current_turn}, it's your turn now"
-            })
+            self.game.bus.emit(GameEvent.TURN_CHANGED, f"{self.game.current_turn}, it's your turn now",
+                               self.game.current_turn)
         else:
             await self.log_event(
                 LogEvent(kind=LogKind.VICTORY, message=f"🏆 Player {self.game.winner} has won the game!"))
 
-            await self.game.events.put({
-                "type": GameEvent.GAME_WON,
-                "message": f"Player {self.game.winner} has won the game!"
-            })
+            self.game.bus.emit(GameEvent.GAME_WON, f"Player {self.game.winner} has won the game!", self.game.winner)
 
         return {
             "status": "ok",
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from enum import Enum
+
+LOG_TYPE = "log"
+
+"""
+Entries of the game log (system messages, combat, chat, victory) kept by the session.
+
+Plain dataclasses, so the engine stays importable without the web stack. They are sent as is to the json clients.
+"""
+
+
+class LogKind(str, Enum):
+    SYSTEM = "system"
+    COMBAT = "combat"
+    CHAT = "chat"
+    VICTORY = "victory"
+
+
+@dataclass(frozen=True, slots=True)
+class LogEvent:
+    kind: LogKind
+    message: str
+
+    def to_json(self) -> dict:
+        return {"type": LOG_TYPE, "kind": self.kind.value, "message": self.message}
@@ -0,0 +1,132 @@
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Iterable
+
+from backend.src.engine.ships import Coordinate
+
+CACHE_DIR_ENV = "BATTLESHIP_CACHE_DIR"
+# bumped when the file layout changes, the tables are then rebuilt under a new name
+TABLE_VERSION = 1
+MAGIC = b"BSPT"
+# a placement is its start cell (row * size + col), with this bit set for vertical ships
+VERTICAL = 0x8000
+MAX_BOARD_SIZE = 181  # the start cell must fit in 15 bits
+
+HEADER = struct.Struct("<4sHHH")  # magic, version, board size, number of ship sizes
+SECTION = struct.Struct("<HII")  # ship size, offset of its placements, number of placements
+
+"""
+Tables of every legal placement of each ship of a fleet on an empty board.
+
+Random placement, the bots and the win probability pick placements from these tables instead of drawing positions
+that may not fit. A table is built on first use for a (board size, fleet), written to BATTLESHIP_CACHE_DIR (the
+temporary directory by default), then memory-mapped: the processes of a server or of a tournament share a single
+copy of it in the page cache, and later starts only map the file.
+
+Placements are stored as uint16, see VERTICAL. If the cache directory is not writable, the table is kept in memory.
+"""
+
+_tables: dict[tuple[int, tuple[int, ...]], "PlacementTable"] = {}
+
+
+class PlacementTable:
+    def __init__(self, board_size: int, buffer):
+        magic, version, size, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != TABLE_VERSION or size != board_size:
+            raise ValueError("Not a placement table for this board")
+
+        self.board_size = board_size
+        self.buffer = buffer
+        self.placements: dict[int, memoryview] = {}
+
+        view = memoryview(buffer)
+        for index in range(count):
+            ship_size, offset, length = SECTION.unpack_from(buffer, HEADER.size + index * SECTION.size)
+            if offset + 2 * length > len(buffer):
+                raise ValueError("Truncated placement table")
+            self.placements[ship_size] = view[offset:offset + 2 * length].cast("H")
+
+    def __getitem__(self, ship_size: int) -> memoryview:
+        """Every placement of a ship of this size, encoded."""
+        return self.placements[ship_size]
+
+    def decode(self, placement: int) -> tuple[Coordinate, bool]:
+        """(start, horizontal), as taken by Board.place_ship."""
+        return divmod(placement & ~VERTICAL, self.board_size), not placement & VERTICAL
+
+    def cells(self, placement: int, ship_size: int) -> range:
+        """The cells (row * size + col) covered by the placement."""
+        start = placement & ~VERTICAL
+        step = self.board_size if placement & VERTICAL else 1
+        return range(start, start + step * ship_size, step)
+
+
+def placement_table(board_size: int, fleet: Iterable[int]) -> PlacementTable:
+    """The table of a board size and fleet (the sizes of its ships), loaded or built once per process."""
+    key = (board_size, tuple(sorted(set(fleet))))
+
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = _load(*key)
+
+    return table
+
+
+def build(board_size: int, ship_sizes: tuple[int, ...]) -> bytes:
+    if board_size > MAX_BOARD_SIZE:
+        raise ValueError(f"Boards larger than {MAX_BOARD_SIZE} are not supported")
+
+    sections = []
+    for ship_size in ship_sizes:
+        placements = array("H")
+        for row in range(board_size):
+            for col in range(board_size):
+                start = row * board_size + col
+                if col + ship_size <= board_size:
+                    placements.append(start)
+                if row + ship_size <= board_size:
+                    placements.append(start | VERTICAL)
+        sections.append((ship_size, placements))
+
+    offset = HEADER.size + SECTION.size * len(sections)
+    header = bytearray(HEADER.pack(MAGIC, TABLE_VERSION, board_size, len(sections)))
+    for ship_size, placements in sections:
+        header += SECTION.pack(ship_size, offset, len(placements))
+        offset += 2 * len(placements)
+
+    # uint16 in the byte order of the machine, the file is only read where it was written
+    return bytes(header) + b"".join(placements.tobytes() for _, placements in sections)
+
+
+def _load(board_size: int, ship_sizes: tuple[int, ...]) -> PlacementTable:
+    directory = os.environ.get(CACHE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "battleship")
+    fleet = "-".join(map(str, ship_sizes)) or "empty"
+    path = os.path.join(directory, f"placements-v{TABLE_VERSION}-{board_size}-{fleet}.bin")
+
+    try:
+        return PlacementTable(board_size, _map(path))
+    except (OSError, ValueError, struct.error):
+        # missing, or left truncated by a crash
+        pass
+
+    data = build(board_size, ship_sizes)
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # written under a unique name then renamed, processes building the same table at once don't conflict
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return PlacementTable(board_size, _map(path))
+    except OSError:
+        return PlacementTable(board_size, data)
+
+
+def _map(path: str) -> mmap.mmap:
+    with open(path, "rb") as f:
+        # the mapping stays valid once the file is closed
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
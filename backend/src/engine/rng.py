@@ -0,0 +1,18 @@
+import hashlib
+import secrets
+
+"""
+Seeds of the per-game random generators.
+
+Every Game owns a random.Random created from its seed, so a seed and the list of commands replay a game exactly,
+and games never share generator state. Simulations derive one independent seed per game from a base seed.
+"""
+
+
+def new_seed() -> int:
+    return secrets.randbits(64)
+
+
+def derive_seed(base: int, index: int) -> int:
+    digest = hashlib.blake2b(f"{base}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
@@ -13,7 +13,7 @@ They just know their length, and they know where they have been hit.
 """
 
 
-@dataclass
+@dataclass(slots=True)
 class Ship:
     name: str
     size: int
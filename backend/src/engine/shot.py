@@ -11,7 +11,7 @@ class ShotOutcome(str, Enum):
     SUNK = "sunk"
 
 
-@dataclass
+@dataclass(slots=True)
 class ShotResult:
     outcome: ShotOutcome
     ship: Optional[Ship] = None
@@ -0,0 +1,58 @@
+import argparse
+import heapq
+import sys
+from datetime import datetime
+
+from backend.src.history.store import HistoryStore, PlayerStats
+
+SORT_KEYS = {
+    "name": None,
+    "games": lambda stats: stats.games,
+    "win_rate": lambda stats: (stats.win_rate, stats.games),
+    "hit_rate": lambda stats: (stats.hit_rate, stats.games),
+}
+
+"""
+Statistics of every player over the game history: win rate, average shots to win, and hit rate.
+
+The players are read in a single pass over the database and printed as they come. With --top, only the best N
+players are kept while reading, so memory stays bounded by N, not by the number of players or games.
+
+    python -m backend.src.history.analytics history.db
+    python -m backend.src.history.analytics history.db --since 2026-01-01 --min-games 20 --top 10 --sort win_rate
+"""
+
+
+def print_stats(stats: PlayerStats):
+    shots_to_win = f"{stats.shots_to_win:.1f}" if stats.shots_to_win is not None else "-"
+    print(f"{stats.player:<32}{stats.games:>10}{stats.win_rate:>10.1%}{shots_to_win:>14}{stats.hit_rate:>10.1%}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Per player statistics of the game history")
+    parser.add_argument("database", help="the BATTLESHIP_HISTORY_DB file of the server")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only the games finished since this date")
+    parser.add_argument("--min-games", type=int, default=1, help="skip the players with fewer games")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="name")
+    parser.add_argument("--top", type=int, help="only the first N players (by --sort)")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.database)
+    stats = store.player_stats(args.since.timestamp() if args.since else None, args.min_games)
+
+    if args.sort != "name":
+        key = SORT_KEYS[args.sort]
+        stats = heapq.nlargest(args.top, stats, key) if args.top else sorted(stats, key=key, reverse=True)
+    elif args.top:
+        stats = (player for _, player in zip(range(args.top), stats))
+
+    print(f"{'player':<32}{'games':>10}{'win rate':>10}{'shots/win':>14}{'hit rate':>10}")
+    for player in stats:
+        print_stats(player)
+
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
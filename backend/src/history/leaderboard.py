@@ -0,0 +1,168 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
+
+from backend.src.engine.game import PlayerId
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32
+MAX_RATING = 4000
+# ratings are ranked to the hundredth of a point, players closer than that share a rank
+RATING_SCALE = 100
+
+"""
+Elo ratings of the named players, and their leaderboard.
+
+A finished game updates the ratings of both players in O(1). The leaderboard counts the players of every rating
+bucket (a hundredth of a point) in a Fenwick tree, indexed from the highest rating: the rank of a player is the
+number of players above them, and the top N are found bucket by bucket, in O(log n) each, however many players
+are rated. Players of the same bucket are listed in the order they reached it, so only the ones shown are read,
+even when a bucket holds most of the players (the new ones, at 1500).
+"""
+
+
+@dataclass(slots=True)
+class Rating:
+    player: PlayerId
+    rating: float = INITIAL_RATING
+    games: int = 0
+    wins: int = 0
+
+
+class FenwickTree:
+    __slots__ = ("size", "tree")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int):
+        """Adds delta at index (from 1)."""
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """Sum of the values from 1 to index."""
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, count: int) -> int:
+        """The smallest index whose prefix sum reaches count."""
+        index = 0
+        step = 1 << self.size.bit_length()
+
+        while step:
+            if index + step <= self.size and self.tree[index + step] < count:
+                index += step
+                count -= self.tree[index]
+            step >>= 1
+
+        return index + 1
+
+
+class Leaderboard:
+    def __init__(self):
+        self.ratings: dict[PlayerId, Rating] = {}
+        self.counts = FenwickTree(MAX_RATING * RATING_SCALE + 1)
+        # index of the bucket -> players in it, in the order they entered it
+        self.buckets: dict[int, dict[PlayerId, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ratings)
+
+    def record(self, winner: PlayerId, loser: PlayerId):
+        """Updates the ratings after a game won by `winner`."""
+        if winner == loser:
+            return
+
+        winner_rating, loser_rating = self._get(winner), self._get(loser)
+        expected = 1 / (1 + 10 ** ((loser_rating.rating - winner_rating.rating) / 400))
+        change = K_FACTOR * (1 - expected)
+
+        self._move(winner_rating, winner_rating.rating + change)
+        self._move(loser_rating, loser_rating.rating - change)
+        winner_rating.games += 1
+        winner_rating.wins += 1
+        loser_rating.games += 1
+
+    def replay(self, results: Iterable[tuple[PlayerId, PlayerId]]) -> int:
+        """Rates past games, as (winner, loser), in the order they were played. Returns their number."""
+        games = 0
+        for winner, loser in results:
+            self.record(winner, loser)
+            games += 1
+        return games
+
+    def load(self, ratings: Iterable[Rating]):
+        """Adds saved ratings, in the order `ranked` gave them (it is the order of the ties)."""
+        for rating in ratings:
+            self.ratings[rating.player] = rating
+            self._insert(rating.player, _index(rating.rating))
+
+    def ranked(self) -> Iterator[Rating]:
+        """Every rating, best first, ties in the order `top` lists them."""
+        for index in sorted(self.buckets):
+            for player in self.buckets[index]:
+                yield self.ratings[player]
+
+    def rating(self, player: PlayerId) -> Rating | None:
+        return self.ratings.get(player)
+
+    def rank(self, player: PlayerId) -> int | None:
+        """1 for the best player, players with the same rating share a rank."""
+        rating = self.ratings.get(player)
+        if rating is None:
+            return None
+
+        return self.counts.prefix(_index(rating.rating) - 1) + 1
+
+    def top(self, count: int) -> list[tuple[int, Rating]]:
+        """The `count` best players, with their rank."""
+        entries = []
+        position = 1
+
+        while position <= min(count, len(self.ratings)):
+            index = self.counts.find(position)
+            bucket = self.buckets[index]
+            entries.extend((position, self.ratings[player]) for player in islice(bucket, count - len(entries)))
+            position += len(bucket)
+
+        return entries
+
+    def _get(self, player: PlayerId) -> Rating:
+        rating = self.ratings.get(player)
+
+        if rating is None:
+            rating = self.ratings[player] = Rating(player)
+            self._insert(player, _index(rating.rating))
+
+        return rating
+
+    def _move(self, rating: Rating, value: float):
+        old, new = _index(rating.rating), _index(value)
+        rating.rating = value
+
+        if old != new:
+            self._remove(rating.player, old)
+            self._insert(rating.player, new)
+
+    def _insert(self, player: PlayerId, index: int):
+        self.buckets.setdefault(index, {})[player] = None
+        self.counts.add(index, 1)
+
+    def _remove(self, player: PlayerId, index: int):
+        bucket = self.buckets[index]
+        del bucket[player]
+        if not bucket:
+            del self.buckets[index]
+        self.counts.add(index, -1)
+
+
+def _index(rating: float) -> int:
+    """Index of the bucket of a rating in the tree, 1 for the highest ratings."""
+    bucket = min(max(round(rating * RATING_SCALE), 0), MAX_RATING * RATING_SCALE)
+    return MAX_RATING * RATING_SCALE - bucket + 1
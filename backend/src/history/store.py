@@ -0,0 +1,203 @@
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from backend.src.engine.board import NOT_SHOT, SHOT_HIT
+from backend.src.engine.game import PlayerId
+from backend.src.engine.game_session import GameSession
+from backend.src.history.leaderboard import Rating
+
+HISTORY_DB_ENV = "BATTLESHIP_HISTORY_DB"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    seed TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    winner TEXT,
+    turns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    player TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    shots INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (game_id, player)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS games_finished_at ON games (finished_at);
+CREATE INDEX IF NOT EXISTS games_winner ON games (winner);
+CREATE INDEX IF NOT EXISTS games_turns ON games (turns);
+-- covers the per player statistics, they are computed from the index alone
+CREATE INDEX IF NOT EXISTS game_players_player ON game_players (player, won, shots, hits);
+-- the leaderboard saved on shutdown, best first, and the last game it includes
+CREATE TABLE IF NOT EXISTS ratings (
+    position INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    rating REAL NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ratings_checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_game INTEGER NOT NULL
+);
+"""
+
+"""
+History of the finished games, in a SQLite database (opt-in, with BATTLESHIP_HISTORY_DB).
+
+The registry records a game when it removes it, from a worker thread so the event loop never waits on the disk.
+Games are indexed by date, winner and number of turns, and players by name; the statistics of every player are
+computed in a single pass over the covering index and streamed, whatever the number of games. The ratings are
+saved on shutdown with the last game they include, so the next start only replays the games recorded after it.
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class PlayerRecord:
+    player: PlayerId
+    won: bool
+    shots: int
+    hits: int
+
+
+@dataclass(slots=True, frozen=True)
+class GameRecord:
+    code: str
+    seed: int
+    finished_at: float
+    winner: PlayerId | None
+    players: tuple[PlayerRecord, ...]
+
+    @property
+    def turns(self) -> int:
+        return sum(player.shots for player in self.players)
+
+    @classmethod
+    def of(cls, code: str, session: GameSession) -> "GameRecord":
+        game = session.game
+        players = []
+
+        for player_id in game.boards:
+            # the shots of a player are on their opponent's board
+            shots = game.boards[game.get_opponent(player_id)].shots
+            players.append(PlayerRecord(player=player_id, won=player_id == game.winner,
+                                        shots=len(shots) - shots.count(NOT_SHOT), hits=shots.count(SHOT_HIT)))
+
+        return cls(code=code, seed=game.seed, finished_at=session.last_activity, winner=game.winner,
+                   players=tuple(players))
+
+
+@dataclass(slots=True, frozen=True)
+class PlayerStats:
+    player: PlayerId
+    games: int
+    wins: int
+    shots: int
+    hits: int
+    shots_in_wins: int
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def shots_to_win(self) -> float | None:
+        return self.shots_in_wins / self.wins if self.wins else None
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.shots if self.shots else 0.0
+
+
+class HistoryStore:
+    def __init__(self, path: str):
+        self.path = path
+        # written from worker threads, one at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+
+        with self.lock:
+            # readers (the analytics) don't block the server's writes
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+    def record(self, game: GameRecord):
+        self.record_many((game,))
+
+    def record_many(self, games: Iterable[GameRecord]):
+        with self.lock, self.connection:
+            for game in games:
+                cursor = self.connection.execute(
+                    "INSERT INTO games (code, seed, finished_at, winner, turns) VALUES (?, ?, ?, ?, ?)",
+                    (game.code, format(game.seed, "x"), game.finished_at, game.winner, game.turns),
+                )
+                self.connection.executemany(
+                    "INSERT INTO game_players (game_id, player, won, shots, hits) VALUES (?, ?, ?, ?, ?)",
+                    [(cursor.lastrowid, p.player, p.won, p.shots, p.hits) for p in game.players],
+                )
+
+    def results(self, after: int = 0) -> Iterator[tuple[PlayerId, PlayerId]]:
+        """(winner, loser) of every game recorded after the game `after`, in the order they were recorded."""
+        connection = sqlite3.connect(self.path)
+        try:
+            yield from connection.execute(
+                "SELECT g.winner, p.player FROM games g JOIN game_players p ON p.game_id = g.id AND NOT p.won "
+                "WHERE g.winner IS NOT NULL AND g.id > ? ORDER BY g.id", (after,))
+        finally:
+            connection.close()
+
+    def saved_ratings(self) -> tuple[list[Rating], int]:
+        """The ratings saved by close, best first, and the last game they include (0 if none were saved)."""
+        with self.lock:
+            checkpoint = self.connection.execute("SELECT last_game FROM ratings_checkpoint").fetchone()
+            if checkpoint is None:
+                return [], 0
+
+            rows = self.connection.execute("SELECT player, rating, games, wins FROM ratings ORDER BY position")
+            return [Rating(*row) for row in rows], checkpoint[0]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def player_stats(self, since: float | None = None, min_games: int = 1) -> Iterator[PlayerStats]:
+        """The statistics of every player, by name, computed in one pass and yielded as they come."""
+        if since is None:
+            query = ("SELECT player, COUNT(*), SUM(won), SUM(shots), SUM(hits), SUM(won * shots) "
+                     "FROM game_players GROUP BY player HAVING COUNT(*) >= ? ORDER BY player")
+            parameters = (min_games,)
+        else:
+            query = ("SELECT p.player, COUNT(*), SUM(p.won), SUM(p.shots), SUM(p.hits), SUM(p.won * p.shots) "
+                     "FROM game_players p JOIN games g ON g.id = p.game_id WHERE g.finished_at >= ? "
+                     "GROUP BY p.player HAVING COUNT(*) >= ? ORDER BY p.player")
+            parameters = (since, min_games)
+
+        # a dedicated connection: the cursor is iterated lazily, without holding the writers' lock
+        connection = sqlite3.connect(self.path)
+        try:
+            for row in connection.execute(query, parameters):
+                yield PlayerStats(*row)
+        finally:
+            connection.close()
+
+    def close(self, ratings: Iterable[Rating] | None = None):
+        """
+        Closes the database, after saving `ratings` (the leaderboard, best first) if given. They are saved with the
+        last game recorded, under the writers' lock: a game recorded from a worker thread in the meantime would be
+        rated twice on the next start.
+        """
+        with self.lock:
+            if ratings is not None:
+                with self.connection:
+                    last_game = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+                    self.connection.execute("DELETE FROM ratings")
+                    self.connection.executemany(
+                        "INSERT INTO ratings (player, rating, games, wins) VALUES (?, ?, ?, ?)",
+                        ((r.player, r.rating, r.games, r.wins) for r in ratings))
+                    self.connection.execute("INSERT OR REPLACE INTO ratings_checkpoint (id, last_game) VALUES (1, ?)",
+                                            (last_game,))
+            self.connection.close()
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import secrets
+import tempfile
+import threading
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response, FileResponse
+from starlette.background import BackgroundTask
+
+from backend.src.diagnostics.profiler import cpu_profiler, memory_profiler, clamp_window
+from backend.src.diagnostics.tracing import tracer, TRACE_FILE_ENV
+from backend.src.engine.errors import ProfilingError
+
+ADMIN_TOKEN_ENV = "BATTLESHIP_ADMIN_TOKEN"
+
+"""
+Admin-only endpoints, disabled unless BATTLESHIP_ADMIN_TOKEN is set.
+Clients authenticate with the `X-Admin-Token` header.
+
+Anything that can take time (joining the sampler thread, snapshots, serialization) runs in a worker
+thread so the event loop keeps serving the games while we look at it.
+"""
+
+
+async def require_admin(x_admin_token: str | None = Header(default=None)):
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+
+    if not expected:
+        raise HTTPException(status_code=404)
+
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+_memory_timer: asyncio.TimerHandle | None = None
+
+
+@router.post("/profile/cpu/start")
+async def start_cpu_profile(seconds: float = 30, interval_ms: float = 5):
+    try:
+        # this coroutine runs on the event loop thread, which is the one we want to sample
+        cpu_profiler.start(threading.get_ident(), seconds, interval_ms / 1000)
+    except ProfilingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {"status": "ok", "seconds": clamp_window(seconds)}
+
+
+@router.post("/profile/cpu/stop")
+async def stop_cpu_profile():
+    cpu_profiler.stop()
+    await asyncio.to_thread(cpu_profiler.join)
+
+    return {"status": "ok", "samples": sum(cpu_profiler.samples.values())}
+
+
+@router.get("/profile/cpu.pstats")
+async def download_pstats():
+    try:
+        data = await asyncio.to_thread(cpu_profiler.pstats)
+    except ProfilingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return Response(content=data, media_type="application/octet-stream",
+                    headers={"Content-Disposition": "attachment; filename=battleship.pstats"})
+
+
+@router.get("/profile/cpu.collapsed")
+async def download_collapsed():
+    try:
+        data = await asyncio.to_thread(cpu_profiler.collapsed)
+    except ProfilingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return PlainTextResponse(data, headers={"Content-Disposition": "attachment; filename=battleship.collapsed"})
+
+
+@router.post("/profile/memory/start")
+async def start_memory_profile(seconds: float = 60, frames: int = 25):
+    global _memory_timer
+
+    try:
+        memory_profiler.start(frames)
+    except ProfilingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    seconds = clamp_window(seconds)
+    _memory_timer = asyncio.get_running_loop().call_later(seconds, memory_profiler.stop)
+
+    return {"status": "ok", "seconds": seconds}
+
+
+@router.post("/profile/memory/snapshot")
+async def take_memory_snapshot(limit: int = 20):
+    try:
+        return await asyncio.to_thread(memory_profiler.take_snapshot, limit)
+    except ProfilingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/profile/memory.snapshot")
+async def download_memory_snapshot():
+    fd, path = tempfile.mkstemp(suffix=".tracemalloc")
+    os.close(fd)
+
+    try:
+        await asyncio.to_thread(memory_profiler.dump, path)
+    except ProfilingError as e:
+        os.remove(path)
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return FileResponse(path, filename="battleship.tracemalloc", background=BackgroundTask(os.remove, path))
+
+
+@router.post("/profile/memory/stop")
+async def stop_memory_profile():
+    if _memory_timer is not None:
+        _memory_timer.cancel()
+
+    memory_profiler.stop()
+    return {"status": "ok"}
+
+
+@router.post("/trace/start")
+async def start_trace():
+    if tracer.enabled:
+        raise HTTPException(status_code=409, detail="Tracing is already running")
+
+    path = os.environ.get(TRACE_FILE_ENV) or os.path.join(tempfile.gettempdir(), "battleship-trace.json")
+    tracer.start(path)
+
+    return {"status": "ok", "path": path}
+
+
+@router.post("/trace/stop")
+async def stop_trace():
+    if not tracer.enabled:
+        raise HTTPException(status_code=409, detail="Tracing is not running")
+
+    tracer.stop()
+    path = await asyncio.to_thread(tracer.write)
+
+    return {"status": "ok", "path": path, "events": len(tracer.events)}
+
+
+@router.get("/trace.json")
+async def download_trace():
+    if tracer.path is None or not os.path.exists(tracer.path):
+        raise HTTPException(status_code=409, detail="No trace written yet")
+
+    return FileResponse(tracer.path, filename="battleship-trace.json", media_type="application/json")
@@ -0,0 +1,303 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+from collections import OrderedDict
+from typing import Annotated, Literal, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from backend.src.commands.commands import Command, PlaceShipCommand, PlaceRandom, FireCommand, PlaceFleetCommand
+from backend.src.engine.board import Board, CellState, NOT_SHOT, SHOT_MISS, SHOT_HIT
+from backend.src.engine.errors import ERROR_CODES, RETRYABLE_ERRORS, InvalidCode, PlayerCountError, TooManyGames, \
+    ServerDraining, RateLimited
+from backend.src.engine.game import GamePhase, PlayerId
+from backend.src.engine.game_session import GameSession
+from backend.src.websockets.game_registry import GameRegistry
+from backend.src.websockets.protocol.message_types import ResponseTypes
+from backend.src.websockets.protocol.requests import CreateGameRequest, ShipPlacement, MAX_FLEET_SIZE
+from backend.src.websockets.rate_limit import TokenBucket, CONNECTION_LIMIT
+
+BOT_SECRET_ENV = "BATTLESHIP_BOT_SECRET"
+MAX_BATCH_SIZE = 32
+DEFAULT_WAIT_SECONDS = 25
+MAX_WAIT_SECONDS = 60
+SIGNATURE_BYTES = 16
+# (tokens per second, burst) of the requests of each bot token, as a websocket connection: a batch is one request
+BOT_LIMIT = CONNECTION_LIMIT
+# buckets kept, the least recently used are dropped first (a bucket unused for a few seconds is full anyway)
+MAX_BOT_BUCKETS = 10_000
+
+# one character per cell, row after row
+CELL_CHARS = {CellState.EMPTY: ".", CellState.SHIP: "#", CellState.HIT: "x", CellState.MISS: "o"}
+# the shots of a board (Board.shots) to the same characters, in a single bytes.translate
+SHOT_CHARS = bytes.maketrans(bytes((NOT_SHOT, SHOT_MISS, SHOT_HIT)), "".join(
+    CELL_CHARS[cell] for cell in (CellState.EMPTY, CellState.MISS, CellState.HIT)).encode())
+SHIP_CHAR = ord(CELL_CHARS[CellState.SHIP])
+EMPTY_CHAR = ord(CELL_CHARS[CellState.EMPTY])
+
+"""
+HTTP API of the bots, under /bots, for workers that don't keep a websocket open.
+
+Creating or joining a game returns a token to send in the `X-Bot-Token` header. The token is the game code and the
+player name signed with a server secret (BATTLESHIP_BOT_SECRET, random per process if not set), so the server keeps
+nothing per bot and any worker can pick up a game. A bot sends its commands in batches (the whole fleet and a shot,
+say), and waits for its turn with a long poll that returns as soon as the game changes. Both answer with a compact
+state: the boards as strings, one character per cell (see CELL_CHARS). The requests of each token are rate limited
+with a token bucket, as the websocket connections are.
+"""
+
+
+class JoinBotGame(BaseModel):
+    player_id: PlayerId
+
+
+class PlaceCommand(BaseModel):
+    type: Literal["place"] = "place"
+    ship: str
+    row: int
+    col: int
+    horizontal: bool
+
+
+class PlaceRandomCommand(BaseModel):
+    type: Literal["place_random"] = "place_random"
+
+
+class PlaceFleetBotCommand(BaseModel):
+    type: Literal["place_fleet"] = "place_fleet"
+    ships: list[ShipPlacement] = Field(min_length=1, max_length=MAX_FLEET_SIZE)
+
+
+class FireBotCommand(BaseModel):
+    type: Literal["fire"] = "fire"
+    row: int
+    col: int
+
+
+BotCommand = Annotated[Union[PlaceCommand, PlaceFleetBotCommand, PlaceRandomCommand, FireBotCommand],
+                       Field(discriminator="type")]
+
+
+class CommandBatch(BaseModel):
+    commands: list[BotCommand] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BotTokens:
+    def __init__(self, secret: bytes):
+        self.secret = secret
+
+    def issue(self, code: str, player_id: PlayerId) -> str:
+        return f"{code}.{self._sign(code, player_id)}.{player_id}"
+
+    def verify(self, token: str) -> tuple[str, PlayerId]:
+        code, signature, player_id = (token.split(".", 2) + ["", ""])[:3]
+
+        if not player_id or not hmac.compare_digest(signature, self._sign(code, player_id)):
+            raise HTTPException(status_code=401, detail="Invalid bot token")
+
+        return code, player_id
+
+    def _sign(self, code: str, player_id: PlayerId) -> str:
+        digest = hmac.new(self.secret, f"{code}\0{player_id}".encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest[:SIGNATURE_BYTES]).decode().rstrip("=")
+
+
+class BotLimiter:
+    """A token bucket per bot token, in an LRU of at most `max_buckets`."""
+
+    def __init__(self, limit: tuple[float, float] = BOT_LIMIT, max_buckets: int = MAX_BOT_BUCKETS):
+        self.limit = limit
+        self.max_buckets = max_buckets
+        self.buckets: OrderedDict[tuple[str, PlayerId], TokenBucket] = OrderedDict()
+
+    def check(self, code: str, player_id: PlayerId):
+        key = (code, player_id)
+        bucket = self.buckets.get(key)
+
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(*self.limit)
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+
+        if not bucket.take():
+            raise RateLimited("Too many requests, slow down")
+
+
+def create_router(registry: GameRegistry) -> APIRouter:
+    router = APIRouter(prefix="/bots")
+    secret = os.environ.get(BOT_SECRET_ENV)
+    tokens = BotTokens(secret.encode() if secret else secrets.token_bytes(32))
+    limiter = BotLimiter()
+
+    # async, so FastAPI runs it on the event loop instead of sending every request through its threadpool
+    async def bot_player(x_bot_token: str = Header()) -> tuple[PlayerId, GameSession]:
+        code, player_id = tokens.verify(x_bot_token)
+
+        try:
+            limiter.check(code, player_id)
+        except RateLimited as e:
+            raise http_error(e)
+
+        session = registry.games.get(code)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Game code {code} does not exist")
+
+        # the bot is still playing, a drain waits for its game
+        session.stamp()
+        return player_id, session
+
+    @router.post("/games")
+    async def create_game(request: CreateGameRequest):
+        try:
+            code, session = registry.create_game(dev_mode=False,
+                                                 time_control=request.time_control() or registry.time_control)
+        except (TooManyGames, ServerDraining) as e:
+            raise http_error(e)
+
+        await session.join(request.player_id)
+        return {"code": code, "token": tokens.issue(code, request.player_id),
+                "state": compact_state(session, request.player_id)}
+
+    @router.post("/games/{code}/join")
+    async def join_game(code: str, request: JoinBotGame):
+        try:
+            session = registry.join_game(code)
+        except (InvalidCode, PlayerCountError) as e:
+            raise http_error(e)
+
+        result = await session.join(request.player_id)
+        if result["status"] == "error":
+            raise HTTPException(status_code=409, detail=result["message"])
+
+        if session.is_ready():
+            await session.broadcast_json({"type": ResponseTypes.GAME_READY})
+
+        return {"code": code, "token": tokens.issue(code, request.player_id),
+                "state": compact_state(session, request.player_id)}
+
+    @router.post("/commands")
+    async def run_commands(batch: CommandBatch, player: tuple[PlayerId, GameSession] = Depends(bot_player)):
+        """Runs the commands in order, up to the first that fails: the ones after it are skipped."""
+        player_id, session = player
+        results = []
+        last_shot = None
+        changed = False
+
+        for command in batch.commands:
+            result = await session.handle_command(player_id, to_command(command))
+
+            if result["status"] == "error":
+                results.append({"type": command.type, "status": "error", "message": result["message"],
+                                "errors": result.get("errors")})
+                break
+
+            results.append({"type": command.type, "status": "ok", "result": result.get("result")})
+            last_shot = result.get("result", last_shot)
+            changed = True
+
+        # the players on a websocket get a single state for the whole batch
+        if changed:
+            await session.broadcast_state(last_shot)
+
+        return {"results": results, "state": compact_state(session, player_id)}
+
+    @router.get("/wait")
+    async def wait_for_turn(timeout: float = Query(default=DEFAULT_WAIT_SECONDS, ge=0, le=MAX_WAIT_SECONDS),
+                            player: tuple[PlayerId, GameSession] = Depends(bot_player)):
+        """Returns when the bot has something to do (place its fleet, shoot) or the game is over, or after `timeout`."""
+        player_id, session = player
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while not must_act(session, player_id) and (remaining := deadline - loop.time()) > 0:
+            try:
+                await asyncio.wait_for(session.wait_for_change(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        return {"ready": must_act(session, player_id), "state": compact_state(session, player_id)}
+
+    @router.get("/state")
+    async def get_state(player: tuple[PlayerId, GameSession] = Depends(bot_player)):
+        player_id, session = player
+        return compact_state(session, player_id)
+
+    return router
+
+
+def to_command(command: BotCommand) -> Command:
+    match command:
+        case PlaceCommand():
+            return PlaceShipCommand(command.ship, (command.row, command.col), command.horizontal)
+        case PlaceFleetBotCommand():
+            return PlaceFleetCommand(tuple((ship.ship, (ship.row, ship.col), ship.horizontal)
+                                           for ship in command.ships))
+        case PlaceRandomCommand():
+            return PlaceRandom(place_all=False)
+        case FireBotCommand():
+            return FireCommand((command.row, command.col))
+
+
+def must_act(session: GameSession, player_id: PlayerId) -> bool:
+    game = session.game
+
+    match game.phase:
+        case GamePhase.SETUP:
+            return not game.boards[player_id].all_ships_placed()
+        case GamePhase.IN_PROGRESS:
+            return game.current_turn == player_id
+        case GamePhase.FINISHED:
+            return True
+
+    return False
+
+
+def compact_state(session: GameSession, player_id: PlayerId) -> dict:
+    game = session.game
+    opponent = game.get_opponent(player_id)
+
+    return {
+        "phase": game.phase.value,
+        "yourTurn": game.current_turn == player_id and game.phase == GamePhase.IN_PROGRESS,
+        "opponent": opponent,
+        "winner": game.winner,
+        "size": game.size,
+        "own": encode_board(game.boards[player_id], reveal_ships=True),
+        "enemy": encode_board(game.boards[opponent], reveal_ships=False) if opponent else None,
+        "enemyShipsSunk": game.boards[opponent].sunk_count if opponent else 0,
+        "clock": session.clock_state(),
+    }
+
+
+def encode_board(board: Board, reveal_ships: bool) -> str:
+    """Board.render as a string, built from the shots without going through the grid."""
+    cells = bytearray(board.shots.translate(SHOT_CHARS))
+
+    if reveal_ships:
+        for row, col in board.occupied:
+            index = row * board.size + col
+            if cells[index] == EMPTY_CHAR:
+                cells[index] = SHIP_CHAR
+
+    return cells.decode()
+
+
+def http_error(e: Exception) -> HTTPException:
+    if isinstance(e, RateLimited):
+        status_code = 429
+    elif type(e) in RETRYABLE_ERRORS:
+        status_code = 503
+    else:
+        status_code = 404 if isinstance(e, InvalidCode) else 409
+
+    return HTTPException(status_code=status_code, detail={
+        "error_code": ERROR_CODES.get(type(e), "UNKNOWN_ERROR"),
+        "message": str(e),
+        "retryable": type(e) in RETRYABLE_ERRORS,
+    })
@@ -1,36 +1,259 @@
 import asyncio
+import json
+import os
 import secrets
+import sqlite3
 import string
+import time
 
-from backend.src.engine.errors import InvalidCode, PlayerCountError, TooManyGames
+from backend.src.diagnostics.log_writer import log_writer
+from backend.src.engine.clock import ClockScheduler, GameClock, TimeControl
+from backend.src.engine.errors import InvalidCode, PlayerCountError, TooManyGames, ServerDraining
+from backend.src.engine.events import Event, GameEvent
+from backend.src.engine.game import PlayerId, GamePhase, Game
 from backend.src.engine.game_session import GameSession
+from backend.src.history.leaderboard import Leaderboard
+from backend.src.history.store import HistoryStore, GameRecord
+from backend.src.websockets.matchmaking import MatchmakingQueue, MatchTicket
+from backend.src.websockets.protocol.message_types import ResponseTypes
+from backend.src.websockets.protocol.responses import MatchFoundResponse
+
+MAX_GAMES_ENV = "BATTLESHIP_MAX_GAMES"
+MEMORY_BUDGET_ENV = "BATTLESHIP_MEMORY_BUDGET_MB"
+DEFAULT_MEMORY_BUDGET_MB = 32
+SNAPSHOT_FILE_ENV = "BATTLESHIP_SNAPSHOT_FILE"
+# default time control of the games, for matchmaking and the games created without one
+TURN_SECONDS_ENV = "BATTLESHIP_TURN_SECONDS"
+GAME_SECONDS_ENV = "BATTLESHIP_GAME_SECONDS"
+DRAIN_POLL_INTERVAL = 0.5
+# a game without any websocket connected (the HTTP bots) is abandoned after this long without a request
+IDLE_PLAYER_SECONDS = 60
+
+# bytes retained by a finished GameSession (the largest stage), measured with backend/benchmarks/session_memory.py
+# and rounded up. Update it when the session representation changes.
+SESSION_MEMORY_BYTES = 64 * 1024
 
 
 # TODO tests
 class GameRegistry:
     def __init__(self):
         self.games: dict[str, GameSession] = {}
-        self.max_number_of_games = 3
+        self.max_number_of_games = max_games_from_env()
+        self.matchmaking = MatchmakingQueue()
+        self.draining = False
+        self.restore_metrics = {"restored": 0, "skipped": 0, "ms": 0.0}
+        self.ratings_metrics = {"loaded": 0, "replayed": 0, "ms": 0.0}
+        # set at startup when BATTLESHIP_HISTORY_DB is
+        self.history: HistoryStore | None = None
+        self.leaderboard = Leaderboard()
+        self.time_control = time_control_from_env()
+        # every clock of the server runs on this one
+        self.clocks = ClockScheduler()
+        self.forfeits: set[asyncio.Task] = set()
 
-    def create_game(self, dev_mode) -> tuple[str, GameSession]:
+    def create_game(self, dev_mode, time_control: TimeControl | None = None) -> tuple[str, GameSession]:
+        if self.draining:
+            raise ServerDraining("The server is restarting, try again in a few seconds")
         if len(self.games) >= self.max_number_of_games:
             raise TooManyGames(f"You cannot create a new game, the limit of {self.max_number_of_games} is reached.")
         code = generate_code()
-        session = GameSession(dev_mode)
+        session = GameSession(dev_mode, code=code)
         self.games[code] = session
+        self.watch(session.game)
+        if time_control:
+            session.clock = GameClock(time_control, self.clocks, self.forfeit_callback(session))
+        log_writer.log("game_created", game=code, seed=session.game.seed)
         return code, session
 
-    def join_game(self, code: str) -> GameSession:
+    def forfeit_callback(self, session: GameSession):
+        def on_timeout(player_id: PlayerId):
+            log_writer.log("clock_expired", game=session.code, player=player_id)
+            task = asyncio.ensure_future(session.forfeit(player_id))
+            self.forfeits.add(task)
+            task.add_done_callback(self.forfeits.discard)
+
+        return on_timeout
+
+    def watch(self, game: Game):
+        """Rates the players of the game when it is won."""
+        def on_game_won(event: Event):
+            loser = game.get_opponent(event.player)
+            try:
+                # after the final shot is broadcast
+                asyncio.get_running_loop().call_soon(self.leaderboard.record, event.player, loser)
+            except RuntimeError:
+                self.leaderboard.record(event.player, loser)
+
+        game.bus.listen((GameEvent.GAME_WON,), on_game_won)
+
+    def get_game(self, code: str) -> GameSession:
         if code not in self.games:
             raise InvalidCode(f"Game code {code} does not exist")
 
-        session = self.games[code]
+        return self.games[code]
+
+    def join_game(self, code: str) -> GameSession:
+        session = self.get_game(code)
 
         if len(session.connected) >= 2:
             raise PlayerCountError("Required number of players reached")
 
         return session
 
+    async def matchmake(self, player_id: PlayerId, connection) -> MatchTicket:
+        """Pairs the player with the oldest waiting player, or queues them. `ticket.match` is set once paired."""
+        if self.draining:
+            raise ServerDraining("The server is restarting, try again in a few seconds")
+
+        ticket = MatchTicket(player_id, connection)
+        self.matchmaking.enqueue(ticket)
+        await self.pair_waiting_players()
+        return ticket
+
+    async def pair_waiting_players(self):
+        while not self.draining and len(self.matchmaking) >= 2 and len(self.games) < self.max_number_of_games:
+            first = self.matchmaking.pop_oldest()
+            second = self.matchmaking.pop_opponent(first.player_id)
+
+            if second is None:
+                self.matchmaking.requeue(first)
+                return
+
+            code, session = self.create_game(dev_mode=False, time_control=self.time_control)
+
+            for ticket in (first, second):
+                await session.join(ticket.player_id)
+                session.connections[ticket.player_id] = ticket.connection
+                ticket.match = (code, session)
+
+            self.matchmaking.record_match(first, second)
+
+            for ticket, opponent in ((first, second), (second, first)):
+                response = MatchFoundResponse(code=code, opponentName=opponent.player_id)
+                try:
+                    await ticket.connection.send_json(response.model_dump(mode="json"))
+                except Exception:
+                    # the player left right after being matched, they can still rejoin with the code
+                    pass
+
+            await session.broadcast_json({"type": ResponseTypes.GAME_READY})
+
+    async def remove_game(self, code: str):
+        """Forgets the game, after recording it in the history if it has a winner."""
+        session = self.games.pop(code, None)
+        if session is not None:
+            if session.clock is not None:
+                session.clock.stop()
+            log_writer.log("game_removed", game=code, phase=session.game.phase.value, winner=session.game.winner)
+
+        if session is not None and self.history is not None and session.game.winner is not None:
+            try:
+                await asyncio.to_thread(self.history.record, GameRecord.of(code, session))
+            except sqlite3.Error as e:
+                log_writer.log("history_error", game=code, error=str(e))
+
+    def record_finished_games(self):
+        """Records the games with a winner that are still in memory, on shutdown."""
+        if self.history is not None:
+            self.history.record_many(GameRecord.of(code, session) for code, session in self.games.items()
+                                     if session.game.winner is not None)
+
+    def restore_ratings(self):
+        """
+        Rebuilds the leaderboard from the history: the ratings saved on the last shutdown, then the games recorded
+        after them (all of them on the first start, or after a crash). Blocking, run it in a worker thread.
+        """
+        started = time.perf_counter()
+
+        ratings, last_game = self.history.saved_ratings()
+        self.leaderboard.load(ratings)
+        replayed = self.leaderboard.replay(self.history.results(after=last_game))
+
+        self.ratings_metrics = {
+            "loaded": len(ratings),
+            "replayed": replayed,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def games_in_progress(self) -> int:
+        """Games that players are still playing (or setting up), the ones a drain waits for. The games paused by a
+        disconnection, and the bot games abandoned for IDLE_PLAYER_SECONDS, are not waited for."""
+        idle_since = time.time() - IDLE_PLAYER_SECONDS
+        return sum(1 for session in self.games.values()
+                   if session.game.phase in (GamePhase.SETUP, GamePhase.IN_PROGRESS)
+                   and (session.connections or session.last_activity > idle_since))
+
+    async def drain(self, timeout: float) -> int:
+        """Refuses new games, and waits up to `timeout` seconds for the current ones to end. Returns how many are left."""
+        self.draining = True
+        deadline = time.monotonic() + timeout
+
+        while self.games_in_progress() and time.monotonic() < deadline:
+            await asyncio.sleep(DRAIN_POLL_INTERVAL)
+
+        return self.games_in_progress()
+
+    def save_snapshot(self, path: str) -> int:
+        """Writes the unfinished games to `path` (replaced atomically), returns their number."""
+        games = {
+            code: session.to_snapshot() for code, session in self.games.items()
+            if session.game.winner is None and session.players
+        }
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # dumps rather than dump: it goes through the C encoder
+            f.write(json.dumps({"saved_at": time.time(), "games": games}, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+        return len(games)
+
+    def restore_snapshot(self, path: str):
+        """
+        Adds the games saved by save_snapshot, with their players disconnected until they join again.
+        Expired games are skipped, and no more than max_number_of_games are restored. The file is removed once read,
+        so a crash later on does not bring back stale games.
+        """
+        started = time.perf_counter()
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                games = json.load(f)["games"]
+        except FileNotFoundError:
+            return
+        os.remove(path)
+
+        restored = skipped = 0
+        for code, data in games.items():
+            if code in self.games or len(self.games) >= self.max_number_of_games:
+                skipped += 1
+                continue
+
+            try:
+                session = GameSession.from_snapshot(data)
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+                continue
+
+            if session.is_expired():
+                skipped += 1
+                continue
+
+            session.code = code
+            self.games[code] = session
+            self.watch(session.game)
+            if data.get("clock"):
+                session.clock = GameClock.from_snapshot(data["clock"], self.clocks, self.forfeit_callback(session))
+                if session.game_phase_at_disconnect == GamePhase.IN_PROGRESS:
+                    session.clock.start_turn(session.game.current_turn)
+            restored += 1
+
+        self.restore_metrics = {
+            "restored": restored,
+            "skipped": skipped,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
     async def cleanup_loop(self):
         while True:
             await asyncio.sleep(60)
@@ -48,7 +271,28 @@ class GameRegistry:
                 await session.broadcast("Disconnecting because of inactivity")
                 await session.disconnect_all("Inactivity")
 
-                del self.games[code]
+                await self.remove_game(code)
+
+            for ticket in self.matchmaking.expire():
+                await ticket.connection.close(reason="No opponent found")
+
+            await self.pair_waiting_players()
+
+
+def max_games_from_env() -> int:
+    """BATTLESHIP_MAX_GAMES if set, otherwise the number of sessions fitting in BATTLESHIP_MEMORY_BUDGET_MB."""
+    if MAX_GAMES_ENV in os.environ:
+        return int(os.environ[MAX_GAMES_ENV])
+
+    budget = float(os.environ.get(MEMORY_BUDGET_ENV, DEFAULT_MEMORY_BUDGET_MB)) * 2 ** 20
+    return max(1, int(budget // SESSION_MEMORY_BYTES))
+
+
+def time_control_from_env() -> TimeControl:
+    """BATTLESHIP_TURN_SECONDS and BATTLESHIP_GAME_SECONDS, games have no clock when neither is set."""
+    turn_seconds = os.environ.get(TURN_SECONDS_ENV)
+    game_seconds = os.environ.get(GAME_SECONDS_ENV)
+    return TimeControl(float(turn_seconds) if turn_seconds else None, float(game_seconds) if game_seconds else None)
 
 
 def generate_code(length=6) -> str:
@@ -0,0 +1,127 @@
+import itertools
+import time
+from collections import OrderedDict
+
+from backend.src.engine.errors import InvalidRequest
+from backend.src.engine.game import PlayerId
+from backend.src.engine.game_session import GameSession
+
+MATCHMAKING_TIMEOUT = 5 * 60  # 5 minutes
+
+"""
+Queue of the players waiting for an opponent.
+
+Tickets are kept in arrival order in an OrderedDict, and indexed by player name: each name has its tickets in arrival
+order, and the names take turns, a name goes to the back once one of its tickets is paired. Enqueueing, pairing (with
+the first or second name) and removing an abandoned ticket are all O(1), however many tickets share a name, and a
+name with many tickets (a bot) does not hold back the others. Expired tickets are always at the front of the queue. A
+connection has at most one ticket in the queue.
+"""
+
+
+class MatchTicket:
+    _ids = itertools.count()
+
+    def __init__(self, player_id: PlayerId, connection):
+        self.id = next(self._ids)
+        self.player_id = player_id
+        self.connection = connection
+        self.enqueued_at = time.monotonic()
+        self.match: tuple[str, GameSession] | None = None
+
+
+class MatchmakingQueue:
+    def __init__(self, timeout: float = MATCHMAKING_TIMEOUT):
+        self.timeout = timeout
+        self.waiting: OrderedDict[int, MatchTicket] = OrderedDict()
+        self.connections: dict[object, MatchTicket] = {}
+        # player name -> its tickets, names in the order of their turn
+        self.names: OrderedDict[PlayerId, OrderedDict[int, MatchTicket]] = OrderedDict()
+        self.matches = 0
+        self.abandoned = 0
+        self.expired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def __len__(self) -> int:
+        return len(self.waiting)
+
+    def enqueue(self, ticket: MatchTicket):
+        if ticket.connection in self.connections:
+            raise InvalidRequest("Already waiting for an opponent")
+
+        self.waiting[ticket.id] = ticket
+        self.connections[ticket.connection] = ticket
+        self.names.setdefault(ticket.player_id, OrderedDict())[ticket.id] = ticket
+
+    def requeue(self, ticket: MatchTicket):
+        """Puts a ticket back at the front, when a match could not be created."""
+        self.enqueue(ticket)
+        self.waiting.move_to_end(ticket.id, last=False)
+        self.names[ticket.player_id].move_to_end(ticket.id, last=False)
+        self.names.move_to_end(ticket.player_id, last=False)
+
+    def pop_oldest(self) -> MatchTicket | None:
+        if not self.waiting:
+            return None
+
+        return self._remove(next(iter(self.waiting.values())))
+
+    def pop_opponent(self, player_id: PlayerId) -> MatchTicket | None:
+        """
+        The oldest ticket of the next name other than `player_id`: two players with the same name cannot join the
+        same game.
+        """
+        for name, tickets in itertools.islice(self.names.items(), 2):
+            if name != player_id:
+                ticket = self._remove(next(iter(tickets.values())))
+                if name in self.names:
+                    self.names.move_to_end(name)
+                return ticket
+
+        return None
+
+    def cancel(self, ticket: MatchTicket):
+        if ticket.id in self.waiting:
+            self._remove(ticket)
+            self.abandoned += 1
+
+    def _remove(self, ticket: MatchTicket) -> MatchTicket:
+        del self.waiting[ticket.id]
+        del self.connections[ticket.connection]
+
+        tickets = self.names[ticket.player_id]
+        del tickets[ticket.id]
+        if not tickets:
+            del self.names[ticket.player_id]
+
+        return ticket
+
+    def expire(self) -> list[MatchTicket]:
+        deadline = time.monotonic() - self.timeout
+        expired = []
+
+        while self.waiting and next(iter(self.waiting.values())).enqueued_at <= deadline:
+            expired.append(self.pop_oldest())
+
+        self.expired += len(expired)
+        return expired
+
+    def record_match(self, *tickets: MatchTicket):
+        now = time.monotonic()
+        self.matches += 1
+
+        for ticket in tickets:
+            wait = now - ticket.enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def metrics(self) -> dict:
+        return {
+            "waiting": len(self.waiting),
+            "matches": self.matches,
+            "abandoned": self.abandoned,
+            "expired": self.expired,
+            "avg_time_to_match": self.total_wait / (2 * self.matches) if self.matches else 0.0,
+            "max_time_to_match": self.max_wait,
+        }
@@ -0,0 +1,108 @@
+from backend.src.engine.errors import InvalidRequest
+from backend.src.engine.game import PlayerId, GamePhase
+from backend.src.engine.game_session import GameSession
+from backend.src.websockets.outbox import Outbox
+from backend.src.websockets.protocol.message_types import ResponseTypes
+
+# well below the games of a server (BATTLESHIP_MAX_GAMES), a single connection cannot fill it
+MAX_GAMES_PER_CONNECTION = 64
+
+"""
+Games multiplexed over a single /ws/mux connection.
+
+A client plays (create, join) or watches any number of games on one websocket. Every game gets a Channel, which the
+session uses as the connection of the player (or spectator): what it sends is tagged with the code of the game in a
+`game` field, and goes through the Outbox of the connection. Requests name their game the same way. The games that
+are over don't count against the limit of the connection.
+"""
+
+
+class Channel:
+    __slots__ = ("outbox", "code")
+
+    def __init__(self, outbox: Outbox, code: str):
+        self.outbox = outbox
+        self.code = code
+
+    async def send_json(self, payload: dict):
+        self.outbox.put({**payload, "game": self.code})
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        """The game is over for this connection, the websocket stays open for the others."""
+        self.outbox.put({"type": ResponseTypes.NOTIFICATION, "message": reason or "Game closed", "game": self.code})
+
+
+class MuxConnection:
+    def __init__(self, outbox: Outbox, max_games: int = MAX_GAMES_PER_CONNECTION):
+        self.outbox = outbox
+        self.max_games = max_games
+        self.channels: dict[str, Channel] = {}
+        self.playing: dict[str, tuple[PlayerId, GameSession]] = {}
+        self.watching: dict[str, GameSession] = {}
+
+    def check(self, code: str | None = None):
+        """Raises if the connection cannot enter one more game (`code` if it is known yet)."""
+        if code in self.channels:
+            raise InvalidRequest(f"Already in game {code} on this connection")
+
+        if len(self.channels) >= self.max_games:
+            self.release_finished()
+
+        if len(self.channels) >= self.max_games:
+            raise InvalidRequest(f"A connection cannot be in more than {self.max_games} games")
+
+    def open(self, code: str) -> Channel:
+        self.check(code)
+        channel = self.channels[code] = Channel(self.outbox, code)
+        return channel
+
+    def play(self, code: str, player_id: PlayerId, session: GameSession) -> Channel:
+        channel = self.open(code)
+        self.playing[code] = (player_id, session)
+        session.connections[player_id] = channel
+        return channel
+
+    def watch(self, code: str, session: GameSession) -> Channel:
+        channel = self.open(code)
+        self.watching[code] = session
+        session.spectators.append(channel)
+        return channel
+
+    def player(self, code: str | None) -> tuple[PlayerId, GameSession, Channel]:
+        """The player and session of a game played on the connection, for its requests."""
+        if code is None:
+            raise InvalidRequest("Request has no game")
+
+        if code not in self.playing:
+            raise InvalidRequest(f"Not playing game {code} on this connection")
+
+        player_id, session = self.playing[code]
+        return player_id, session, self.channels[code]
+
+    def release_finished(self):
+        """Leaves the games that are over."""
+        for code, (_, session) in list(self.playing.items()):
+            if session.game.phase == GamePhase.FINISHED:
+                self.leave(code)
+
+        for code, session in list(self.watching.items()):
+            if session.game.phase == GamePhase.FINISHED:
+                self.unwatch(code)
+
+    def leave(self, code: str):
+        player_id, session = self.playing.pop(code)
+        session.drop_connection(player_id, self.channels.pop(code))
+
+    def unwatch(self, code: str):
+        session = self.watching.pop(code)
+        channel = self.channels.pop(code)
+        if channel in session.spectators:
+            session.spectators.remove(channel)
+
+    def close(self):
+        """Leaves every game: the players are disconnected from the games they play, as on /ws/json."""
+        for code in list(self.playing):
+            self.leave(code)
+
+        for code in list(self.watching):
+            self.unwatch(code)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from collections import deque
+
+from backend.src.websockets.protocol.message_types import ResponseTypes
+
+# a message of these types makes the pending ones of the same type (and game) obsolete
+SUPERSEDABLE = frozenset({ResponseTypes.STATE, ResponseTypes.SPECTATOR_STATE})
+# messages waiting for a client (superseded ones excluded) before it is considered too slow and disconnected
+MAX_PENDING = 256
+FLUSH_TIMEOUT = 5
+SLOW_CLIENT_CLOSE_CODE = 1008
+
+stats = {"sent": 0, "coalesced": 0, "slow_clients": 0}
+
+"""
+Outgoing messages of a /ws/json or /ws/mux connection.
+
+Sessions and handlers call `send_json` as on the websocket, but the message is serialized right away and queued;
+a writer task per connection sends the queue in order. When a state is queued while an older state for the same
+game is still pending, the older one is skipped: a lagging client only gets the newest state, and every log, chat
+and error message, in order. A client that still falls MAX_PENDING messages behind is disconnected.
+"""
+
+
+class _Frame:
+    __slots__ = ("text", "key", "dead")
+
+    def __init__(self, text: str, key=None):
+        self.text = text
+        self.key = key
+        self.dead = False
+
+
+class Outbox:
+    def __init__(self, ws, max_pending: int = MAX_PENDING):
+        self.ws = ws
+        self.max_pending = max_pending
+        self.pending: deque[_Frame] = deque()
+        self.latest: dict[tuple, _Frame] = {}
+        self.live = 0
+        self.wakeup = asyncio.Event()
+        self.closing = False
+        self.close_args: tuple[int, str | None] | None = None
+        self.task: asyncio.Task | None = None
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def send_json(self, payload: dict):
+        self.put(payload)
+
+    def put(self, payload: dict):
+        if self.closing:
+            raise ConnectionError("Connection is closing")
+
+        key = None
+        message_type = payload.get("type")
+        if message_type in SUPERSEDABLE:
+            key = (message_type, payload.get("game"))
+            previous = self.latest.get(key)
+            if previous is not None:
+                previous.dead = True
+                self.live -= 1
+                stats["coalesced"] += 1
+
+        if self.live >= self.max_pending:
+            stats["slow_clients"] += 1
+            self._close(SLOW_CLIENT_CLOSE_CODE, "Client too slow")
+            raise ConnectionError("Client too slow")
+
+        frame = _Frame(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), key)
+        if key is not None:
+            self.latest[key] = frame
+
+        self.pending.append(frame)
+        self.live += 1
+
+        # superseded frames are skipped when sent, they are only removed here if they pile up
+        if len(self.pending) > 2 * self.live + 16:
+            self.pending = deque(frame for frame in self.pending if not frame.dead)
+
+        self.wakeup.set()
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        """Closes the websocket once the pending messages are sent."""
+        self._close(code, reason)
+
+    async def finish(self, timeout: float = FLUSH_TIMEOUT):
+        """Sends what is pending (up to `timeout`), then stops the writer. The websocket is left open."""
+        self.closing = True
+        self.wakeup.set()
+
+        if self.task is not None:
+            try:
+                await asyncio.wait_for(self.task, timeout)
+            except Exception:
+                # timed out (the writer is cancelled) or the client is already gone
+                pass
+
+    def _close(self, code: int, reason: str | None):
+        if self.close_args is None:
+            self.close_args = (code, reason)
+        self.closing = True
+        self.wakeup.set()
+
+    async def _run(self):
+        while True:
+            while not self.pending:
+                if self.closing:
+                    if self.close_args is not None:
+                        await self.ws.close(*self.close_args)
+                    return
+
+                self.wakeup.clear()
+                await self.wakeup.wait()
+
+            frame = self.pending.popleft()
+            if frame.dead:
+                continue
+
+            self.live -= 1
+            if frame.key is not None and self.latest.get(frame.key) is frame:
+                del self.latest[frame.key]
+
+            if self.close_args is not None and self.close_args[0] == SLOW_CLIENT_CLOSE_CODE:
+                # the client is disconnected, don't bother sending what is left
+                self.pending.clear()
+                continue
+
+            try:
+                await self.ws.send_text(frame.text)
+            except Exception:
+                # the client is gone, the next put tells the session
+                self.closing = True
+                self.pending.clear()
+                return
+
+            stats["sent"] += 1
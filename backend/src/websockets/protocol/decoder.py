@@ -0,0 +1,53 @@
+from typing import Annotated, Union
+
+from pydantic import Field, TypeAdapter, ValidationError
+
+from backend.src.engine.errors import InvalidRequest, MessageTooLarge
+from backend.src.websockets.protocol.requests import CreateGameRequest, JoinGameRequest, MatchmakeRequest, \
+    GetStateRequest, PlaceRandomRequest, FireRequest, ChatRequest, GetWinProbabilityRequest, LeaderboardRequest, \
+    WatchRequest, PlaceFleetRequest
+
+MAX_MESSAGE_SIZE = 4096  # bytes, or characters for text frames
+
+# every request fixes its `type` with a Literal, so the model is picked from the tag alone
+AnyRequest = Annotated[
+    Union[CreateGameRequest, JoinGameRequest, MatchmakeRequest, GetStateRequest, PlaceRandomRequest, FireRequest,
+          ChatRequest, GetWinProbabilityRequest, LeaderboardRequest, WatchRequest, PlaceFleetRequest],
+    Field(discriminator="type"),
+]
+
+"""
+Decoder of the /ws/json and /ws/mux requests.
+
+The validator of the discriminated union is compiled once, and parses the raw websocket frame straight into the
+request model (no intermediate dict, no second pass). Oversized frames are refused before parsing, malformed JSON,
+unknown types and invalid fields raise InvalidRequest.
+"""
+
+_adapter = TypeAdapter(AnyRequest)
+
+
+def decode_request(raw: str | bytes) -> AnyRequest:
+    if len(raw) > MAX_MESSAGE_SIZE:
+        raise MessageTooLarge(f"Message is larger than {MAX_MESSAGE_SIZE} bytes")
+
+    try:
+        return _adapter.validate_json(raw)
+    except ValidationError as e:
+        raise InvalidRequest(_describe(e.errors()[0])) from None
+
+
+def _describe(error: dict) -> str:
+    match error["type"]:
+        case "json_invalid":
+            return "Message is not valid JSON"
+        case "union_tag_invalid":
+            return f"Unknown request type {error['ctx']['tag']}"
+        case "union_tag_not_found":
+            return "Request has no type"
+        case "model_type" | "dict_type":
+            return "Request must be a JSON object"
+
+    # the first element of the location is the request type
+    field = ".".join(str(part) for part in error["loc"][1:])
+    return f"Invalid field {field}: {error['msg']}" if field else error["msg"]
@@ -8,9 +8,14 @@ class RequestTypes(str, Enum):
     JOIN = "join"
     PLACE = "place"
     PLACE_RANDOM = "place_random"
+    PLACE_FLEET = "place_fleet"
     FIRE = "fire"
     GET_STATE = "get_state"
     CHAT = "chat"
+    MATCHMAKE = "matchmake"
+    GET_WIN_PROBABILITY = "get_win_probability"
+    LEADERBOARD = "leaderboard"
+    WATCH = "watch"
 
 
 class ResponseTypes(str, Enum):
@@ -21,10 +26,18 @@ class ResponseTypes(str, Enum):
     ERROR = "error"
     NOTIFICATION = "notification"
     LOG = "log"
+    QUEUED = "queued"
+    MATCH_FOUND = "match_found"
+    WIN_PROBABILITY = "win_probability"
+    LEADERBOARD = "leaderboard"
+    WATCHING = "watching"
+    SPECTATOR_STATE = "spectator_state"
 
 
 class Request(BaseModel):
     type: RequestTypes
+    # on /ws/mux, the code of the game the request is for
+    game: str | None = None
 
 
 class Response(BaseModel):
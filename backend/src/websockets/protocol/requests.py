@@ -1,33 +1,86 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from backend.src.commands.commands import PlaceFleetCommand
+
+from backend.src.engine.clock import TimeControl
 from backend.src.engine.game import PlayerId
 from backend.src.websockets.protocol.message_types import Request, RequestTypes
 
+MAX_CHAT_LENGTH = 200
+MAX_LEADERBOARD_SIZE = 100
+MAX_TURN_SECONDS = 3600
+MAX_GAME_SECONDS = 24 * 3600
+MAX_FLEET_SIZE = 16
+
 
 class CreateGameRequest(Request):
-    type: RequestTypes = RequestTypes.CREATE
+    type: Literal[RequestTypes.CREATE] = RequestTypes.CREATE
     player_id: PlayerId
+    # the time control of the game, the server's default when neither is given
+    turn_seconds: float | None = Field(default=None, gt=0, le=MAX_TURN_SECONDS)
+    game_seconds: float | None = Field(default=None, gt=0, le=MAX_GAME_SECONDS)
+
+    def time_control(self) -> TimeControl:
+        return TimeControl(self.turn_seconds, self.game_seconds)
 
 
 class JoinGameRequest(Request):
-    type: RequestTypes = RequestTypes.JOIN
+    type: Literal[RequestTypes.JOIN] = RequestTypes.JOIN
     player_id: PlayerId
     code: str
 
 
+class MatchmakeRequest(Request):
+    type: Literal[RequestTypes.MATCHMAKE] = RequestTypes.MATCHMAKE
+    player_id: PlayerId
+
+
+class WatchRequest(Request):
+    type: Literal[RequestTypes.WATCH] = RequestTypes.WATCH
+    code: str
+
+
 class GetStateRequest(Request):
-    type: RequestTypes = RequestTypes.GET_STATE
+    type: Literal[RequestTypes.GET_STATE] = RequestTypes.GET_STATE
+
+
+class GetWinProbabilityRequest(Request):
+    type: Literal[RequestTypes.GET_WIN_PROBABILITY] = RequestTypes.GET_WIN_PROBABILITY
+
+
+class LeaderboardRequest(Request):
+    type: Literal[RequestTypes.LEADERBOARD] = RequestTypes.LEADERBOARD
+    top: int = Field(default=10, ge=1, le=MAX_LEADERBOARD_SIZE)
 
 
 class PlaceRandomRequest(Request):
-    type: RequestTypes = RequestTypes.PLACE_RANDOM
+    type: Literal[RequestTypes.PLACE_RANDOM] = RequestTypes.PLACE_RANDOM
     override: bool
 
 
+class ShipPlacement(BaseModel):
+    ship: str
+    row: int
+    col: int
+    horizontal: bool
+
+
+class PlaceFleetRequest(Request):
+    type: Literal[RequestTypes.PLACE_FLEET] = RequestTypes.PLACE_FLEET
+    ships: list[ShipPlacement] = Field(min_length=1, max_length=MAX_FLEET_SIZE)
+
+    def command(self) -> PlaceFleetCommand:
+        return PlaceFleetCommand(tuple((ship.ship, (ship.row, ship.col), ship.horizontal) for ship in self.ships))
+
+
 class FireRequest(Request):
-    type: RequestTypes = RequestTypes.FIRE
+    type: Literal[RequestTypes.FIRE] = RequestTypes.FIRE
     row: int
     col: int
 
 
 class ChatRequest(Request):
-    type: RequestTypes = RequestTypes.CHAT
-    message: str
+    type: Literal[RequestTypes.CHAT] = RequestTypes.CHAT
+    message: str = Field(max_length=MAX_CHAT_LENGTH)
@@ -1,3 +1,5 @@
+from pydantic import BaseModel
+
 from backend.src.engine.board import CellState
 from backend.src.engine.game import GamePhase, PlayerId
 from backend.src.engine.shot import ShotOutcome
@@ -15,6 +17,46 @@ class JoinGameResponse(Response):
     code: str
 
 
+class QueuedResponse(Response):
+    type: ResponseTypes = ResponseTypes.QUEUED
+    waiting: int
+
+
+class MatchFoundResponse(Response):
+    type: ResponseTypes = ResponseTypes.MATCH_FOUND
+    code: str
+    opponentName: PlayerId
+
+
+class WinProbabilityResponse(Response):
+    type: ResponseTypes = ResponseTypes.WIN_PROBABILITY
+    code: str
+    probabilities: dict[PlayerId, float]
+    samples: int
+    cached: bool
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    player: PlayerId
+    rating: float
+    games: int
+    wins: int
+
+
+class LeaderboardResponse(Response):
+    type: ResponseTypes = ResponseTypes.LEADERBOARD
+    players: int
+    entries: list[LeaderboardEntry]
+    you: LeaderboardEntry | None = None
+
+
+class ClockState(BaseModel):
+    turnSecondsLeft: float | None
+    # game time left to each player, without a game limit
+    timeLeft: dict[PlayerId, float] | None
+
+
 class GetStateResponse(Response):
     type: ResponseTypes = ResponseTypes.STATE
 
@@ -37,7 +79,31 @@ class GetStateResponse(Response):
     lastShotResult: ShotOutcome | None
     enemyShipsSunk: int
 
+    clock: ClockState | None = None
+
+
+class WatchingResponse(Response):
+    type: ResponseTypes = ResponseTypes.WATCHING
+    code: str
+
+
+class SpectatorStateResponse(Response):
+    type: ResponseTypes = ResponseTypes.SPECTATOR_STATE
+
+    phase: GamePhase
+    currentPlayer: PlayerId | None
+    winner: PlayerId | None
+    players: list[PlayerId]
+
+    # the boards of both players, without the ships that are not hit
+    boards: dict[PlayerId, list[list[CellState]]]
+    shipsSunk: dict[PlayerId, int]
+
+    clock: ClockState | None = None
+
 
 class ErrorResponse(Response):
     type: ResponseTypes = ResponseTypes.ERROR
     message: str
+    # ship name -> what is wrong with its placement, for an invalid fleet
+    errors: dict[str, str] | None = None
@@ -0,0 +1,84 @@
+import time
+
+from backend.src.engine.errors import RateLimited
+from backend.src.websockets.protocol.message_types import RequestTypes
+
+# (tokens per second, burst) of the whole connection, then of each request type
+CONNECTION_LIMIT = (50, 100)
+REQUEST_LIMITS = {
+    RequestTypes.CHAT: (2, 5),
+    RequestTypes.GET_STATE: (10, 20),
+    RequestTypes.CREATE: (1, 3),
+    RequestTypes.JOIN: (1, 5),
+    RequestTypes.MATCHMAKE: (1, 3),
+    RequestTypes.GET_WIN_PROBABILITY: (1, 3),
+    RequestTypes.LEADERBOARD: (2, 5),
+    RequestTypes.WATCH: (1, 5),
+}
+# a /ws/mux connection carries many games, its limits are this many times higher
+MUX_LIMIT_FACTOR = 20
+# rejected requests in a row before the client is disconnected
+MAX_STRIKES = 20
+
+"""
+Rate limiting of the /ws/json and /ws/mux connections with token buckets.
+
+Every connection has a bucket for all its requests, checked before parsing, and one bucket per request type for the
+expensive ones (chat is broadcast to both players, get_state builds a full state, a win probability runs
+thousands of simulations). A rejected request gets a
+RATE_LIMITED error; a client that keeps sending rejected or invalid requests is disconnected.
+"""
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+class ConnectionLimiter:
+    def __init__(self, connection_limit: tuple[float, float] = CONNECTION_LIMIT,
+                 request_limits: dict[RequestTypes, tuple[float, float]] = None, max_strikes: int = MAX_STRIKES,
+                 factor: float = 1):
+        self.connection = TokenBucket(*(value * factor for value in connection_limit))
+        self.requests = {
+            request_type: TokenBucket(*(value * factor for value in limit))
+            for request_type, limit in (REQUEST_LIMITS if request_limits is None else request_limits).items()
+        }
+        self.max_strikes = max_strikes
+        self.strikes = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.strikes >= self.max_strikes
+
+    def check_connection(self):
+        if not self.connection.take():
+            raise RateLimited("Too many requests, slow down")
+
+    def check_request(self, request_type: RequestTypes):
+        bucket = self.requests.get(request_type)
+
+        if bucket is not None and not bucket.take():
+            raise RateLimited(f"Too many {request_type.value} requests, slow down")
+
+        self.strikes = 0
+
+    def strike(self):
+        """A request was rejected (rate limited or invalid)."""
+        self.strikes += 1
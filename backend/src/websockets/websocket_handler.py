@@ -1,35 +1,96 @@
 import asyncio
+import os
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query
+from backend.src.bots.win_probability import WinProbability
 from backend.src.commands.command_parser import parse_command
-from backend.src.commands.commands import PlaceRandom, FireCommand
-from backend.src.engine.errors import ERROR_CODES
+from backend.src.commands.commands import PlaceRandom, FireCommand, PlaceFleetCommand
+from backend.src.diagnostics.log_writer import log_writer, LOG_DIR_ENV
+from backend.src.diagnostics.tracing import tracer, TRACE_FILE_ENV
+from backend.src.engine.errors import ERROR_CODES, RETRYABLE_ERRORS, InvalidRequest, MessageTooLarge, RateLimited, \
+    WrongPhase, NotEnoughSamples
+from backend.src.engine.events import GameEvent, Subscription
 from backend.src.engine.game import GamePhase, PlayerId
 from backend.src.engine.game_session import GameSession
+from backend.src.history.leaderboard import Rating
+from backend.src.history.store import HistoryStore, HISTORY_DB_ENV
 from backend.src.shared.render import render_grid, render_ship_status
-from backend.src.websockets.game_registry import GameRegistry
+from backend.src.websockets import admin, bots_api
+from backend.src.websockets.game_registry import GameRegistry, SNAPSHOT_FILE_ENV
+from backend.src.websockets.protocol.decoder import decode_request
 from backend.src.websockets.protocol.log_event import LogEvent, LogKind
 from backend.src.websockets.protocol.message_types import RequestTypes, ResponseTypes
 from backend.src.websockets.protocol.notifications import Notification
-from backend.src.websockets.protocol.requests import CreateGameRequest, JoinGameRequest, GetStateRequest, \
-    PlaceRandomRequest, FireRequest, ChatRequest
-from backend.src.websockets.protocol.responses import CreateGameResponse, JoinGameResponse, ErrorResponse
+from backend.src.websockets.matchmaking import MatchTicket
+from backend.src.websockets.mux import Channel, MuxConnection
+from backend.src.websockets.outbox import Outbox, stats as outbox_stats
+from backend.src.websockets.rate_limit import ConnectionLimiter, MUX_LIMIT_FACTOR
+from backend.src.websockets.protocol.responses import CreateGameResponse, JoinGameResponse, ErrorResponse, \
+    QueuedResponse, WinProbabilityResponse, LeaderboardResponse, LeaderboardEntry, WatchingResponse
+from backend.src.websockets.protocol.requests import MAX_LEADERBOARD_SIZE
 
 app = FastAPI()
+app.include_router(admin.router)
 registry = GameRegistry()
+app.include_router(bots_api.create_router(registry))
+win_probability = WinProbability()
+
+# the text protocol prints the messages of every game event, the json protocol has its own log and state messages
+TEXT_EVENTS = tuple(GameEvent)
+
+# games still running after the drain are saved by the shutdown hook (with BATTLESHIP_SNAPSHOT_FILE)
+DEFAULT_DRAIN_SECONDS = 60
+MAX_DRAIN_SECONDS = 600
 
 
 @app.get("/status")
 def status():
     return {
         "status": "ok",
-        "active_games": len(registry.games)
+        "active_games": len(registry.games),
+        "max_games": registry.max_number_of_games,
+        "matchmaking": registry.matchmaking.metrics(),
+        "outbox": outbox_stats,
+        "draining": registry.draining,
+        "restore": registry.restore_metrics,
+        "ratings": registry.ratings_metrics,
+        "log": log_writer.stats,
+        "clocks": {"running": len(registry.clocks), "timeouts": registry.clocks.timeouts},
     }
 
 
+@app.get("/games/{code}/win-probability")
+async def get_win_probability(code: str):
+    session = registry.games.get(code)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Game code {code} does not exist")
+
+    try:
+        estimate = await win_probability.estimate(code, session.game)
+    except (WrongPhase, NotEnoughSamples) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return WinProbabilityResponse(code=code, **estimate)
+
+
+@app.get("/leaderboard")
+async def get_leaderboard(top: int = Query(default=10, ge=1, le=MAX_LEADERBOARD_SIZE), player: PlayerId | None = None):
+    return leaderboard_response(top, player)
+
+
+@app.post("/admin/drain", dependencies=[Depends(admin.require_admin)])
+async def drain(seconds: float = DEFAULT_DRAIN_SECONDS):
+    """Call before stopping the server: new games are refused, and the running ones get `seconds` to end."""
+    remaining = await registry.drain(min(seconds, MAX_DRAIN_SECONDS))
+    return {"status": "ok", "games_in_progress": remaining, "games": len(registry.games)}
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
-    print("New WebSocket connection")
+    log_writer.log("connected", protocol="text")
+    events: Subscription | None = None
+    code: str | None = None
+    player_id: PlayerId | None = None
 
     try:
         await ws.accept()
@@ -45,9 +106,11 @@ async def websocket_endpoint(ws: WebSocket):
         match parts[0]:
             case "create":
                 code, session = registry.create_game(dev_mode=False)
+                events = session.game.bus.subscribe(TEXT_EVENTS)
                 player_id = await ask_name(ws)
                 await session.join(player_id)
                 session.connections[player_id] = ws
+                tracer.bind(code, player_id)
                 await ws.send_text(f"Game created\nCode: {code}")
                 await ws.send_text("Waiting for opponent to join...")
 
@@ -58,6 +121,7 @@ async def websocket_endpoint(ws: WebSocket):
                 else:
                     code = parts[1]
                 session = registry.join_game(code)
+                events = session.game.bus.subscribe(TEXT_EVENTS)
 
                 while True:
                     player_id = await ask_name(ws)
@@ -74,6 +138,7 @@ async def websocket_endpoint(ws: WebSocket):
                         break
                     await ws.send_text(f"Name '{player_id}' is already used, please use a different name")
 
+                tracer.bind(code, player_id)
                 await ws.send_text(f"Joined game {code}")
 
             case _:
@@ -86,7 +151,9 @@ async def websocket_endpoint(ws: WebSocket):
             try:
                 view = session.get_view(player_id)
                 await display(view, ws)
-                await session.broadcast_events()
+
+                for event in events.drain():
+                    await ws.send_text(event.message)
 
                 if session.game.phase == GamePhase.FINISHED:
                     # todo potentiellement demander pour rejouer
@@ -94,19 +161,20 @@ async def websocket_endpoint(ws: WebSocket):
                     await ws.receive_text()
                     await session.broadcast(f"{player_id} has exited")
                     await session.disconnect_all(f"Game won by {session.game.winner}")
-                    del registry.games[code]
+                    await registry.remove_game(code)
                     break
 
                 prompt = session.get_prompt(player_id)
                 await ws.send_text(prompt)
 
-                text = await ws.receive_text()
+                with tracer.span("websocket_endpoint.receive"):
+                    text = await ws.receive_text()
 
                 match text:
                     case "quit" | "exit":
                         await ws.send_text("Exiting")
                         await session.broadcast(f"Player {player_id} exited the game.")
-                        del registry.games[code]
+                        await registry.remove_game(code)
                         break
                     case "help":
                         await show_help(ws)
@@ -127,7 +195,7 @@ async def websocket_endpoint(ws: WebSocket):
                     await ws.send_text(f"Error: {result['message']}")
 
             except WebSocketDisconnect:
-                print(f"{player_id} disconnected")
+                log_writer.log("disconnected", game=code, player=player_id)
 
                 if session and player_id:
                     session.handle_disconnect(player_id)
@@ -135,61 +203,95 @@ async def websocket_endpoint(ws: WebSocket):
                     await ws.close(reason="Client disconnected")
 
             except asyncio.CancelledError:
-                print(f"{player_id} cancelled / disconnected")
+                log_writer.log("disconnected", game=code, player=player_id, cancelled=True)
                 if session and player_id:
                     session.handle_disconnect(player_id)
                     await session.broadcast(f"{player_id} is disconnected")
                     await ws.close(reason="Client disconnected")
 
             except Exception as e:
-                print(f"error {e}")
+                log_writer.log("error", game=code, player=player_id, error=repr(e))
                 if ws.client_state == ws.client_state.CONNECTED:
                     await ws.send_text(str(e))
 
     except Exception as e:
-        print(f"error is {e}")
+        log_writer.log("error", game=code, player=player_id, error=repr(e))
         if ws.client_state == ws.client_state.CONNECTED:
             await ws.send_text(str(e))
 
+    finally:
+        if events is not None:
+            events.close()
+
 
 @app.websocket("/ws/json")
 async def websocket_json(ws: WebSocket):
     await ws.accept()
+    outbox = Outbox(ws)
+    outbox.start()
+    log_writer.log("connected", protocol="json")
 
     player_id: PlayerId | None = None
     session: GameSession | None = None
     code: str | None = None
+    ticket: MatchTicket | None = None
+    limiter = ConnectionLimiter()
 
     try:
         while True:
-            data = await ws.receive_json()
+            with tracer.span("websocket_json.receive"):
+                raw = await receive_raw(ws)
+
+            try:
+                limiter.check_connection()
+                request = decode_request(raw)
+                limiter.check_request(request.type)
+            except MessageTooLarge as e:
+                await send_json(outbox, error_payload(e))
+                await outbox.close(code=1009, reason="Message too large")
+                break
+            except (InvalidRequest, RateLimited) as e:
+                limiter.strike()
+                await send_json(outbox, error_payload(e))
+
+                if limiter.exhausted:
+                    await outbox.close(code=1008, reason="Too many rejected requests")
+                    break
+                continue
 
-            match data["type"]:
+            # the player was paired while waiting in the matchmaking queue
+            if ticket is not None and ticket.match is not None:
+                code, session = ticket.match
+                ticket = None
+                tracer.bind(code, player_id)
+
+            match request.type:
                 case RequestTypes.CREATE:
-                    request = CreateGameRequest(**data)
                     player_id = request.player_id
 
-                    code, session = registry.create_game(dev_mode=False)
+                    code, session = registry.create_game(dev_mode=False,
+                                                         time_control=request.time_control() or registry.time_control)
                     await session.join(request.player_id)
-                    session.connections[request.player_id] = ws
+                    session.connections[request.player_id] = outbox
+                    tracer.bind(code, player_id)
 
                     response = CreateGameResponse(code=code)
-                    await ws.send_json(response.model_dump(mode="json"))
+                    await send_json(outbox, response.model_dump(mode="json"))
 
                 case RequestTypes.JOIN:
-                    request = JoinGameRequest(**data)
                     player_id = request.player_id
                     code = request.code
 
                     session = registry.join_game(code)
 
                     await session.join(request.player_id)
-                    session.connections[request.player_id] = ws
+                    session.connections[request.player_id] = outbox
+                    tracer.bind(code, player_id)
 
                     # TODO gérer statuts reconnected et ok
 
                     response = JoinGameResponse(code=code)
-                    await ws.send_json(response.model_dump(mode="json"))
+                    await send_json(outbox, response.model_dump(mode="json"))
 
                     # TODO surement revoir le format de ça, pour envoyer un state plus complet
                     if session.is_ready():
@@ -197,75 +299,295 @@ async def websocket_json(ws: WebSocket):
                             {"type": ResponseTypes.GAME_READY}
                         )
 
-                # Receives
-                # "type": "place",
-                # "ship": "carrier"
-                # "row": 0
-                # "col": 2
-                # "horizontal": true
+                case RequestTypes.MATCHMAKE:
+                    try:
+                        ticket = await registry.matchmake(request.player_id, outbox)
+                    except InvalidRequest as e:
+                        await send_json(outbox, error_payload(e))
+                        continue
 
-                # Response
-                # "type": "ship_placed",
-                # "ship": "carrier"
-                case "place":
-                    pass
+                    player_id = request.player_id
+                    if ticket.match is None:
+                        await send_json(outbox, QueuedResponse(waiting=len(registry.matchmaking)).model_dump(mode="json"))
+                    else:
+                        code, session = ticket.match
+                        ticket = None
+                        tracer.bind(code, player_id)
+
+                case RequestTypes.PLACE_RANDOM | RequestTypes.PLACE_FLEET | RequestTypes.FIRE | RequestTypes.GET_STATE | \
+                     RequestTypes.CHAT | RequestTypes.GET_WIN_PROBABILITY:
+                    if session is None:
+                        await send_json(outbox, error_payload(InvalidRequest("Create or join a game first")))
+                        continue
 
-                case RequestTypes.PLACE_RANDOM:
-                    request = PlaceRandomRequest(**data)
+                    await game_request(code, player_id, session, outbox, request)
 
-                    result = await session.handle_command(player_id, PlaceRandom(place_all=request.override))
+                case RequestTypes.LEADERBOARD:
+                    await send_json(outbox, leaderboard_response(request.top, player_id).model_dump(mode="json"))
 
-                    if result["status"] == "error":
-                        await ws.send_json(ErrorResponse(message=result["message"]).model_dump(mode="json"))
-                        continue
+                case RequestTypes.WATCH:
+                    await send_json(outbox, error_payload(InvalidRequest("Watching a game is only available on /ws/mux")))
 
-                    notif = Notification(message="Your fleet has been deployed, waiting for other player")
-                    await ws.send_json(notif.model_dump(mode="json"))
+    except WebSocketDisconnect:
+        pass
 
-                    await session.broadcast_state()
-
-                # Receives
-                # "type": "fire",
-                # "row": 0
-                # "col": 2
+    except Exception as e:
+        log_writer.log("error", game=code, player=player_id, error=repr(e))
+        if not outbox.closing:
+            await send_json(outbox, error_payload(e))
 
-                # Response
-                # "type": "hit" | "missed" | "sunk",
-                case RequestTypes.FIRE:
-                    request = FireRequest(**data)
+    finally:
+        if ticket is not None:
+            registry.matchmaking.cancel(ticket)
 
-                    result = await session.handle_command(player_id, FireCommand((request.row, request.col)))
+        if session is not None:
+            session.drop_connection(player_id, outbox)
 
-                    if result["status"] == "error":
-                        await ws.send_json(ErrorResponse(message=result["message"]).model_dump(mode="json"))
-                        continue
+        await outbox.finish()
+        log_writer.log("disconnected", game=code, player=player_id, protocol="json")
 
-                    await session.broadcast_state(result["result"])
 
-                case RequestTypes.GET_STATE:
-                    request = GetStateRequest(**data)
-                    response = session.build_state(player_id)
+@app.websocket("/ws/mux")
+async def websocket_mux(ws: WebSocket):
+    """The /ws/json requests for any number of games, each tagged with its game code (see websockets.mux)."""
+    await ws.accept()
+    outbox = Outbox(ws)
+    outbox.start()
+    mux = MuxConnection(outbox)
+    limiter = ConnectionLimiter(factor=MUX_LIMIT_FACTOR)
+    log_writer.log("connected", protocol="mux")
 
-                    await ws.send_json(response.model_dump(mode="json"))
+    try:
+        while True:
+            with tracer.span("websocket_mux.receive"):
+                raw = await receive_raw(ws)
 
-                case RequestTypes.CHAT:
-                    request = ChatRequest(**data)
-                    event = LogEvent(kind=LogKind.CHAT, message=f"🗨️ {player_id}: {request.message}")
+            request = None
+            try:
+                limiter.check_connection()
+                request = decode_request(raw)
+                limiter.check_request(request.type)
+                await mux_request(mux, request)
+            except MessageTooLarge as e:
+                await send_json(outbox, error_payload(e))
+                await outbox.close(code=1009, reason="Message too large")
+                break
+            except (InvalidRequest, RateLimited) as e:
+                limiter.strike()
+                await send_json(outbox, {**error_payload(e), "game": request_game(request)})
+
+                if limiter.exhausted:
+                    await outbox.close(code=1008, reason="Too many rejected requests")
+                    break
+            except ConnectionError:
+                # the outbox is closing, the client is too slow or gone
+                break
+            except Exception as e:
+                # the request failed for its game only, the other games of the connection go on
+                await send_json(outbox, {**error_payload(e), "game": request_game(request)})
 
-                    await session.log_event(event)
+    except WebSocketDisconnect:
+        pass
 
     except Exception as e:
-        await ws.send_json({
-            "type": "error",
-            "error_code": ERROR_CODES.get(type(e), "UNKNOWN_ERROR"),
-            "message": str(e)
-        })
+        log_writer.log("error", protocol="mux", error=repr(e))
+        if not outbox.closing:
+            await send_json(outbox, error_payload(e))
+
+    finally:
+        games = len(mux.channels)
+        mux.close()
+        await outbox.finish()
+        log_writer.log("disconnected", protocol="mux", games=games)
+
+
+async def mux_request(mux: MuxConnection, request):
+    match request.type:
+        case RequestTypes.CREATE:
+            mux.check()
+            code, session = registry.create_game(dev_mode=False,
+                                                 time_control=request.time_control() or registry.time_control)
+            await session.join(request.player_id)
+            channel = mux.play(code, request.player_id, session)
+            await channel.send_json(CreateGameResponse(code=code).model_dump(mode="json"))
+
+        case RequestTypes.JOIN:
+            mux.check(request.code)
+            session = registry.join_game(request.code)
+
+            result = await session.join(request.player_id)
+            if result["status"] == "error":
+                raise InvalidRequest(result["message"])
+
+            channel = mux.play(request.code, request.player_id, session)
+            await channel.send_json(JoinGameResponse(code=request.code).model_dump(mode="json"))
+
+            if session.is_ready():
+                await session.broadcast_json({"type": ResponseTypes.GAME_READY})
+
+        case RequestTypes.WATCH:
+            session = registry.get_game(request.code)
+            channel = mux.watch(request.code, session)
+            await channel.send_json(WatchingResponse(code=request.code).model_dump(mode="json"))
+            await channel.send_json(session.build_spectator_state())
+
+        case RequestTypes.GET_STATE if request.game in mux.watching:
+            await mux.channels[request.game].send_json(mux.watching[request.game].build_spectator_state())
+
+        case RequestTypes.PLACE_RANDOM | RequestTypes.PLACE_FLEET | RequestTypes.FIRE | RequestTypes.GET_STATE | \
+             RequestTypes.CHAT | RequestTypes.GET_WIN_PROBABILITY:
+            player_id, session, channel = mux.player(request.game)
+            await game_request(request.game, player_id, session, channel, request)
+
+        case RequestTypes.LEADERBOARD:
+            await send_json(mux.outbox, leaderboard_response(request.top, None).model_dump(mode="json"))
+
+        case RequestTypes.MATCHMAKE:
+            raise InvalidRequest("Matchmaking is not available on /ws/mux, use /ws/json")
+
+
+def placement_command(request) -> PlaceRandom | PlaceFleetCommand:
+    if request.type == RequestTypes.PLACE_FLEET:
+        return request.command()
+    return PlaceRandom(place_all=request.override)
+
+
+def request_game(request) -> str | None:
+    """The game a /ws/mux request is about, to tag its errors."""
+    if request is None:
+        return None
+    return request.game or getattr(request, "code", None)
+
+
+async def game_request(code: str, player_id: PlayerId, session: GameSession, connection: Outbox | Channel, request):
+    """The requests of a player in a game, answered on `connection`: the outbox of /ws/json or a /ws/mux channel."""
+    match request.type:
+        # Receives
+        # "type": "place_fleet",
+        # "ships": [{"ship": "carrier", "row": 0, "col": 2, "horizontal": true}, ...]
+
+        # Response
+        # the state, or an error with what is wrong with each ship in "errors"
+        case RequestTypes.PLACE_RANDOM | RequestTypes.PLACE_FLEET:
+            result = await session.handle_command(player_id, placement_command(request))
+
+            if result["status"] == "error":
+                error = ErrorResponse(message=result["message"], errors=result.get("errors"))
+                await send_json(connection, error.model_dump(mode="json"))
+                return
+
+            notif = Notification(message="Your fleet has been deployed, waiting for other player")
+            await send_json(connection, notif.model_dump(mode="json"))
+            await session.broadcast_state()
+
+        # Receives
+        # "type": "fire",
+        # "row": 0
+        # "col": 2
+
+        # Response
+        # "type": "hit" | "missed" | "sunk",
+        case RequestTypes.FIRE:
+            result = await session.handle_command(player_id, FireCommand((request.row, request.col)))
+
+            if result["status"] == "error":
+                await send_json(connection, ErrorResponse(message=result["message"]).model_dump(mode="json"))
+                return
+
+            await session.broadcast_state(result["result"])
+
+        case RequestTypes.GET_STATE:
+            await send_json(connection, session.build_state(player_id))
+
+        case RequestTypes.GET_WIN_PROBABILITY:
+            try:
+                estimate = await win_probability.estimate(code, session.game)
+            except (WrongPhase, NotEnoughSamples) as e:
+                await send_json(connection, ErrorResponse(message=str(e)).model_dump(mode="json"))
+                return
+
+            await send_json(connection, WinProbabilityResponse(code=code, **estimate).model_dump(mode="json"))
+
+        case RequestTypes.CHAT:
+            await session.log_event(LogEvent(kind=LogKind.CHAT, message=f"🗨️ {player_id}: {request.message}"))
 
 
 @app.on_event("startup")
 async def startup():
+    log_writer.start(os.environ.get(LOG_DIR_ENV))
+
+    if snapshot_file := os.environ.get(SNAPSHOT_FILE_ENV):
+        registry.restore_snapshot(snapshot_file)
+
+    if history_db := os.environ.get(HISTORY_DB_ENV):
+        registry.history = HistoryStore(history_db)
+        # before serving, but off the event loop: the first start replays the whole history
+        await asyncio.to_thread(registry.restore_ratings)
+
     asyncio.create_task(registry.cleanup_loop())
 
+    if trace_file := os.environ.get(TRACE_FILE_ENV):
+        tracer.start(trace_file)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    win_probability.close()
+
+    if registry.history is not None:
+        registry.record_finished_games()
+        registry.history.close(registry.leaderboard.ranked())
+
+    if snapshot_file := os.environ.get(SNAPSHOT_FILE_ENV):
+        registry.draining = True
+        registry.save_snapshot(snapshot_file)
+
+    if tracer.enabled:
+        tracer.stop()
+        await asyncio.to_thread(tracer.write)
+
+    await log_writer.close()
+
+
+async def receive_raw(ws: WebSocket) -> str | bytes:
+    """The payload of the next frame, text or binary, without decoding it."""
+    message = await ws.receive()
+
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+
+    return message["text"] if message.get("text") is not None else message["bytes"]
+
+
+def leaderboard_response(top: int, player_id: PlayerId | None) -> LeaderboardResponse:
+    leaderboard = registry.leaderboard
+    entries = [leaderboard_entry(rank, rating) for rank, rating in leaderboard.top(top)]
+
+    you = None
+    if player_id is not None and (rating := leaderboard.rating(player_id)) is not None:
+        you = leaderboard_entry(leaderboard.rank(player_id), rating)
+
+    return LeaderboardResponse(players=len(leaderboard), entries=entries, you=you)
+
+
+def leaderboard_entry(rank: int, rating: Rating) -> LeaderboardEntry:
+    return LeaderboardEntry(rank=rank, player=rating.player, rating=round(rating.rating, 1), games=rating.games,
+                            wins=rating.wins)
+
+
+def error_payload(e: Exception) -> dict:
+    return {
+        "type": "error",
+        "error_code": ERROR_CODES.get(type(e), "UNKNOWN_ERROR"),
+        "message": str(e),
+        "retryable": type(e) in RETRYABLE_ERRORS,
+    }
+
+
+async def send_json(ws: WebSocket | Outbox, payload: dict):
+    with tracer.span("send_json", message=payload.get("type")):
+        await ws.send_json(payload)
+
 
 async def ask_name(ws: WebSocket) -> str:
     await ws.send_text("What name do you want to use?")
@@ -284,6 +606,7 @@ async def show_help(ws: WebSocket):
     await ws.send_text("""
         Commands:
           place <ship> <row> <col> <h|v>
+          place fleet <ship> <row> <col> <h|v> <ship> <row> <col> <h|v> ...
           place random (all)
           fire <row> <col>
           start
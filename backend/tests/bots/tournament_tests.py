@@ -0,0 +1,88 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.src.bots.strategies import RandomStrategy, HuntTargetStrategy, Strategy, place_randomly
+from backend.src.bots.tournament import play_game, play_chunk, wilson_interval, round_robin, swiss_round, \
+    load_strategy, Standing, Tournament
+from backend.src.engine.board import Board
+
+
+class OutsideShooter(RandomStrategy):
+    def fire(self):
+        return -1, -1
+
+
+class TestStrategies(unittest.TestCase):
+    def test_random_placement_places_the_whole_fleet(self):
+        board = Board()
+        place_randomly(board, random.Random(1))
+
+        assert board.all_ships_placed()
+
+    def test_load_strategy(self):
+        assert load_strategy("hunt_target") is HuntTargetStrategy
+        assert load_strategy("backend.src.bots.strategies:RandomStrategy") is RandomStrategy
+
+        with self.assertRaises(ValueError):
+            load_strategy("unknown")
+
+    def test_strategy_must_implement_fire(self):
+        with self.assertRaises(TypeError):
+            Strategy(10, None)
+
+        for spec in ("backend.src.bots.strategies:Strategy", "backend.src.bots.strategies:place_randomly"):
+            with self.assertRaises(ValueError):
+                load_strategy(spec)
+
+
+class TestPlayGame(unittest.TestCase):
+    def test_same_seed_replays_the_same_game(self):
+        assert play_game(RandomStrategy, HuntTargetStrategy, 42) == play_game(RandomStrategy, HuntTargetStrategy, 42)
+
+    def test_illegal_shot_loses_the_game(self):
+        assert play_game(OutsideShooter, RandomStrategy, 1) == (1, 1)
+
+    def test_hunt_target_beats_random(self):
+        wins_random, wins_hunt, _ = play_chunk(("random", "hunt_target", 7, 0, 200))
+
+        assert wins_random + wins_hunt == 200
+        assert wins_hunt > wins_random
+
+
+class TestRanking(unittest.TestCase):
+    def test_wilson_interval_contains_the_rate(self):
+        low, high = wilson_interval(70, 100)
+
+        assert low < 0.7 < high
+        assert wilson_interval(0, 10)[0] == 0.0
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+
+    def test_round_robin_pairs_everyone_once(self):
+        assert round_robin(["a", "b", "c"]) == [("a", "b"), ("a", "c"), ("b", "c")]
+
+    def test_swiss_round_avoids_rematches(self):
+        standings = {spec: Standing(spec) for spec in "abcd"}
+        standings["a"].points = standings["b"].points = 1
+        standings["a"].opponents = {"c"}
+        standings["b"].opponents = {"d"}
+        standings["c"].opponents = {"a"}
+        standings["d"].opponents = {"b"}
+
+        assert swiss_round(standings) == [("a", "b"), ("c", "d")]
+
+    def test_results_do_not_depend_on_the_workers(self):
+        inline = Tournament(["random", "hunt_target", "parity"], games=60, seed=3, chunk_size=25)
+        inline.round_robin()
+
+        pooled = Tournament(["random", "hunt_target", "parity"], games=60, seed=3, chunk_size=7)
+        with ThreadPoolExecutor(2) as executor:
+            pooled.round_robin(executor)
+
+        assert [(s.spec, s.wins, s.games) for s in inline.ranking()] == \
+               [(s.spec, s.wins, s.games) for s in pooled.ranking()]
+        assert inline.ranking()[-1].spec == "random"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.src.bots.strategies import place_randomly, RandomStrategy
+from backend.src.bots.win_probability import Observation, LayoutSampler, estimate_chunk, WinProbability
+from backend.src.engine.board import Board, SHOT_MISS, SHOT_HIT
+from backend.src.engine.errors import WrongPhase, NotEnoughSamples
+from backend.src.engine.game import Game, GamePhase
+
+
+def played_board(seed: int, shots: int) -> Board:
+    rng = random.Random(seed)
+    board = Board()
+    place_randomly(board, rng)
+
+    targets = [(r, c) for r in range(10) for c in range(10)]
+    rng.shuffle(targets)
+    for coord in targets[:shots]:
+        board.receive_fire(coord)
+
+    return board
+
+
+def impossible_board() -> Board:
+    """A hit no ship can explain: it is surrounded by misses, and all the ships are longer than one cell."""
+    board = Board()
+    board.shots[0] = SHOT_HIT
+    board.shots[1] = board.shots[10] = SHOT_MISS
+    return board
+
+
+def game_in_progress(shots: int) -> Game:
+    game = Game(seed=1)
+    game.boards = {"a": played_board(1, shots), "b": played_board(2, shots)}
+    game.phase = GamePhase.IN_PROGRESS
+    game.current_turn = "a"
+    return game
+
+
+class TestLayoutSampler(unittest.TestCase):
+    def test_layouts_are_consistent_with_the_observation(self):
+        board = played_board(3, 40)
+        observation = Observation.of(board)
+        sampler = LayoutSampler(observation)
+        rng = random.Random(0)
+
+        for _ in range(200):
+            ships = sampler.sample(rng)
+            if ships is None:
+                continue
+
+            assert sampler.open_hits <= ships
+            assert ships.isdisjoint(observation.sunk)
+            assert all(observation.shots[cell] != SHOT_MISS for cell in ships)
+            assert len(ships) == sum(observation.remaining)
+
+    def test_layouts_are_found_until_the_end_of_random_games(self):
+        for seed in range(3, 8):
+            rng = random.Random(seed)
+            board = Board()
+            place_randomly(board, rng)
+            shooter = RandomStrategy(board.size, rng)
+
+            while not board.all_ships_sunk():
+                board.receive_fire(shooter.fire())
+                sampler = LayoutSampler(Observation.of(board))
+
+                assert sampler.sample(rng) is not None
+
+    def test_no_layout_for_an_impossible_observation(self):
+        sampler = LayoutSampler(Observation.of(impossible_board()))
+
+        assert sampler.sample(random.Random(0)) is None
+        assert sampler.shots_needed(random.Random(0)) is None
+
+    def test_shots_needed_only_counts_new_shots(self):
+        board = played_board(4, 95)
+        sampler = LayoutSampler(Observation.of(board))
+
+        assert sampler.shots_needed(random.Random(0)) <= 5
+
+
+class TestEstimate(unittest.TestCase):
+    def test_estimate_replays_from_its_seed(self):
+        first, second = Observation.of(played_board(1, 20)), Observation.of(played_board(2, 20))
+
+        assert estimate_chunk((first, second, 200, 10, 7)) == estimate_chunk((first, second, 200, 10, 7))
+
+    def test_player_close_to_winning_is_favoured(self):
+        first, second = Observation.of(played_board(1, 90)), Observation.of(played_board(2, 10))
+        wins, played = estimate_chunk((first, second, 200, 10, 7))
+
+        assert played == 200
+        assert wins / played > 0.9
+
+
+class TestWinProbability(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.executor = ThreadPoolExecutor(2)
+        self.estimator = WinProbability(samples=200, workers=2, executor=self.executor)
+
+    async def asyncTearDown(self):
+        self.executor.shutdown()
+
+    async def test_estimate_is_cached_until_the_next_shot(self):
+        game = game_in_progress(30)
+
+        first = await self.estimator.estimate("CODE", game)
+        again = await self.estimator.estimate("CODE", game)
+
+        assert not first["cached"] and again["cached"]
+        assert again["probabilities"] == first["probabilities"]
+        assert first["samples"] == 200
+        assert abs(sum(first["probabilities"].values()) - 1) < 1e-9
+
+        coord = next((r, c) for r in range(10) for c in range(10) if not game.boards["b"].shots[r * 10 + c])
+        game.boards["b"].receive_fire(coord)
+
+        assert not (await self.estimator.estimate("CODE", game))["cached"]
+
+    async def test_estimate_after_every_shot_of_a_random_game(self):
+        game = game_in_progress(0)
+        shooters = {player_id: RandomStrategy(game.size, random.Random(player_id)) for player_id in game.boards}
+        estimator = WinProbability(samples=40, workers=1, executor=self.executor)
+
+        while game.phase != GamePhase.FINISHED:
+            await game.fire(game.current_turn, shooters[game.current_turn].fire())
+            estimate = await estimator.estimate("CODE", game)
+
+            assert abs(sum(estimate["probabilities"].values()) - 1) < 1e-9
+
+        assert estimate["probabilities"][game.winner] == 1.0
+
+    async def test_not_enough_samples(self):
+        game = game_in_progress(0)
+        game.boards["b"] = impossible_board()
+
+        with self.assertRaises(NotEnoughSamples):
+            await self.estimator.estimate("CODE", game)
+
+    async def test_finished_game(self):
+        game = game_in_progress(30)
+        game.phase = GamePhase.FINISHED
+        game.winner = "b"
+
+        assert (await self.estimator.estimate("CODE", game))["probabilities"] == {"a": 0.0, "b": 1.0}
+
+    async def test_game_not_started(self):
+        with self.assertRaises(WrongPhase):
+            await self.estimator.estimate("CODE", Game())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from backend.src.cli.batch_adapter import run_script, run_generated, parse_script
+from backend.src.engine.errors import CommandParseError
+from backend.src.engine.game import GamePhase
+from backend.src.engine.game_session import GameSession
+
+
+class TestParseScript(unittest.TestCase):
+    def test_comments_and_empty_lines_are_ignored(self):
+        steps = parse_script(["# comment", "", "alice fire 1 2"])
+
+        assert steps == [(3, "alice", "fire 1 2")]
+
+    def test_line_without_command_should_raise(self):
+        with self.assertRaises(CommandParseError):
+            parse_script(["alice"])
+
+
+class TestRunScript(unittest.IsolatedAsyncioTestCase):
+    async def test_script_is_replayed_and_errors_are_collected(self):
+        lines = [
+            "alice place a 0 0 h",
+            "alice place b 1 0 h",
+            "bob place a 0 0 h",
+            "bob place b 1 0 h",
+            "alice fire 9 9",
+            "alice fire 8 8",
+        ]
+        session = GameSession(dev=True)
+        summary = await run_script(session, "script", lines)
+
+        assert session.players == ["alice", "bob"]
+        assert summary.phase == GamePhase.IN_PROGRESS
+        assert summary.moves == 6
+
+        # whoever starts, alice cannot fire twice in a row
+        assert len(summary.errors) >= 1
+        assert all("not your turn" in error for error in summary.errors)
+
+
+class TestRunGenerated(unittest.IsolatedAsyncioTestCase):
+    async def test_generated_game_is_played_until_the_end(self):
+        summary = await run_generated(GameSession(dev=True), "game")
+
+        assert summary.phase == GamePhase.FINISHED
+        assert summary.winner in ("p1", "p2")
+        assert summary.errors == []
+
+    async def test_same_seed_replays_the_same_game(self):
+        first = await run_generated(GameSession(seed=42), "first")
+        second = await run_generated(GameSession(seed=42), "second")
+
+        assert (first.winner, first.moves) == (second.winner, second.moves)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
 from backend.src.commands.command_parser import parse_command
-from backend.src.commands.commands import PlaceShipCommand, FireCommand, StartGameCommand
+from backend.src.commands.commands import PlaceShipCommand, FireCommand, StartGameCommand, PlaceFleetCommand
 from backend.src.engine.errors import CommandParseError
 
 
@@ -15,6 +15,17 @@ class TestParseCommand(unittest.TestCase):
 
         assert isinstance(cmd, PlaceShipCommand)
 
+    def test_parse_place_fleet(self):
+        cmd = parse_command("place fleet carrier 0 0 h destroyer 2 3 v")
+
+        assert cmd == PlaceFleetCommand((("carrier", (0, 0), True), ("destroyer", (2, 3), False)))
+
+    def test_parse_incomplete_place_fleet_should_raise(self):
+        with self.assertRaises(CommandParseError):
+            parse_command("place fleet carrier 0 0")
+        with self.assertRaises(CommandParseError):
+            parse_command("place fleet carrier a 0 h")
+
     def test_parse_incomplete_fire_command_should_raise(self):
         with self.assertRaises(CommandParseError):
             parse_command("fire wrong")
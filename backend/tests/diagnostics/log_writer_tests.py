@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.src.diagnostics.log_writer import LogWriter, log_writer, LOG_FILE_NAME
+from backend.src.engine.game_session import GameSession
+
+
+def read_records(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestLogWriter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, LOG_FILE_NAME)
+
+    async def test_records_are_written_in_one_batch(self):
+        writer = LogWriter(interval=60)
+        writer.start(self.directory)
+
+        with mock.patch.object(writer, "_write", wraps=writer._write) as write:
+            for index in range(100):
+                writer.log("move", index=index)
+            await writer.close()
+
+        assert write.call_count == 1
+        records = read_records(self.path)
+        assert [record["index"] for record in records] == list(range(100))
+        assert records[0]["event"] == "move"
+        assert writer.stats["written"] == 100
+
+    async def test_queue_is_bounded(self):
+        writer = LogWriter(max_queued=10, interval=60)
+        writer.start(self.directory)
+
+        for index in range(15):
+            writer.log("move", index=index)
+        await writer.close()
+
+        assert len(read_records(self.path)) == 10
+        assert writer.stats["dropped"] == 5
+
+    async def test_files_are_rotated(self):
+        writer = LogWriter(max_bytes=200, backups=2)
+        writer.start(self.directory)
+
+        for index in range(4):
+            writer.log("move", padding="x" * 100)
+            await writer.flush()
+        await writer.close()
+
+        assert sorted(os.listdir(self.directory)) == [LOG_FILE_NAME, f"{LOG_FILE_NAME}.1", f"{LOG_FILE_NAME}.2"]
+
+    async def test_stopped_writer_keeps_nothing(self):
+        writer = LogWriter()
+        writer.log("move")
+
+        assert not writer.queue
+
+    async def test_game_log_is_journaled_with_the_game_code(self):
+        log_writer.start(self.directory)
+        try:
+            session = GameSession(code="ABC123")
+            await session.join("alice")
+        finally:
+            await log_writer.close()
+
+        records = read_records(self.path)
+        assert records[0]["event"] == "game_log"
+        assert records[0]["game"] == "ABC123"
+        assert "alice" in records[0]["message"]
+
+
+if __name__ == "__main__":
+    unittest.main()
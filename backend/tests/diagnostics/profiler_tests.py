@@ -0,0 +1,85 @@
+import os
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+
+from backend.src.diagnostics.profiler import SamplingProfiler, MemoryProfiler
+from backend.src.engine.errors import ProfilingError
+
+
+def _busy_work(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self):
+        self.stop = threading.Event()
+        self.worker = threading.Thread(target=_busy_work, args=(self.stop,))
+        self.worker.start()
+
+        self.profiler = SamplingProfiler()
+        self.profiler.start(self.worker.ident, seconds=0.2, interval=0.001)
+        self.profiler.join()
+
+    def tearDown(self):
+        self.stop.set()
+        self.worker.join()
+
+    def test_collapsed_contains_sampled_function(self):
+        collapsed = self.profiler.collapsed()
+
+        assert "_busy_work" in collapsed
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+    def test_pstats_can_be_loaded(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.profiler.pstats())
+
+        try:
+            stats = pstats.Stats(path)
+            assert any(name == "_busy_work" for _, _, name in stats.stats)
+        finally:
+            os.remove(path)
+
+    def test_cannot_start_twice(self):
+        profiler = SamplingProfiler()
+        profiler.start(self.worker.ident, seconds=1)
+
+        with self.assertRaises(ProfilingError):
+            profiler.start(self.worker.ident, seconds=1)
+
+        profiler.stop()
+        profiler.join()
+
+    def test_no_results_without_samples(self):
+        with self.assertRaises(ProfilingError):
+            SamplingProfiler().collapsed()
+
+
+class TestMemoryProfiler(unittest.TestCase):
+    def test_snapshot_and_diff(self):
+        profiler = MemoryProfiler()
+        profiler.start()
+
+        try:
+            first = profiler.take_snapshot()
+            data = [bytearray(1024) for _ in range(100)]
+            second = profiler.take_snapshot()
+        finally:
+            profiler.stop()
+
+        assert first["diff"] == []
+        assert len(second["diff"]) > 0
+        assert len(data) == 100
+
+    def test_snapshot_requires_tracing(self):
+        with self.assertRaises(ProfilingError):
+            MemoryProfiler().take_snapshot()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+import unittest
+
+from backend.src.commands.command_parser import parse_command
+from backend.src.diagnostics.tracing import tracer, NOOP_SPAN
+from backend.src.engine.game_session import GameSession
+
+
+class TestTracer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+
+    def tearDown(self):
+        tracer.stop()
+        os.remove(self.path)
+
+    async def test_disabled_tracer_records_nothing(self):
+        tracer.start(self.path)
+        tracer.stop()
+
+        assert tracer.span("anything") is NOOP_SPAN
+
+        parse_command("fire 1 2")
+        assert len(tracer.events) == 0
+
+    async def test_spans_are_tagged_and_exported(self):
+        tracer.start(self.path)
+        tracer.bind("ABC123", "p1")
+
+        session = GameSession(dev=True)
+        await session.join("p1")
+        await session.join("p2")
+        await session.handle_command("p1", parse_command("place random"))
+        session.build_state("p1")
+
+        tracer.stop()
+        tracer.write()
+
+        with open(self.path, encoding="utf-8") as f:
+            trace = json.load(f)
+
+        spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        names = {span["name"] for span in spans}
+
+        assert {"parse_command", "GameSession.handle_command", "CommandHandler.execute",
+                "GameSession.build_state"} <= names
+        assert all(span["args"]["game"] == "ABC123" and span["args"]["player"] == "p1" for span in spans)
+        assert any(event["ph"] == "M" and event["args"]["name"] == "game ABC123" for event in trace["traceEvents"])
+
+
+if __name__ == "__main__":
+    unittest.main()
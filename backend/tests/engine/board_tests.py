@@ -1,7 +1,8 @@
 import unittest
 
 from backend.src.engine.board import Board, CellState
-from backend.src.engine.errors import ShipAlreadyPlaced, InvalidPlacement, Overlapping, OutsideShot, AlreadyShot
+from backend.src.engine.errors import ShipAlreadyPlaced, InvalidPlacement, Overlapping, OutsideShot, AlreadyShot, \
+    InvalidFleet
 from backend.src.engine.ships import Ship
 from backend.src.engine.shot import ShotOutcome
 
@@ -32,6 +33,47 @@ class TestPlaceShip(unittest.TestCase):
             board.place_ship(ship2, (0, 0), False)
 
 
+class TestPlaceFleet(unittest.TestCase):
+    def test_whole_fleet_is_placed(self):
+        board = Board()
+        board.place_fleet([(ship.name.lower(), (row, 0), True) for row, ship in enumerate(board.ships)])
+
+        assert board.all_ships_placed()
+        assert board.get_ship_by_name("Destroyer").positions == {(4, 0), (4, 1)}
+        assert board.version == 1
+
+    def test_every_invalid_ship_is_reported_and_nothing_is_placed(self):
+        board = Board()
+
+        with self.assertRaises(InvalidFleet) as error:
+            board.place_fleet([
+                ("Carrier", (0, 0), True),
+                ("Battleship", (0, 2), False),
+                ("Cruiser", (9, 9), True),
+                ("Cruiser", (5, 0), True),
+                ("Yacht", (6, 0), True),
+                ("Submarine", (7, 0), True),
+            ])
+
+        assert error.exception.errors == {
+            "Battleship": "overlaps Carrier",
+            "Cruiser": "placed more than once",
+            "Yacht": "no such ship",
+            "Destroyer": "missing from the fleet",
+        }
+        assert not board.occupied
+        assert not any(ship.is_placed() for ship in board.ships)
+
+    def test_out_of_bounds_ship_is_reported(self):
+        ship = Ship("One", 3)
+        board = Board(ships=[ship])
+
+        with self.assertRaises(InvalidFleet) as error:
+            board.place_fleet([("One", (0, 8), True)])
+
+        assert error.exception.errors == {"One": "does not fit at this position"}
+
+
 class TestReceiveFire(unittest.TestCase):
     def test_if_shot_outside_board_should_raise(self):
         with self.assertRaises(OutsideShot):
@@ -76,6 +118,40 @@ class TestAllShipsSunk(unittest.TestCase):
         assert board.all_ships_sunk()
 
 
+class TestShipStatus(unittest.TestCase):
+    def test_status_is_cached_until_placement_or_hit(self):
+        ship = Ship("One", 2)
+        board = Board(ships=[ship])
+
+        statuses = board.render_ships()
+        assert board.render_ships() is statuses
+        assert statuses[0]["placed"] is False
+
+        board.place_ship(ship, (0, 0), True)
+        statuses = board.render_ships()
+        assert statuses[0]["positions"] == [(0, 0), (0, 1)]
+
+        board.receive_fire((5, 5))  # a miss does not change any ship
+        assert board.render_ships() is statuses
+
+        board.receive_fire((0, 1))
+        assert board.render_ships()[0]["hits"] == [(0, 1)]
+        assert board.render_ships()[0]["health"] == 1
+
+    def test_sunk_count(self):
+        ship1 = Ship("One", 1)
+        ship2 = Ship("Two", 1)
+        board = Board(ships=[ship1, ship2])
+        board.place_ship(ship1, (0, 0), True)
+        board.place_ship(ship2, (1, 0), True)
+
+        board.receive_fire((0, 0))
+
+        assert board.sunk_count == 1
+        assert board.render_ships()[0]["sunk"] is True
+        assert not board.all_ships_sunk()
+
+
 class TestRender(unittest.TestCase):
     def test_render_empty_board(self):
         board = Board(size=3)
@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+
+from backend.src.engine.clock import ClockScheduler, GameClock, TimeControl
+
+
+class TestGameClock(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.scheduler = ClockScheduler()
+        self.timeouts = []
+
+    def clock(self, turn_seconds=None, game_seconds=None) -> GameClock:
+        return GameClock(TimeControl(turn_seconds, game_seconds), self.scheduler, self.timeouts.append)
+
+    async def test_player_times_out_at_the_end_of_the_turn(self):
+        clock = self.clock(turn_seconds=0.05)
+        clock.start_turn("p1")
+
+        await asyncio.sleep(0.1)
+
+        assert self.timeouts == ["p1"]
+        assert clock.player is None
+        assert self.scheduler.timeouts == 1
+
+    async def test_new_turn_replaces_the_deadline(self):
+        clock = self.clock(turn_seconds=0.08)
+        clock.start_turn("p1")
+        await asyncio.sleep(0.05)
+        clock.start_turn("p2")
+        await asyncio.sleep(0.05)
+
+        assert self.timeouts == []
+
+        await asyncio.sleep(0.06)
+
+        assert self.timeouts == ["p2"]
+
+    async def test_stopped_clock_does_not_time_out(self):
+        clock = self.clock(turn_seconds=0.05)
+        clock.start_turn("p1")
+        clock.stop()
+
+        await asyncio.sleep(0.1)
+
+        assert self.timeouts == []
+        assert len(self.scheduler) == 0
+
+    async def test_game_time_is_only_spent_on_your_turns(self):
+        clock = self.clock(game_seconds=10)
+        clock.start_turn("p1")
+        await asyncio.sleep(0.05)
+        clock.start_turn("p2")
+
+        assert clock.time_left("p1") <= 9.95
+        assert 9.99 <= clock.time_left("p2") <= 10
+
+        await asyncio.sleep(0.05)
+
+        assert clock.time_left("p1") == clock.remaining["p1"]
+
+    async def test_turn_deadline_is_capped_by_the_game_time_left(self):
+        clock = self.clock(turn_seconds=30, game_seconds=0.05)
+        clock.start_turn("p1")
+
+        assert clock.turn_time_left() <= 0.05
+
+        await asyncio.sleep(0.1)
+
+        assert self.timeouts == ["p1"]
+        assert clock.time_left("p1") == 0
+
+    async def test_restored_clock_keeps_the_game_time_left(self):
+        clock = self.clock(game_seconds=10)
+        clock.start_turn("p1")
+        await asyncio.sleep(0.05)
+
+        restored = GameClock.from_snapshot(clock.to_snapshot(), self.scheduler, self.timeouts.append)
+
+        assert restored.control == clock.control
+        assert restored.time_left("p1") <= 9.95
+        assert restored.time_left("p2") == 10
+
+
+class TestClockScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_clocks_share_a_single_timer(self):
+        scheduler = ClockScheduler()
+        clocks = [GameClock(TimeControl(turn_seconds=60 + index), scheduler, lambda _: None) for index in range(1000)]
+
+        for clock in clocks:
+            clock.start_turn("p1")
+
+        assert len(scheduler) == 1000
+        assert scheduler.timer.when() == clocks[0].deadline
+
+    async def test_stale_deadlines_are_purged(self):
+        scheduler = ClockScheduler()
+        clocks = [GameClock(TimeControl(turn_seconds=60), scheduler, lambda _: None) for _ in range(100)]
+
+        for _ in range(20):
+            for clock in clocks:
+                clock.start_turn("p1")
+
+        assert len(scheduler) == 100
+        assert len(scheduler.heap) <= 400
+
+    async def test_earlier_deadline_rearms_the_timer(self):
+        scheduler = ClockScheduler()
+        timeouts = []
+        GameClock(TimeControl(turn_seconds=60), scheduler, timeouts.append).start_turn("slow")
+        GameClock(TimeControl(turn_seconds=0.05), scheduler, timeouts.append).start_turn("fast")
+
+        await asyncio.sleep(0.1)
+
+        assert timeouts == ["fast"]
+        assert len(scheduler) == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
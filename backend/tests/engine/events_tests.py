@@ -0,0 +1,68 @@
+import unittest
+
+from backend.src.engine.events import EventBus, GameEvent, Event
+from backend.src.engine.game import Game, GamePhase
+
+
+class TestEventBus(unittest.TestCase):
+    def test_subscriber_only_receives_its_types(self):
+        bus = EventBus()
+        subscription = bus.subscribe([GameEvent.SHOT_RESULT])
+
+        bus.emit(GameEvent.TURN_CHANGED, "turn")
+        bus.emit(GameEvent.SHOT_RESULT, "shot", "p1")
+
+        assert subscription.drain() == [Event(GameEvent.SHOT_RESULT, "shot", "p1")]
+        assert len(subscription) == 0
+
+    def test_buffer_is_bounded(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=2)
+
+        for i in range(5):
+            bus.emit(GameEvent.SHOT_RESULT, str(i))
+
+        assert [event.message for event in subscription.drain()] == ["3", "4"]
+        assert subscription.dropped == 3
+
+    def test_closed_subscription_receives_nothing(self):
+        bus = EventBus()
+        subscription = bus.subscribe()
+        subscription.close()
+
+        bus.emit(GameEvent.GAME_WON, "won")
+
+        assert len(subscription) == 0
+        assert not bus.wants(GameEvent.GAME_WON)
+
+    def test_listener_is_called_on_emit(self):
+        bus = EventBus()
+        received = []
+        bus.listen([GameEvent.GAME_WON], received.append)
+
+        bus.emit(GameEvent.GAME_WON, "won", "p1")
+
+        assert received == [Event(GameEvent.GAME_WON, "won", "p1")]
+
+
+class TestGameEvents(unittest.IsolatedAsyncioTestCase):
+    async def test_game_emits_ships_placed_and_start(self):
+        game = Game(seed=1)
+        game.add_player("p1")
+        game.add_player("p2")
+        game.phase = GamePhase.SETUP
+        subscription = game.bus.subscribe()
+
+        await game.place_random("p1")
+        await game.place_random("p2")
+        await game.start("p1")
+
+        assert [(event.type, event.player) for event in subscription.drain()] == [
+            (GameEvent.SHIPS_PLACED, "p1"),
+            (GameEvent.SHIPS_PLACED, "p2"),
+            (GameEvent.PHASE_CHANGED, None),
+        ]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,13 @@
+import json
 import unittest
 
-from backend.src.commands.commands import PlaceShipCommand, FireCommand
+from backend.src.commands.commands import PlaceShipCommand, FireCommand, PlaceFleetCommand
 from backend.src.engine.errors import PlayerCountError
 from backend.src.engine.game import GamePhase, PlayerId
 from backend.src.engine.game_session import GameSession
 from backend.src.engine.ships import standard_ships
+from backend.src.engine.shot import ShotOutcome
+from backend.src.websockets.protocol.responses import GetStateResponse
 
 
 class TestJoin(unittest.IsolatedAsyncioTestCase):
@@ -54,6 +57,29 @@ class TestHandleCommand(unittest.IsolatedAsyncioTestCase):
         assert response["status"] == "ok"
         assert session.game.phase == GamePhase.SETUP
 
+    async def test_fleet_is_placed_in_one_command(self):
+        session = GameSession()
+        await session.join("p1")
+        await session.join("p2")
+        fleet = tuple((ship.name, (row, 0), True) for row, ship in enumerate(standard_ships()))
+
+        response = await session.handle_command("p1", PlaceFleetCommand(fleet))
+
+        assert response == {"status": "ok", "type": "fleet_placed"}
+        assert session.game.boards["p1"].all_ships_placed()
+
+    async def test_rejected_fleet_has_an_error_per_ship(self):
+        session = GameSession()
+        await session.join("p1")
+        await session.join("p2")
+
+        response = await session.handle_command("p1", PlaceFleetCommand((("Carrier", (0, 8), True),)))
+
+        assert response["status"] == "error"
+        assert response["errors"]["Carrier"] == "does not fit at this position"
+        assert response["errors"]["Destroyer"] == "missing from the fleet"
+        assert not session.game.boards["p1"].occupied
+
     async def test_fire_not_allowed_during_setup(self):
         session = GameSession()
         await session.join("p1")
@@ -133,6 +159,56 @@ class TestHandleCommand(unittest.IsolatedAsyncioTestCase):
         assert result["status"] == "error"
 
 
+class TestBuildState(unittest.IsolatedAsyncioTestCase):
+    async def test_state_matches_the_protocol_model(self):
+        session = await _start_session("p1", "p2")
+        await _place_all_ships(session, "p1", "p2")
+        await session.handle_command(session.game.current_turn, FireCommand((0, 0)))
+
+        state = session.build_state("p1", ShotOutcome.HIT)
+
+        assert json.loads(json.dumps(state)) == GetStateResponse(**state).model_dump(mode="json")
+        assert state["lastShotResult"] == "hit"
+        assert state["ships"][0]["positions"] == [(0, 0), (0, 1), (0, 2), (0, 3), (0, 4)]
+
+
+class TestSnapshot(unittest.IsolatedAsyncioTestCase):
+    async def test_restored_game_resumes_after_the_players_rejoin(self):
+        session = await _start_session("p1", "p2")
+        await _place_all_ships(session, "p1", "p2")
+        shooter = session.game.current_turn
+        await session.handle_command(shooter, FireCommand((0, 0)))
+
+        restored = GameSession.from_snapshot(json.loads(json.dumps(session.to_snapshot())))
+
+        assert restored.game.phase == GamePhase.WAITING_PLAYERS
+        assert not restored.connected
+
+        await restored.join("p1")
+        await restored.join("p2")
+
+        assert restored.game.phase == GamePhase.IN_PROGRESS
+        assert restored.build_state("p1") == session.build_state("p1")
+        assert restored.log == session.log
+        assert restored.game.rng.random() == session.game.rng.random()
+
+        opponent = restored.game.get_opponent(shooter)
+        result = await restored.handle_command(opponent, FireCommand((0, 0)))
+        assert result["result"] == ShotOutcome.HIT
+
+    async def test_board_derived_state_is_rebuilt(self):
+        session = await _start_session("p1", "p2")
+        await _place_all_ships(session, "p1", "p2")
+        await _sink_all_ships(session, session.game.current_turn, session.game.get_opponent(session.game.current_turn))
+
+        restored = GameSession.from_snapshot(json.loads(json.dumps(session.to_snapshot())))
+        loser = restored.game.get_opponent(session.game.winner)
+
+        assert restored.game.boards[loser].all_ships_sunk()
+        assert restored.game.boards[loser].occupied == session.game.boards[loser].occupied
+        assert restored.game.boards[loser].shots == session.game.boards[loser].shots
+
+
 async def _start_session(p1: PlayerId, p2: PlayerId) -> GameSession:
     session = GameSession()
     await session.join(p1)
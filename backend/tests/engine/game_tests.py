@@ -135,8 +135,38 @@ class TestFire(unittest.IsolatedAsyncioTestCase):
         assert game.phase == GamePhase.FINISHED
 
 
-async def _setup_game(start_game=True) -> Game:
-    game = Game()
+class TestPlaceRandom(unittest.IsolatedAsyncioTestCase):
+    async def test_same_seed_gives_same_placement(self):
+        layouts = []
+        for _ in range(2):
+            game = await _setup_game(start_game=False, seed=7)
+            await game.place_random("p1")
+            layouts.append([ship.positions for ship in game.boards["p1"].ships])
+
+        assert layouts[0] == layouts[1]
+        assert all(len(positions) > 0 for positions in layouts[0])
+
+    async def test_games_do_not_share_generator_state(self):
+        game1 = await _setup_game(start_game=False, seed=7)
+        game2 = await _setup_game(start_game=False, seed=7)
+
+        # drawing from one game must not change what the other one draws
+        game1.rng.random()
+        await game2.place_random("p1")
+        await game1.place_random("p1")
+
+        reference = await _setup_game(start_game=False, seed=7)
+        await reference.place_random("p1")
+
+        assert [s.positions for s in game2.boards["p1"].ships] == [s.positions for s in reference.boards["p1"].ships]
+
+    def test_seed_is_recorded(self):
+        assert Game(seed=123).seed == 123
+        assert isinstance(Game().seed, int)
+
+
+async def _setup_game(start_game=True, seed=None) -> Game:
+    game = Game(seed=seed)
     game.add_player("p1")
     game.add_player("p2")
     game.phase = GamePhase.SETUP
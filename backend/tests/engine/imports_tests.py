@@ -0,0 +1,26 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+PROBE = """
+import sys
+import backend.src.cli.main
+import backend.src.bots.tournament
+import backend.src.engine.game_session
+print(",".join(name for name in ("fastapi", "starlette", "pydantic") if name in sys.modules))
+"""
+
+
+class TestEngineImports(unittest.TestCase):
+    def test_engine_and_cli_do_not_import_the_web_stack(self):
+        output = subprocess.run([sys.executable, "-c", PROBE], cwd=REPO_ROOT, capture_output=True, text=True,
+                                check=True).stdout
+
+        assert output.strip() == ""
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.src.engine import placements
+from backend.src.engine.placements import placement_table, CACHE_DIR_ENV
+
+
+class TestPlacementTable(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.env = mock.patch.dict(os.environ, {CACHE_DIR_ENV: self.directory})
+        self.env.start()
+        placements._tables.clear()
+
+    def tearDown(self):
+        self.env.stop()
+        placements._tables.clear()
+
+    def test_every_placement_fits(self):
+        table = placement_table(10, (5, 2))
+
+        assert len(table[5]) == 2 * 10 * 6
+        assert len(table[2]) == 2 * 10 * 9
+
+        for placement in table[5]:
+            (row, col), horizontal = table.decode(placement)
+            cells = list(table.cells(placement, 5))
+
+            assert cells[0] == row * 10 + col
+            assert all(0 <= cell < 100 for cell in cells)
+            assert horizontal == (cells[1] - cells[0] == 1)
+            if horizontal:
+                assert col + 5 <= 10
+
+    def test_table_is_written_once_and_mapped(self):
+        placement_table(8, (3,))
+        files = os.listdir(self.directory)
+        placements._tables.clear()
+
+        table = placement_table(8, (3,))
+
+        assert os.listdir(self.directory) == files
+        assert len(table[3]) == 2 * 8 * 6
+
+    def test_truncated_file_is_rebuilt(self):
+        placement_table(8, (3,))
+        path = os.path.join(self.directory, os.listdir(self.directory)[0])
+        with open(path, "r+b") as f:
+            f.truncate(30)
+        placements._tables.clear()
+
+        assert len(placement_table(8, (3,))[3]) == 2 * 8 * 6
+
+    def test_table_is_kept_in_memory_without_cache_directory(self):
+        blocker = os.path.join(self.directory, "file")
+        open(blocker, "w").close()
+
+        with mock.patch.dict(os.environ, {CACHE_DIR_ENV: blocker}):
+            assert len(placement_table(6, (2,))[2]) == 2 * 6 * 5
+
+
+if __name__ == "__main__":
+    unittest.main()
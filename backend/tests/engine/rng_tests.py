@@ -0,0 +1,18 @@
+import unittest
+
+from backend.src.engine.rng import derive_seed
+
+
+class TestDeriveSeed(unittest.TestCase):
+    def test_derived_seed_is_deterministic(self):
+        assert derive_seed(1, 2) == derive_seed(1, 2)
+
+    def test_derived_seeds_are_distinct(self):
+        seeds = {derive_seed(base, index) for base in range(10) for index in range(1000)}
+
+        assert len(seeds) == 10 * 1000
+        assert all(0 <= seed < 2 ** 64 for seed in seeds)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import random
+import time
+import unittest
+
+from backend.src.cli.batch_adapter import run_generated
+from backend.src.history.leaderboard import Leaderboard, FenwickTree, INITIAL_RATING
+from backend.src.websockets.game_registry import GameRegistry
+
+
+class TestFenwickTree(unittest.TestCase):
+    def test_prefix_and_find(self):
+        tree = FenwickTree(10)
+        for index, count in ((2, 1), (5, 3), (9, 2)):
+            tree.add(index, count)
+
+        assert tree.prefix(4) == 1
+        assert tree.prefix(10) == 6
+        assert [tree.find(count) for count in range(1, 7)] == [2, 5, 5, 5, 9, 9]
+
+
+class TestLeaderboard(unittest.TestCase):
+    def test_winner_takes_the_points_of_the_loser(self):
+        leaderboard = Leaderboard()
+        leaderboard.record("alice", "bob")
+
+        alice, bob = leaderboard.rating("alice"), leaderboard.rating("bob")
+        assert alice.rating == INITIAL_RATING + 16
+        assert bob.rating == INITIAL_RATING - 16
+        assert (alice.games, alice.wins, bob.games, bob.wins) == (1, 1, 1, 0)
+
+    def test_upset_is_worth_more(self):
+        leaderboard = Leaderboard()
+        for _ in range(5):
+            leaderboard.record("alice", "bob")
+        before = leaderboard.rating("bob").rating
+
+        leaderboard.record("bob", "alice")
+
+        assert leaderboard.rating("bob").rating - before > 16
+
+    def test_rank_and_top(self):
+        leaderboard = Leaderboard()
+        leaderboard.record("alice", "bob")
+        leaderboard.record("alice", "carol")
+        leaderboard.record("dave", "erin")
+
+        assert leaderboard.rank("alice") == 1
+        assert leaderboard.rank("unknown") is None
+        # carol lost to a stronger player than bob did, she lost fewer points
+        assert [(rank, rating.player) for rank, rating in leaderboard.top(3)] == [(1, "alice"), (2, "dave"),
+                                                                                 (3, "carol")]
+        # bob and erin have the same rating
+        assert leaderboard.rank("erin") == leaderboard.rank("bob") == 4
+        assert len(leaderboard.top(10)) == 5
+
+    def test_top_reads_only_the_players_shown_from_a_tie(self):
+        leaderboard = Leaderboard()
+        leaderboard.record("alice", "bob")
+        for index in range(200_000):
+            leaderboard._get(f"p{index}")
+
+        started = time.perf_counter()
+        top = leaderboard.top(4)
+        elapsed = time.perf_counter() - started
+
+        # the tied players are listed in the order they reached the rating
+        assert [(rank, rating.player) for rank, rating in top] == [(1, "alice"), (2, "p0"), (2, "p1"), (2, "p2")]
+        assert elapsed < 0.05
+
+    def test_rank_matches_sorting(self):
+        leaderboard = Leaderboard()
+        rng = random.Random(0)
+        players = [f"p{index}" for index in range(200)]
+        for _ in range(2000):
+            winner, loser = rng.sample(players, 2)
+            leaderboard.record(winner, loser)
+
+        ratings = sorted((rating.rating for rating in leaderboard.ratings.values()), reverse=True)
+        for rank, rating in leaderboard.top(50):
+            assert leaderboard.rank(rating.player) == rank
+            assert round(ratings[rank - 1], 2) == round(rating.rating, 2)
+
+
+class TestRegistryRatings(unittest.IsolatedAsyncioTestCase):
+    async def test_players_are_rated_once_the_game_is_won(self):
+        registry = GameRegistry()
+        _, session = registry.create_game(dev_mode=False)
+        await run_generated(session, "rated", ("p1", "p2"))
+        await asyncio.sleep(0)
+
+        winner = session.game.winner
+        assert registry.leaderboard.rank(winner) == 1
+        assert registry.leaderboard.rating(winner).wins == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
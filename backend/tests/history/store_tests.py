@@ -0,0 +1,112 @@
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from backend.src.cli.batch_adapter import run_generated
+from backend.src.engine.game_session import GameSession
+from backend.src.history.analytics import main as analytics_main
+from backend.src.history.leaderboard import Leaderboard
+from backend.src.history.store import HistoryStore, GameRecord, PlayerRecord
+from backend.src.websockets.game_registry import GameRegistry
+
+
+def record(winner: str, loser: str, winner_shots: int, finished_at: float = 1000.0) -> GameRecord:
+    return GameRecord(code="CODE", seed=2 ** 64 - 1, finished_at=finished_at, winner=winner, players=(
+        PlayerRecord(player=winner, won=True, shots=winner_shots, hits=17),
+        PlayerRecord(player=loser, won=False, shots=winner_shots - 1, hits=10),
+    ))
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "history.db")
+        self.store = HistoryStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_player_stats(self):
+        self.store.record_many([record("alice", "bob", 40), record("alice", "bob", 60), record("bob", "alice", 50)])
+
+        stats = {player.player: player for player in self.store.player_stats()}
+
+        assert stats["alice"].games == 3
+        assert stats["alice"].wins == 2
+        assert stats["alice"].shots_to_win == 50
+        assert stats["bob"].win_rate == 1 / 3
+        assert stats["bob"].hit_rate == (17 + 10 + 10) / (39 + 59 + 50)
+
+    def test_since_and_min_games(self):
+        self.store.record_many([record("alice", "bob", 40, finished_at=100), record("carol", "bob", 40, finished_at=200)])
+
+        assert [player.player for player in self.store.player_stats(since=150)] == ["bob", "carol"]
+        assert [player.player for player in self.store.player_stats(min_games=2)] == ["bob"]
+
+    def test_queries_use_the_indexes(self):
+        connection = sqlite3.connect(self.path)
+        plan = " ".join(row[3] for row in connection.execute(
+            "EXPLAIN QUERY PLAN SELECT player, COUNT(*), SUM(won), SUM(shots), SUM(hits) FROM game_players "
+            "GROUP BY player"))
+        connection.close()
+
+        assert "COVERING INDEX game_players_player" in plan
+
+    def test_analytics_command(self):
+        self.store.record_many([record("alice", "bob", 40), record("alice", "bob", 60)])
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            assert analytics_main([self.path, "--top", "1", "--sort", "win_rate"]) == 0
+
+        header, *rows = output.getvalue().splitlines()
+        assert header.split() == ["player", "games", "win", "rate", "shots/win", "hit", "rate"]
+        # the best player only: 34 hits in 100 shots
+        assert [row.split() for row in rows] == [["alice", "2", "100.0%", "50.0", "34.0%"]]
+
+    def test_ratings_are_saved_and_only_later_games_replayed(self):
+        games = [record("alice", "bob", 40), record("carol", "dave", 40), record("erin", "frank", 40)]
+        self.store.record_many(games[:2])
+        saved = Leaderboard()
+        saved.replay(self.store.results())
+        self.store.close(saved.ranked())
+
+        self.store = HistoryStore(self.path)
+        self.store.record(games[2])
+        registry = GameRegistry()
+        registry.history = self.store
+        registry.restore_ratings()
+
+        replayed = Leaderboard()
+        replayed.replay((game.winner, game.players[1].player) for game in games)
+        assert registry.ratings_metrics["loaded"] == 4
+        assert registry.ratings_metrics["replayed"] == 1
+        # same ratings, and the players tied at 1516 (alice, carol, erin) in the same order
+        assert ([(rank, rating.player, rating.rating, rating.games) for rank, rating in registry.leaderboard.top(6)]
+                == [(rank, rating.player, rating.rating, rating.games) for rank, rating in replayed.top(6)])
+
+
+class TestRegistryHistory(unittest.IsolatedAsyncioTestCase):
+    async def test_finished_game_is_recorded_when_removed(self):
+        registry = GameRegistry()
+        registry.history = HistoryStore(os.path.join(tempfile.mkdtemp(), "history.db"))
+        code, session = registry.create_game(dev_mode=False)
+        await run_generated(session, "history", ("p1", "p2"))
+        _, unfinished = registry.create_game(dev_mode=False)
+
+        for code_to_remove in list(registry.games):
+            await registry.remove_game(code_to_remove)
+
+        assert not registry.games
+        assert registry.history.count() == 1
+
+        stats = {player.player: player for player in registry.history.player_stats()}
+        assert stats[session.game.winner].wins == 1
+        assert stats[session.game.winner].hits == 17
+        registry.history.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
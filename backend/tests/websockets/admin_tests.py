@@ -0,0 +1,47 @@
+import os
+import unittest
+from unittest import mock
+
+import httpx
+
+from backend.src.diagnostics.profiler import MAX_PROFILE_SECONDS
+from backend.src.websockets.admin import ADMIN_TOKEN_ENV
+from backend.src.websockets.websocket_handler import app
+
+
+class TestAdminEndpoints(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_admin_endpoints_do_not_exist_without_a_token(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop(ADMIN_TOKEN_ENV, None)
+            response = await self.client.post("/admin/profile/memory/start", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 404
+
+    async def test_wrong_token_is_refused(self):
+        with mock.patch.dict(os.environ, {ADMIN_TOKEN_ENV: "secret"}):
+            missing = await self.client.post("/admin/profile/memory/start")
+            wrong = await self.client.post("/admin/profile/memory/start", headers={"X-Admin-Token": "guess"})
+
+        assert missing.status_code == wrong.status_code == 403
+
+    async def test_profile_windows_are_clamped(self):
+        headers = {"X-Admin-Token": "secret"}
+
+        with mock.patch.dict(os.environ, {ADMIN_TOKEN_ENV: "secret"}):
+            memory = await self.client.post("/admin/profile/memory/start", params={"seconds": -5}, headers=headers)
+            await self.client.post("/admin/profile/memory/stop", headers=headers)
+            cpu = await self.client.post("/admin/profile/cpu/start", params={"seconds": 10 ** 6}, headers=headers)
+            await self.client.post("/admin/profile/cpu/stop", headers=headers)
+
+        assert memory.json()["seconds"] == 0
+        assert cpu.json()["seconds"] == MAX_PROFILE_SECONDS
+
+
+if __name__ == "__main__":
+    unittest.main()
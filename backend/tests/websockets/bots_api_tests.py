@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+
+from backend.src.commands.commands import PlaceRandom, FireCommand
+from backend.src.engine.errors import RateLimited
+from backend.src.engine.game_session import GameSession
+from backend.src.websockets.bots_api import BotTokens, BotLimiter, compact_state, must_act, http_error
+
+
+class TestBotTokens(unittest.TestCase):
+    def setUp(self):
+        self.tokens = BotTokens(b"secret")
+
+    def test_token_names_the_game_and_the_player(self):
+        assert self.tokens.verify(self.tokens.issue("K3J9QX", "bot.v2")) == ("K3J9QX", "bot.v2")
+
+    def test_forged_tokens_are_refused(self):
+        token = self.tokens.issue("K3J9QX", "alice")
+
+        for forged in (token.replace("alice", "bob"), token.replace("K3J9QX", "AAAAAA"), "garbage",
+                       BotTokens(b"other").issue("K3J9QX", "alice")):
+            with self.assertRaises(HTTPException) as error:
+                self.tokens.verify(forged)
+            assert error.exception.status_code == 401
+
+
+class TestBotLimiter(unittest.TestCase):
+    def test_each_token_has_its_own_bucket(self):
+        limiter = BotLimiter(limit=(0, 2))
+
+        for _ in range(2):
+            limiter.check("K3J9QX", "alice")
+        with self.assertRaises(RateLimited) as error:
+            limiter.check("K3J9QX", "alice")
+
+        limiter.check("K3J9QX", "bob")
+        assert http_error(error.exception).status_code == 429
+
+    def test_least_recently_used_buckets_are_dropped(self):
+        limiter = BotLimiter(limit=(0, 1), max_buckets=2)
+
+        for player_id in ("a", "b", "c"):
+            limiter.check("K3J9QX", player_id)
+
+        assert list(limiter.buckets) == [("K3J9QX", "b"), ("K3J9QX", "c")]
+
+
+class TestBotState(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.session = GameSession()
+        await self.session.join("a")
+        await self.session.join("b")
+
+    async def test_bots_act_to_place_their_fleet_then_on_their_turn(self):
+        assert must_act(self.session, "a") and must_act(self.session, "b")
+
+        for player_id in ("a", "b"):
+            await self.session.handle_command(player_id, PlaceRandom(place_all=False))
+
+        shooter = self.session.game.current_turn
+        assert must_act(self.session, shooter)
+        assert not must_act(self.session, self.session.game.get_opponent(shooter))
+
+    async def test_compact_state_has_one_character_per_cell(self):
+        await self.session.handle_command("a", PlaceRandom(place_all=False))
+        await self.session.handle_command("b", PlaceRandom(place_all=False))
+        shooter = self.session.game.current_turn
+        await self.session.handle_command(shooter, FireCommand((0, 0)))
+
+        state = compact_state(self.session, shooter)
+
+        assert len(state["own"]) == len(state["enemy"]) == 100
+        assert state["own"].count("#") + state["own"].count("x") == 17
+        assert state["enemy"][0] in "xo"
+        assert set(state["enemy"][1:]) == {"."}
+        assert not state["yourTurn"]
+
+    async def test_waiters_wake_up_on_the_next_command(self):
+        waiter = asyncio.ensure_future(self.session.wait_for_change())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await self.session.handle_command("a", PlaceRandom(place_all=False))
+
+        await asyncio.wait_for(waiter, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from backend.src.engine.errors import InvalidRequest, MessageTooLarge
+from backend.src.websockets.protocol.decoder import decode_request, MAX_MESSAGE_SIZE
+from backend.src.commands.commands import PlaceFleetCommand
+from backend.src.websockets.protocol.requests import FireRequest, GetStateRequest, JoinGameRequest
+
+
+class TestDecodeRequest(unittest.TestCase):
+    def test_decodes_text_and_bytes_into_the_request_model(self):
+        assert decode_request('{"type": "fire", "row": 1, "col": 2}') == FireRequest(row=1, col=2)
+        assert decode_request(b'{"type": "get_state"}') == GetStateRequest()
+        assert decode_request('{"type": "join", "player_id": "p", "code": "ABC"}') == \
+               JoinGameRequest(player_id="p", code="ABC")
+
+    def test_fleet_layout_becomes_a_single_command(self):
+        request = decode_request('{"type": "place_fleet", "ships": [{"ship": "carrier", "row": 0, "col": 0, '
+                                 '"horizontal": true}, {"ship": "destroyer", "row": 5, "col": 5, "horizontal": false}]}')
+
+        assert request.command() == PlaceFleetCommand((("carrier", (0, 0), True), ("destroyer", (5, 5), False)))
+
+    def test_unknown_type_is_rejected(self):
+        with self.assertRaisesRegex(InvalidRequest, "Unknown request type teleport"):
+            decode_request('{"type": "teleport"}')
+
+    def test_missing_type_is_rejected(self):
+        with self.assertRaisesRegex(InvalidRequest, "no type"):
+            decode_request('{"row": 1}')
+
+    def test_malformed_json_is_rejected(self):
+        with self.assertRaisesRegex(InvalidRequest, "not valid JSON"):
+            decode_request('{"type": "fire", ')
+
+    def test_non_object_is_rejected(self):
+        with self.assertRaisesRegex(InvalidRequest, "JSON object"):
+            decode_request("[1, 2]")
+
+    def test_invalid_field_is_rejected(self):
+        with self.assertRaisesRegex(InvalidRequest, "Invalid field row"):
+            decode_request('{"type": "fire", "row": "a", "col": 2}')
+
+    def test_oversized_message_is_rejected_before_parsing(self):
+        with self.assertRaises(MessageTooLarge):
+            decode_request("{" + " " * MAX_MESSAGE_SIZE + "}")
+
+
+if __name__ == "__main__":
+    unittest.main()
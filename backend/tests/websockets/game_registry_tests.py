@@ -0,0 +1,161 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from backend.src.commands.commands import PlaceRandom
+from backend.src.engine.clock import TimeControl
+from backend.src.engine.errors import TooManyGames, ServerDraining
+from backend.src.engine.game import GamePhase
+from backend.src.websockets.game_registry import GameRegistry, max_games_from_env, SESSION_MEMORY_BYTES, \
+    MAX_GAMES_ENV, MEMORY_BUDGET_ENV, IDLE_PLAYER_SECONDS
+
+
+class TestMaxGames(unittest.TestCase):
+    def test_limit_is_derived_from_the_memory_budget(self):
+        with mock.patch.dict(os.environ, {MEMORY_BUDGET_ENV: "64"}):
+            os.environ.pop(MAX_GAMES_ENV, None)
+
+            assert max_games_from_env() == 64 * 2 ** 20 // SESSION_MEMORY_BYTES
+
+    def test_explicit_limit_wins_over_the_budget(self):
+        with mock.patch.dict(os.environ, {MEMORY_BUDGET_ENV: "64", MAX_GAMES_ENV: "5"}):
+            assert max_games_from_env() == 5
+
+    def test_tiny_budget_still_allows_one_game(self):
+        with mock.patch.dict(os.environ, {MEMORY_BUDGET_ENV: "0.001"}):
+            os.environ.pop(MAX_GAMES_ENV, None)
+
+            assert max_games_from_env() == 1
+
+    def test_create_game_over_the_limit(self):
+        with mock.patch.dict(os.environ, {MAX_GAMES_ENV: "1"}):
+            registry = GameRegistry()
+
+        registry.create_game(dev_mode=False)
+
+        with self.assertRaises(TooManyGames):
+            registry.create_game(dev_mode=False)
+
+
+class TestDrain(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.registry = GameRegistry()
+        self.path = os.path.join(tempfile.mkdtemp(), "snapshot.json")
+
+    async def test_no_new_game_while_draining(self):
+        remaining = await self.registry.drain(timeout=0)
+
+        assert remaining == 0
+        with self.assertRaises(ServerDraining):
+            self.registry.create_game(dev_mode=False)
+        with self.assertRaises(ServerDraining):
+            await self.registry.matchmake("p1", None)
+
+    async def test_games_left_by_a_player_are_not_waited_for(self):
+        _, session = self.registry.create_game(dev_mode=False)
+        connection = mock.AsyncMock()
+        for player_id in ("p1", "p2"):
+            await session.join(player_id)
+            session.connections[player_id] = connection
+
+        assert self.registry.games_in_progress() == 1
+
+        session.drop_connection("p1", connection)
+
+        assert self.registry.games_in_progress() == 0
+        assert session.connected == {"p2"}
+
+    async def test_abandoned_bot_games_are_not_waited_for(self):
+        _, session = self.registry.create_game(dev_mode=False)
+        await session.join("bot1")
+        await session.join("bot2")
+
+        assert self.registry.games_in_progress() == 1
+
+        session.last_activity -= IDLE_PLAYER_SECONDS + 1
+
+        assert self.registry.games_in_progress() == 0
+
+    async def test_unfinished_games_are_restored(self):
+        code, session = self.registry.create_game(dev_mode=False)
+        await session.join("p1")
+        await session.join("p2")
+        _, empty = self.registry.create_game(dev_mode=False)
+
+        assert await self.registry.drain(timeout=0) == 1
+        assert self.registry.save_snapshot(self.path) == 1
+
+        restarted = GameRegistry()
+        restarted.restore_snapshot(self.path)
+
+        assert list(restarted.games) == [code]
+        assert restarted.games[code].game_phase_at_disconnect == GamePhase.SETUP
+        assert restarted.restore_metrics["restored"] == 1
+        assert not os.path.exists(self.path)
+
+    async def test_expired_games_are_not_restored(self):
+        _, session = self.registry.create_game(dev_mode=False)
+        await session.join("p1")
+        session.last_activity = time.time() - 24 * 3600
+        self.registry.save_snapshot(self.path)
+
+        restarted = GameRegistry()
+        restarted.restore_snapshot(self.path)
+
+        assert not restarted.games
+        assert restarted.restore_metrics["skipped"] == 1
+
+    def test_missing_snapshot_is_ignored(self):
+        self.registry.restore_snapshot(self.path)
+
+        assert not self.registry.games
+
+
+class TestClocks(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.registry = GameRegistry()
+
+    async def start_game(self, time_control: TimeControl):
+        code, session = self.registry.create_game(dev_mode=False, time_control=time_control)
+        for player_id in ("p1", "p2"):
+            await session.join(player_id)
+        for player_id in ("p1", "p2"):
+            await session.handle_command(player_id, PlaceRandom(place_all=False))
+        return code, session
+
+    async def test_player_out_of_time_forfeits(self):
+        _, session = await self.start_game(TimeControl(turn_seconds=0.05))
+        idle = session.game.current_turn
+
+        await asyncio.sleep(0.15)
+
+        assert session.game.phase == GamePhase.FINISHED
+        assert session.game.winner == session.game.get_opponent(idle)
+        assert self.registry.leaderboard.rating(session.game.winner).wins == 1
+        assert session.log[-1].message.startswith(f"⏰ {idle} ran out of time")
+
+    async def test_games_without_time_control_have_no_clock(self):
+        _, session = await self.start_game(TimeControl())
+
+        assert session.clock is None
+        assert session.build_state("p1")["clock"] is None
+
+    async def test_clock_survives_a_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), "snapshot.json")
+        code, session = await self.start_game(TimeControl(turn_seconds=0.05, game_seconds=600))
+        self.registry.save_snapshot(path)
+        await self.registry.remove_game(code)
+
+        restarted = GameRegistry()
+        restarted.restore_snapshot(path)
+        await asyncio.sleep(0.15)
+
+        assert restarted.games[code].game.winner is not None
+        assert session.game.winner is None
+
+
+if __name__ == "__main__":
+    unittest.main()
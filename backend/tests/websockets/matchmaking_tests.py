@@ -0,0 +1,169 @@
+import time
+import unittest
+
+from backend.src.engine.errors import InvalidRequest
+from backend.src.engine.game import GamePhase
+from backend.src.websockets.game_registry import GameRegistry
+from backend.src.websockets.matchmaking import MatchmakingQueue, MatchTicket
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+    async def close(self, reason=None):
+        self.closed = reason
+
+
+class TestMatchmakingQueue(unittest.TestCase):
+    def test_players_are_paired_in_arrival_order(self):
+        queue = MatchmakingQueue()
+        first, second = MatchTicket("a", FakeConnection()), MatchTicket("b", FakeConnection())
+        queue.enqueue(first)
+        queue.enqueue(second)
+
+        assert queue.pop_opponent("c") is first
+        assert queue.pop_opponent("c") is second
+        assert queue.pop_opponent("c") is None
+
+    def test_player_is_not_paired_with_same_name(self):
+        queue = MatchmakingQueue()
+        queue.enqueue(MatchTicket("a", None))
+
+        assert queue.pop_opponent("a") is None
+        assert len(queue) == 1
+
+    def test_tickets_of_the_same_name_are_skipped(self):
+        queue = MatchmakingQueue()
+        tickets = [MatchTicket(player_id, FakeConnection()) for player_id in ("a", "a", "b")]
+        for ticket in tickets:
+            queue.enqueue(ticket)
+
+        assert queue.pop_opponent("a") is tickets[2]
+        assert list(queue.waiting.values()) == tickets[:2]
+
+    def test_many_tickets_of_the_same_name_are_not_scanned(self):
+        queue = MatchmakingQueue()
+        started = time.perf_counter()
+
+        for _ in range(20_000):
+            assert queue.pop_opponent("bot") is None
+            queue.enqueue(MatchTicket("bot", FakeConnection()))
+        opponents = [queue.pop_opponent("alice") for _ in range(20_000)]
+
+        assert time.perf_counter() - started < 1
+        assert [ticket.id for ticket in opponents] == sorted(ticket.id for ticket in opponents)
+        assert not queue.waiting and not queue.names and not queue.connections
+
+    def test_names_take_turns(self):
+        queue = MatchmakingQueue()
+        tickets = [MatchTicket(player_id, FakeConnection()) for player_id in ("bot", "bot", "bot", "alice")]
+        for ticket in tickets:
+            queue.enqueue(ticket)
+
+        assert [queue.pop_opponent("carol") for _ in range(4)] == [tickets[0], tickets[3], tickets[1], tickets[2]]
+
+    def test_requeued_ticket_is_paired_first(self):
+        queue = MatchmakingQueue()
+        tickets = [MatchTicket(player_id, FakeConnection()) for player_id in ("a", "b", "a")]
+        for ticket in tickets:
+            queue.enqueue(ticket)
+
+        assert queue.pop_opponent("c") is tickets[0]
+        queue.requeue(tickets[0])
+
+        assert [queue.pop_opponent("c") for _ in range(3)] == [tickets[0], tickets[1], tickets[2]]
+
+    def test_connection_cannot_wait_twice(self):
+        queue = MatchmakingQueue()
+        connection = FakeConnection()
+        ticket = MatchTicket("a", connection)
+        queue.enqueue(ticket)
+
+        with self.assertRaises(InvalidRequest):
+            queue.enqueue(MatchTicket("b", connection))
+
+        queue.cancel(ticket)
+        queue.enqueue(MatchTicket("b", connection))
+        assert len(queue) == 1
+
+    def test_cancelled_ticket_is_removed(self):
+        queue = MatchmakingQueue()
+        ticket = MatchTicket("a", None)
+        queue.enqueue(ticket)
+        queue.cancel(ticket)
+
+        assert len(queue) == 0
+        assert queue.metrics()["abandoned"] == 1
+
+    def test_old_tickets_expire(self):
+        queue = MatchmakingQueue(timeout=0)
+        queue.enqueue(MatchTicket("a", None))
+
+        assert [ticket.player_id for ticket in queue.expire()] == ["a"]
+        assert len(queue) == 0
+
+
+class TestRegistryMatchmake(unittest.IsolatedAsyncioTestCase):
+    async def test_two_players_are_matched_into_a_new_game(self):
+        registry = GameRegistry()
+        ws1, ws2 = FakeConnection(), FakeConnection()
+
+        ticket1 = await registry.matchmake("a", ws1)
+        assert ticket1.match is None
+
+        ticket2 = await registry.matchmake("b", ws2)
+        code, session = ticket2.match
+
+        assert ticket1.match == ticket2.match
+        assert registry.games[code] is session
+        assert session.players == ["a", "b"]
+        assert session.game.phase == GamePhase.SETUP
+        assert {"type": "match_found", "code": code, "opponentName": "b"} in ws1.sent
+        assert registry.matchmaking.metrics()["matches"] == 1
+
+    async def test_players_behind_two_tickets_of_the_same_name_are_matched(self):
+        registry = GameRegistry()
+
+        tickets = [await registry.matchmake(player_id, FakeConnection())
+                   for player_id in ("alice", "alice", "bob", "carol")]
+
+        assert all(ticket.match is not None for ticket in tickets)
+        games = sorted(tuple(ticket.match[1].players) for ticket in tickets[:2])
+        assert games == [("alice", "bob"), ("alice", "carol")]
+        assert len(registry.matchmaking) == 0
+        assert registry.matchmaking.metrics()["matches"] == 2
+
+    async def test_second_matchmake_of_a_connection_is_rejected(self):
+        registry = GameRegistry()
+        connection = FakeConnection()
+
+        await registry.matchmake("a", connection)
+
+        with self.assertRaises(InvalidRequest):
+            await registry.matchmake("b", connection)
+        assert len(registry.matchmaking) == 1
+
+    async def test_players_wait_when_server_is_full(self):
+        registry = GameRegistry()
+        registry.max_number_of_games = 0
+
+        await registry.matchmake("a", FakeConnection())
+        ticket = await registry.matchmake("b", FakeConnection())
+
+        assert ticket.match is None
+        assert len(registry.matchmaking) == 2
+
+        registry.max_number_of_games = 1
+        await registry.pair_waiting_players()
+
+        assert ticket.match is not None
+        assert len(registry.matchmaking) == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import unittest
+
+from backend.src.commands.commands import PlaceRandom
+from backend.src.engine.board import CellState
+from backend.src.engine.errors import InvalidRequest
+from backend.src.engine.game import GamePhase
+from backend.src.engine.game_session import GameSession
+from backend.src.websockets.mux import MuxConnection
+from backend.src.websockets.outbox import Outbox
+from backend.src.websockets.protocol.responses import SpectatorStateResponse
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000, reason=None):
+        pass
+
+
+class TestMuxConnection(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.ws = FakeWebSocket()
+        self.outbox = Outbox(self.ws)
+        self.outbox.start()
+        self.mux = MuxConnection(self.outbox, max_games=2)
+
+    async def flush(self):
+        await self.outbox.finish()
+        return self.ws.sent
+
+    async def test_messages_are_tagged_with_their_game(self):
+        first, second = GameSession(code="AAAAAA"), GameSession(code="BBBBBB")
+        await first.join("p1")
+        await second.join("p1")
+        self.mux.play("AAAAAA", "p1", first)
+        self.mux.play("BBBBBB", "p1", second)
+
+        await first.broadcast_json({"type": "log", "message": "first"})
+        await second.broadcast_json({"type": "log", "message": "second"})
+
+        assert [(message["game"], message["message"]) for message in await self.flush()] == [
+            ("AAAAAA", "first"), ("BBBBBB", "second")]
+
+    async def test_requests_must_name_a_game_of_the_connection(self):
+        session = GameSession()
+        await session.join("p1")
+        self.mux.play("AAAAAA", "p1", session)
+
+        assert self.mux.player("AAAAAA")[:2] == ("p1", session)
+        with self.assertRaises(InvalidRequest):
+            self.mux.player("BBBBBB")
+        with self.assertRaises(InvalidRequest):
+            self.mux.player(None)
+
+    async def test_games_per_connection_are_limited(self):
+        self.mux.watch("AAAAAA", GameSession())
+        self.mux.watch("BBBBBB", GameSession())
+
+        with self.assertRaises(InvalidRequest):
+            self.mux.check()
+        with self.assertRaises(InvalidRequest):
+            self.mux.watch("AAAAAA", GameSession())
+
+    async def test_finished_games_leave_room_for_new_ones(self):
+        finished = GameSession()
+        finished.game.phase = GamePhase.FINISHED
+        self.mux.play("AAAAAA", "p1", finished)
+        self.mux.watch("BBBBBB", GameSession())
+
+        self.mux.watch("CCCCCC", GameSession())
+
+        assert set(self.mux.channels) == {"BBBBBB", "CCCCCC"}
+        assert "AAAAAA" not in self.mux.playing
+
+    async def test_spectators_get_the_log_and_their_state(self):
+        session = GameSession()
+        await session.join("p1")
+        await session.join("p2")
+        self.mux.watch("AAAAAA", session)
+
+        for player_id in ("p1", "p2"):
+            await session.handle_command(player_id, PlaceRandom(place_all=False))
+        await session.broadcast_state()
+
+        messages = await self.flush()
+        state = messages[-1]
+
+        assert state["type"] == "spectator_state"
+        assert state["game"] == "AAAAAA"
+        assert state["phase"] == "in_progress"
+        # the ships are hidden until they are hit
+        assert all(cell == CellState.EMPTY for board in state["boards"].values() for row in board for cell in row)
+        assert SpectatorStateResponse(**state).players == ["p1", "p2"]
+        assert any(message["type"] == "log" for message in messages)
+
+    async def test_closing_stops_watching(self):
+        session = GameSession()
+        self.mux.watch("AAAAAA", session)
+
+        self.mux.close()
+
+        assert session.spectators == []
+
+
+if __name__ == "__main__":
+    unittest.main()
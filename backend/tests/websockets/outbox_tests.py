@@ -0,0 +1,97 @@
+import asyncio
+import json
+import unittest
+
+from backend.src.websockets.outbox import Outbox, SLOW_CLIENT_CLOSE_CODE
+from backend.src.websockets.protocol.message_types import ResponseTypes
+
+
+class FakeWebSocket:
+    """Sends only when the gate is open, like a client that stopped reading."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+        self.gate = asyncio.Event()
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000, reason=None):
+        self.closed = (code, reason)
+
+
+def state(turn):
+    return {"type": ResponseTypes.STATE, "turn": turn}
+
+
+def log(message):
+    return {"type": ResponseTypes.LOG, "message": message}
+
+
+class TestOutbox(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.ws = FakeWebSocket()
+        self.outbox = Outbox(self.ws, max_pending=4)
+        self.outbox.start()
+
+    async def test_pending_states_are_replaced_by_the_newest(self):
+        for turn in range(10):
+            await self.outbox.send_json(state(turn))
+
+        self.ws.gate.set()
+        await self.outbox.finish()
+
+        assert self.ws.sent == [state(9)]
+
+    async def test_other_messages_are_all_sent_in_order(self):
+        await self.outbox.send_json(log("a"))
+        await self.outbox.send_json(state(1))
+        await self.outbox.send_json(log("b"))
+        await self.outbox.send_json(state(2))
+
+        self.ws.gate.set()
+        await self.outbox.finish()
+
+        assert self.ws.sent == [log("a"), log("b"), state(2)]
+
+    async def test_states_of_different_games_are_kept(self):
+        await self.outbox.send_json({**state(1), "game": "A"})
+        await self.outbox.send_json({**state(1), "game": "B"})
+
+        self.ws.gate.set()
+        await self.outbox.finish()
+
+        assert len(self.ws.sent) == 2
+
+    async def test_slow_client_is_disconnected(self):
+        for index in range(4):
+            await self.outbox.send_json(log(index))
+
+        with self.assertRaises(ConnectionError):
+            await self.outbox.send_json(log("too many"))
+
+        self.ws.gate.set()
+        await self.outbox.finish()
+
+        assert self.ws.closed[0] == SLOW_CLIENT_CLOSE_CODE
+
+    async def test_close_sends_pending_messages_first(self):
+        await self.outbox.send_json(log("bye"))
+        await self.outbox.close(code=1009, reason="Message too large")
+
+        self.ws.gate.set()
+        await self.outbox.finish()
+
+        assert self.ws.sent == [log("bye")]
+        assert self.ws.closed == (1009, "Message too large")
+
+    async def test_nothing_is_queued_after_close(self):
+        await self.outbox.close()
+
+        with self.assertRaises(ConnectionError):
+            await self.outbox.send_json(log("late"))
+
+        self.ws.gate.set()
+        await self.outbox.finish()
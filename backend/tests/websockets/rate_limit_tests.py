@@ -0,0 +1,55 @@
+import unittest
+
+from backend.src.engine.errors import RateLimited
+from backend.src.websockets.protocol.message_types import RequestTypes
+from backend.src.websockets.rate_limit import TokenBucket, ConnectionLimiter
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        now = bucket.updated
+
+        assert [bucket.take(now) for _ in range(4)] == [True, True, True, False]
+        assert bucket.take(now + 0.5)
+        assert not bucket.take(now + 0.5)
+
+    def test_refill_is_capped(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        now = bucket.updated
+
+        assert [bucket.take(now + 60) for _ in range(3)] == [True, True, False]
+
+
+class TestConnectionLimiter(unittest.TestCase):
+    def test_request_types_have_their_own_bucket(self):
+        limiter = ConnectionLimiter(request_limits={RequestTypes.CHAT: (0.001, 1)})
+
+        limiter.check_request(RequestTypes.CHAT)
+        with self.assertRaises(RateLimited):
+            limiter.check_request(RequestTypes.CHAT)
+
+        limiter.check_request(RequestTypes.FIRE)
+
+    def test_connection_bucket(self):
+        limiter = ConnectionLimiter(connection_limit=(0.001, 2))
+
+        limiter.check_connection()
+        limiter.check_connection()
+        with self.assertRaises(RateLimited):
+            limiter.check_connection()
+
+    def test_accepted_request_resets_the_strikes(self):
+        limiter = ConnectionLimiter(max_strikes=2)
+
+        limiter.strike()
+        limiter.check_request(RequestTypes.FIRE)
+        limiter.strike()
+        assert not limiter.exhausted
+
+        limiter.strike()
+        assert limiter.exhausted
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import unittest
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend.src.cli.batch_adapter import run_generated
+from backend.src.history.leaderboard import Leaderboard
+from backend.src.websockets.protocol.message_types import ResponseTypes
+from backend.src.websockets.websocket_handler import app, registry
+
+
+class ThreadRecordingLeaderboard(Leaderboard):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def top(self, count):
+        self.threads.add(threading.get_ident())
+        return super().top(count)
+
+
+class TestLeaderboardEndpoint(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.leaderboard = registry.leaderboard
+        registry.leaderboard = ThreadRecordingLeaderboard()
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        registry.leaderboard = self.leaderboard
+
+    async def test_leaderboard_is_served_while_games_finish(self):
+        async def play(index: int):
+            code, session = registry.create_game(dev_mode=False)
+            await run_generated(session, f"game{index}", (f"p{index}", f"p{index + 1}"))
+            await registry.remove_game(code)
+
+        async def read():
+            responses = []
+            for _ in range(50):
+                responses.append(await self.client.get("/leaderboard", params={"top": 5, "player": "p0"}))
+                await asyncio.sleep(0)
+            return responses
+
+        reader = asyncio.create_task(read())
+        await asyncio.gather(*(play(index) for index in range(20)))
+        responses = await reader
+
+        assert all(response.status_code == 200 for response in responses)
+        assert len(registry.leaderboard.ratings) == 21
+        # on the event loop, like Leaderboard.record, never on the threadpool
+        assert registry.leaderboard.threads == {threading.get_ident()}
+
+
+class TestJsonEndpoint(unittest.TestCase):
+    def test_game_request_before_create_or_join_keeps_the_connection(self):
+        with TestClient(app).websocket_connect("/ws/json") as ws:
+            ws.send_json({"type": "fire", "row": 0, "col": 0})
+            error = ws.receive_json()
+            assert (error["error_code"], error["message"]) == ("INVALID_REQUEST", "Create or join a game first")
+
+            ws.send_json({"type": "create", "player_id": "alice"})
+            created = ws.receive_json()
+
+        assert created["type"] == ResponseTypes.GAME_CREATED
+        registry.games.pop(created["code"])
+
+
+if __name__ == "__main__":
+    unittest.main()